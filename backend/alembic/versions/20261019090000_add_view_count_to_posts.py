@@ -0,0 +1,28 @@
+"""Add view_count column to posts table
+
+Revision ID: 20261019090000
+Revises: 5a2efe8ab489
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019090000'
+down_revision: Union[str, None] = '5a2efe8ab489'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add view_count column to posts table (existing rows start at 0)
+    op.add_column('posts', sa.Column('view_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    # Remove view_count column from posts table
+    op.drop_column('posts', 'view_count')
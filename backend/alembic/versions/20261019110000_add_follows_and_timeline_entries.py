@@ -0,0 +1,63 @@
+"""Add follows and timeline_entries tables, users.follower_count
+
+Revision ID: 20261019110000
+Revises: 20261019100000
+Create Date: 2026-10-19 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019110000'
+down_revision: Union[str, None] = '20261019100000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('follower_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.create_table('follows',
+    sa.Column('follower_id', sa.String(length=255), nullable=False),
+    sa.Column('followee_id', sa.String(length=255), nullable=False),
+    sa.Column('fan_out_on_read', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['follower_id'], ['users.google_user_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['followee_id'], ['users.google_user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('follower_id', 'followee_id')
+    )
+    op.create_index('idx_follows_followee_id_fan_out_on_write', 'follows', ['followee_id'], unique=False,
+                    postgresql_where=sa.text('NOT fan_out_on_read'))
+    op.create_index('idx_follows_follower_id_fan_out_on_read', 'follows', ['follower_id'], unique=False,
+                    postgresql_where=sa.text('fan_out_on_read'))
+
+    op.create_table('timeline_entries',
+    sa.Column('user_id', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.String(length=255), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.google_user_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'created_at', 'post_id')
+    )
+    op.create_index('idx_timeline_entries_post_id', 'timeline_entries', ['post_id'], unique=False)
+
+    # Author pages and fan-out-on-read merges read an author's newest posts; the old
+    # single-column index is a prefix of the new one
+    op.create_index('idx_posts_google_user_id_created_at', 'posts', ['google_user_id', 'created_at'], unique=False)
+    op.drop_index('idx_posts_google_user_id', table_name='posts')
+
+
+def downgrade() -> None:
+    op.create_index('idx_posts_google_user_id', 'posts', ['google_user_id'], unique=False)
+    op.drop_index('idx_posts_google_user_id_created_at', table_name='posts')
+    op.drop_index('idx_timeline_entries_post_id', table_name='timeline_entries')
+    op.drop_table('timeline_entries')
+    op.drop_index('idx_follows_follower_id_fan_out_on_read', table_name='follows')
+    op.drop_index('idx_follows_followee_id_fan_out_on_write', table_name='follows')
+    op.drop_table('follows')
+    op.drop_column('users', 'follower_count')
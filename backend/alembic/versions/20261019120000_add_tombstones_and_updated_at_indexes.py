@@ -0,0 +1,39 @@
+"""Add tombstones table and updated_at indexes for delta sync
+
+Revision ID: 20261019120000
+Revises: 20261019110000
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019120000'
+down_revision: Union[str, None] = '20261019110000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tombstones',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('entity_type', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_tombstones_deleted_at', 'tombstones', ['deleted_at'], unique=False)
+    op.create_index('idx_posts_updated_at', 'posts', ['updated_at'], unique=False)
+    op.create_index('idx_comments_updated_at', 'comments', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_comments_updated_at', table_name='comments')
+    op.drop_index('idx_posts_updated_at', table_name='posts')
+    op.drop_index('idx_tombstones_deleted_at', table_name='tombstones')
+    op.drop_table('tombstones')
@@ -0,0 +1,121 @@
+"""Partition posts and comments by month of created_at
+
+Revision ID: 20261019130000
+Revises: 20261019120000
+Create Date: 2026-10-19 13:00:00
+
+Rebuilds posts and comments as tables range-partitioned by created_at, one
+partition per month (UTC) from the oldest row to PARTITION_PREMAKE_MONTHS
+ahead; the partition maintenance job keeps creating them after that (see
+app.core.partitions). Rows are copied in this migration's transaction, so
+run it in a maintenance window on large tables.
+
+The primary keys become (id, created_at): a unique constraint of a
+partitioned table must include the partition key. ids still come from the
+same sequences. Foreign keys to posts.id (comments, trending_scores,
+timeline_entries) are dropped, since posts.id alone is no longer unique to
+PostgreSQL; PostRepository.delete removes the dependent rows instead.
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019130000'
+down_revision: Union[str, None] = '20261019120000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created ahead of the current month; keep in line with PARTITION_PREMAKE_MONTHS
+PREMAKE_MONTHS = 3
+
+INDEXES = {
+    'posts': [
+        ('idx_posts_created_at', ['created_at']),
+        ('idx_posts_google_user_id_created_at', ['google_user_id', 'created_at']),
+        ('idx_posts_updated_at', ['updated_at']),
+    ],
+    'comments': [
+        ('idx_comments_post_id_created_at', ['post_id', 'created_at']),
+        ('idx_comments_google_user_id', ['google_user_id']),
+        ('idx_comments_updated_at', ['updated_at']),
+    ],
+}
+
+FOREIGN_KEYS = [
+    # (constraint, referencing table)
+    ('comments_post_id_fkey', 'comments'),
+    ('trending_scores_post_id_fkey', 'trending_scores'),
+    ('timeline_entries_post_id_fkey', 'timeline_entries'),
+]
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _months(first: datetime, last: datetime):
+    """Start of each month (UTC) from the month of `first` to the month of `last`."""
+    month = datetime(first.year, first.month, 1, tzinfo=timezone.utc)
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    now = datetime.now(timezone.utc)
+    last = _add_months(datetime(now.year, now.month, 1, tzinfo=timezone.utc), PREMAKE_MONTHS)
+
+    for constraint, table in FOREIGN_KEYS:
+        op.drop_constraint(constraint, table, type_='foreignkey')
+
+    for table, indexes in INDEXES.items():
+        oldest = bind.execute(sa.text(f"SELECT min(created_at) FROM {table}")).scalar() or now
+        old = f"{table}_unpartitioned"
+        op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+        op.execute(f"ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey")
+        # The sequence must outlive the old table (DROP TABLE drops the sequences it owns)
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS, "
+            f"CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)"
+        )
+        for month in _months(oldest.astimezone(timezone.utc), last):
+            op.execute(
+                f"CREATE TABLE {table}_p{month.year:04d}_{month.month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            )
+        op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+        op.execute(f"DROP TABLE {old}")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+        # Indexes on the parent are created on every partition (and on partitions created later);
+        # the primary key (id, created_at) replaces the separate index on id
+        for name, columns in indexes:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    # Partitions detached by the maintenance job are not brought back
+    for table, indexes in INDEXES.items():
+        partitioned = f"{table}_partitioned"
+        op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+        op.execute(f"ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey")
+        for name, _ in indexes:
+            op.execute(f"ALTER INDEX {name} RENAME TO {name}_partitioned")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+        op.execute(f"CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS, CONSTRAINT {table}_pkey PRIMARY KEY (id))")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {partitioned}")
+        op.execute(f"DROP TABLE {partitioned}")  # Drops its partitions too
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        for name, columns in indexes:
+            op.create_index(name, table, columns, unique=False)
+        op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
+
+    for constraint, table in FOREIGN_KEYS:
+        op.create_foreign_key(constraint, table, 'posts', ['post_id'], ['id'], ondelete='CASCADE')
@@ -0,0 +1,29 @@
+"""Index comments by user and created_at
+
+Revision ID: 20261019140000
+Revises: 20261019130000
+Create Date: 2026-10-19 14:00:00
+
+A user's comments are listed newest first; with an index on google_user_id
+alone every page sorted all of the user's comments.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019140000'
+down_revision: Union[str, None] = '20261019130000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_comments_google_user_id_created_at', 'comments', ['google_user_id', 'created_at'], unique=False)
+    op.drop_index('idx_comments_google_user_id', table_name='comments')
+
+
+def downgrade() -> None:
+    op.create_index('idx_comments_google_user_id', 'comments', ['google_user_id'], unique=False)
+    op.drop_index('idx_comments_google_user_id_created_at', table_name='comments')
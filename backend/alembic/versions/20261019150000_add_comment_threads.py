@@ -0,0 +1,40 @@
+"""Add threaded replies to comments
+
+Revision ID: 20261019150000
+Revises: 20261019140000
+Create Date: 2026-10-19 15:00:00
+
+Comments get a parent, a materialized path, a depth and a count of direct
+replies (see app.core.threads). Existing comments become top-level comments:
+their path is their zero-padded id. idx_comments_post_id_path serves whole
+threads and subtrees in path order.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019150000'
+down_revision: Union[str, None] = '20261019140000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('comments', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.add_column('comments', sa.Column('path', sa.String(length=255, collation='C'), nullable=True))
+    op.add_column('comments', sa.Column('depth', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('comments', sa.Column('reply_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("UPDATE comments SET path = lpad(id::text, 10, '0')")
+    op.alter_column('comments', 'path', nullable=False)
+    op.create_index('idx_comments_post_id_path', 'comments', ['post_id', 'path'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_comments_post_id_path', table_name='comments')
+    op.drop_column('comments', 'reply_count')
+    op.drop_column('comments', 'depth')
+    op.drop_column('comments', 'path')
+    op.drop_column('comments', 'parent_id')
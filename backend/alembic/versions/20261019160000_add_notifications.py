@@ -0,0 +1,50 @@
+"""Add notifications inbox and unread counter
+
+Revision ID: 20261019160000
+Revises: 20261019150000
+Create Date: 2026-10-19 16:00:00
+
+Notifications (e.g. @mentions, see app.core.mentions) are paged per user by
+id. users.unread_notification_count is kept in step with the unread rows by
+the notification writer and mark-as-read. idx_users_name resolves mentions.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019160000'
+down_revision: Union[str, None] = '20261019150000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('notifications',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.String(length=255), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('actor_id', sa.String(length=255), nullable=False),
+    sa.Column('actor_name', sa.String(length=100), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('comment_id', sa.Integer(), nullable=True),
+    sa.Column('read', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.google_user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_notifications_user_id_id', 'notifications', ['user_id', 'id'], unique=False)
+    op.create_index('idx_notifications_user_id_unread', 'notifications', ['user_id', 'id'], unique=False,
+                    postgresql_where=sa.text('NOT read'))
+    op.add_column('users', sa.Column('unread_notification_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('idx_users_name', 'users', ['name'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_users_name', table_name='users')
+    op.drop_column('users', 'unread_notification_count')
+    op.drop_index('idx_notifications_user_id_unread', table_name='notifications')
+    op.drop_index('idx_notifications_user_id_id', table_name='notifications')
+    op.drop_table('notifications')
@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
-from authlib.integrations.starlette_client import OAuth
 from jose import jwt
 from datetime import datetime, timedelta
 
@@ -10,17 +9,30 @@ from app.repositories import get_user_repository
 
 router = APIRouter()
 
-# Initialize OAuth
-oauth = OAuth()
-oauth.register(
-    name='google',
-    client_id=settings.GOOGLE_CLIENT_ID,
-    client_secret=settings.GOOGLE_CLIENT_SECRET,
-    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
-    client_kwargs={
-        'scope': 'openid email profile'
-    }
-)
+_oauth = None
+
+
+def get_oauth():
+    """
+    OAuth registry with the Google client, created on first use.
+    authlib is only imported when the real OAuth flow runs (never in DEV_MODE).
+    """
+    global _oauth
+    if _oauth is None:
+        from authlib.integrations.starlette_client import OAuth
+
+        oauth = OAuth()
+        oauth.register(
+            name='google',
+            client_id=settings.GOOGLE_CLIENT_ID,
+            client_secret=settings.GOOGLE_CLIENT_SECRET,
+            server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
+            client_kwargs={
+                'scope': 'openid email profile'
+            }
+        )
+        _oauth = oauth
+    return _oauth
 
 
 def create_access_token(data: dict) -> str:
@@ -82,7 +94,7 @@ async def login(request: Request, db = Depends(get_db), mock_user: int = 1):
 
     # Production mode: use Google OAuth
     redirect_uri = settings.GOOGLE_REDIRECT_URI
-    return await oauth.google.authorize_redirect(request, redirect_uri)
+    return await get_oauth().google.authorize_redirect(request, redirect_uri)
 
 
 @router.get("/callback")
@@ -90,7 +102,7 @@ async def auth_callback(request: Request, db = Depends(get_db)):
     """Handle Google OAuth callback."""
     try:
         # Get the token from Google
-        token = await oauth.google.authorize_access_token(request)
+        token = await get_oauth().google.authorize_access_token(request)
 
         # Get user info from Google
         user_info = token.get('userinfo')
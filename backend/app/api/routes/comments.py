@@ -1,9 +1,10 @@
-from typing import List, Union
+from typing import List, Optional, Union
 from fastapi import APIRouter, Depends, Query, status
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.services.comment_service import CommentService
-from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse
+from app.schemas.sparse import parse_fields, sparse_response
+from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse, CommentThreadResponse
 
 
 router = APIRouter()
@@ -22,6 +23,7 @@ def create_comment(
 
     - **post_id**: Post ID to comment on
     - **content**: Comment content (required)
+    - **parent_id**: Comment of the same post to reply to (optional)
     - **google_user_id**: Google user ID of the comment author (required)
     - **author_name**: Name of the comment author (required)
     """
@@ -34,6 +36,7 @@ def get_post_comments(
     post_id: Union[int, str],
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=100, description="Number of records to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,author_name,created_at (default: all)"),
     db = Depends(get_db)
 ):
     """
@@ -42,9 +45,51 @@ def get_post_comments(
     - **post_id**: Post ID
     - **skip**: Number of comments to skip (default: 0)
     - **limit**: Max number of comments to return (default: 100, max: 100)
+    - **fields**: Only return these fields (optional, `id` is always included)
     """
+    selected = parse_fields(fields, CommentResponse)
     service = CommentService(db)
-    return service.get_post_comments(post_id, skip=skip, limit=limit)
+    comments = service.get_post_comments(post_id, skip=skip, limit=limit, fields=selected)
+    if selected is None:
+        return comments
+    return sparse_response(comments, CommentResponse, selected)
+
+
+@router.get("/posts/{post_id}/comments/thread", response_model=CommentThreadResponse)
+def get_post_thread(
+    post_id: Union[int, str],
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=100, description="Number of comments to return"),
+    db = Depends(get_db)
+):
+    """
+    Get a post's comments as threads: depth-first, each reply right after its parent
+    (indent by `depth`).
+
+    - **post_id**: Post ID
+    - **cursor**: Cursor for the next page (optional)
+    - **limit**: Max number of comments to return (default: 100, max: 100)
+    """
+    service = CommentService(db)
+    return service.get_thread(post_id, cursor=cursor, limit=limit)
+
+
+@router.get("/comments/{comment_id}/replies", response_model=CommentThreadResponse)
+def get_comment_replies(
+    comment_id: Union[int, str],
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=100, description="Number of replies to return"),
+    db = Depends(get_db)
+):
+    """
+    Get the replies below a comment, at any depth, depth-first.
+
+    - **comment_id**: Comment ID
+    - **cursor**: Cursor for the next page (optional)
+    - **limit**: Max number of replies to return (default: 100, max: 100)
+    """
+    service = CommentService(db)
+    return service.get_replies(comment_id, cursor=cursor, limit=limit)
 
 
 @router.get("/comments/{comment_id}", response_model=CommentResponse)
@@ -66,6 +111,7 @@ def get_user_comments(
     google_user_id: str,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=100, description="Number of records to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,author_name,created_at (default: all)"),
     db = Depends(get_db)
 ):
     """
@@ -74,9 +120,14 @@ def get_user_comments(
     - **google_user_id**: Google user ID
     - **skip**: Number of comments to skip (default: 0)
     - **limit**: Max number of comments to return (default: 100, max: 100)
+    - **fields**: Only return these fields (optional, `id` is always included)
     """
+    selected = parse_fields(fields, CommentResponse)
     service = CommentService(db)
-    return service.get_user_comments(google_user_id, skip=skip, limit=limit)
+    comments = service.get_user_comments(google_user_id, skip=skip, limit=limit, fields=selected)
+    if selected is None:
+        return comments
+    return sparse_response(comments, CommentResponse, selected)
 
 
 @router.put("/comments/{comment_id}", response_model=CommentResponse)
@@ -103,7 +154,7 @@ def delete_comment(
     db = Depends(get_db)
 ):
     """
-    Delete a comment. Only the owner can delete.
+    Delete a comment and the replies below it. Only the owner can delete.
 
     - **comment_id**: Comment ID
     """
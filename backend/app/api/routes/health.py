@@ -1,4 +1,6 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.warmup import warmup
 
 router = APIRouter()
 
@@ -8,3 +10,14 @@ async def health_check():
         "status": "healthy",
         "message": "Service is running"
     }
+
+
+@router.get("/ready")
+async def readiness_check():
+    """
+    Readiness: 503 until the startup warm-up (DB connections, OAuth metadata) has finished.
+    Use as the startup/readiness probe; /api/health stays the liveness check.
+    """
+    if not warmup.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "steps": warmup.steps})
+    return {"status": "ready", "steps": warmup.steps}
@@ -0,0 +1,45 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from app.core.auth import require_internal_token
+from app.core.metrics import metrics
+from app.core.slow_queries import slow_query_log
+from app.services.export_service import export_ndjson
+
+
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    In-process metrics of this worker.
+
+    Requires the `X-Internal-Token` header (404 while INTERNAL_API_TOKEN is unset).
+    """
+    return metrics.snapshot()
+
+
+@router.get("/slow-queries")
+def get_slow_queries(limit: int = Query(20, ge=1, le=500, description="Number of statements to return")):
+    """
+    Slowest SQL statement shapes of this worker by total time, with caller,
+    counts, last parameters and a sampled EXPLAIN (ANALYZE, BUFFERS) plan.
+    Requires the `X-Internal-Token` header (404 while INTERNAL_API_TOKEN is unset).
+
+    - **limit**: Max number of statements to return (default: 20)
+    """
+    return slow_query_log.top(limit)
+
+
+@router.get("/export")
+def export_data(
+    google_user_id: Optional[str] = Query(None, description="Only export this user's posts and comments (default: everyone's)")
+):
+    """
+    All posts, then all comments, as streamed NDJSON for analytics and backups.
+    Reads from a replica when one is configured.
+
+    - **google_user_id**: Limit the export to one user (optional)
+    """
+    return StreamingResponse(export_ndjson(google_user_id), media_type="application/x-ndjson")
@@ -0,0 +1,45 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from app.core.database import get_db
+from app.core.auth import get_current_user
+from app.services.notification_service import NotificationService
+from app.schemas.notification import NotificationPageResponse, NotificationsRead, NotificationsReadResponse
+
+
+router = APIRouter()
+
+
+@router.get("", response_model=NotificationPageResponse)
+def get_notifications(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (omit for the newest notifications)"),
+    limit: int = Query(20, ge=1, le=100, description="Number of notifications to return"),
+    current_user: dict = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Get your notifications, newest first, with your unread count.
+
+    You are notified when a post or comment mentions you as `@` followed by
+    your name, with spaces written as underscores (`@Ada_Lovelace`).
+    Notifications are written in the background and show up a moment later.
+
+    - **cursor**: Cursor for the next page (optional)
+    - **limit**: Max number of notifications to return (default: 20, max: 100)
+    """
+    service = NotificationService(db)
+    return service.get_notifications(current_user["google_user_id"], cursor=cursor, limit=limit)
+
+
+@router.post("/read", response_model=NotificationsReadResponse)
+def mark_notifications_read(
+    body: NotificationsRead,
+    current_user: dict = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Mark notifications as read.
+
+    - **ids**: Notifications to mark as read (optional; default: all of your unread notifications)
+    """
+    service = NotificationService(db)
+    return service.mark_read(current_user["google_user_id"], body.ids)
@@ -1,8 +1,14 @@
-from typing import List, Union
-from fastapi import APIRouter, Depends, Query, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.read_routing import prefer_replica
+from app.services.changes_service import ChangesService
+from app.services.feed_snapshot import feed_snapshot
 from app.services.post_service import PostService
+from app.services.view_counter import view_counter
+from app.schemas.sparse import parse_fields, sparse_response
+from app.schemas.changes import ChangesResponse
 from app.schemas.post import PostCreate, PostUpdate, PostResponse
 
 
@@ -30,8 +36,10 @@ def create_post(
 
 @router.get("", response_model=List[PostResponse])
 def get_all_posts(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=100, description="Number of records to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,subject,author_name (default: all)"),
     db = Depends(get_db)
 ):
     """
@@ -39,9 +47,69 @@ def get_all_posts(
 
     - **skip**: Number of posts to skip (default: 0)
     - **limit**: Max number of posts to return (default: 100, max: 100)
+    - **fields**: Only return these fields (optional, `id` is always included)
+
+    With the default parameters the page is served pre-rendered (see
+    app.services.feed_snapshot) and may lag changes by a moment, except
+    for a client that just wrote something.
+    """
+    if skip == 0 and limit == feed_snapshot.limit and fields is None and prefer_replica():
+        snapshot = feed_snapshot.get()
+        if snapshot is not None:
+            return _snapshot_response(request, snapshot)
+    selected = parse_fields(fields, PostResponse)
+    service = PostService(db)
+    posts = service.get_all_posts(skip=skip, limit=limit, fields=selected)
+    if selected is None:
+        return posts
+    return sparse_response(posts, PostResponse, selected)
+
+
+def _snapshot_response(request: Request, snapshot) -> Response:
+    """The snapshot's bytes as they are (gzipped when the client accepts it), or 304."""
+    headers = {"ETag": snapshot.etag, "Vary": "Accept-Encoding"}
+    if snapshot.etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.gzipped, media_type="application/json", headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+@router.get("/trending", response_model=List[PostResponse])
+def get_trending_posts(
+    limit: int = Query(20, ge=1, le=100, description="Number of posts to return"),
+    db = Depends(get_db)
+):
+    """
+    Get trending posts, ranked by decayed comment and view velocity.
+
+    - **limit**: Max number of posts to return (default: 20, max: 100)
     """
     service = PostService(db)
-    return service.get_all_posts(skip=skip, limit=limit)
+    return service.get_trending_posts(limit=limit)
+
+
+@router.get("/changes", response_model=ChangesResponse)
+def get_changes(
+    since: Optional[str] = Query(None, description="Sync token from the previous poll (omit to get a starting token)"),
+    limit: int = Query(500, ge=1, le=1000, description="Max number of changes to return"),
+    db = Depends(get_db)
+):
+    """
+    Get posts and comments created, updated or deleted since a sync token.
+
+    - **since**: `next_token` of the previous response (optional)
+    - **limit**: Max number of changes to return (default: 500, max: 1000)
+
+    Without `since`, no changes are returned, only a token: get it before
+    loading the full post list, then poll with it. Apply `posts` and
+    `comments` as upserts by id and remove everything in `deleted` (a
+    deleted post takes its comments with it). When `has_more` is true, poll
+    again right away. 410 means the token is too old: reload everything.
+    """
+    service = ChangesService(db)
+    return service.get_changes(since, limit=limit)
 
 
 @router.get("/user/{google_user_id}", response_model=List[PostResponse])
@@ -49,6 +117,7 @@ def get_user_posts(
     google_user_id: str,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=100, description="Number of records to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,subject,author_name (default: all)"),
     db = Depends(get_db)
 ):
     """
@@ -57,9 +126,14 @@ def get_user_posts(
     - **google_user_id**: Google user ID
     - **skip**: Number of posts to skip (default: 0)
     - **limit**: Max number of posts to return (default: 100, max: 100)
+    - **fields**: Only return these fields (optional, `id` is always included)
     """
+    selected = parse_fields(fields, PostResponse)
     service = PostService(db)
-    return service.get_user_posts(google_user_id, skip=skip, limit=limit)
+    posts = service.get_user_posts(google_user_id, skip=skip, limit=limit, fields=selected)
+    if selected is None:
+        return posts
+    return sparse_response(posts, PostResponse, selected)
 
 
 @router.get("/{post_id}", response_model=PostResponse)
@@ -71,9 +145,15 @@ def get_post(
     Get a specific post by ID.
 
     - **post_id**: Post ID
+
+    Counts a view. Views are flushed to the database in batches, so the
+    returned view_count includes this worker's not yet flushed views.
     """
     service = PostService(db)
-    return service.get_post(post_id)
+    post = service.get_post(post_id)
+    view_counter.record(post.id)
+    # get_post may return a cached object shared with other requests, so copy before adjusting
+    return post.model_copy(update={"view_count": post.view_count + view_counter.pending(post.id)})
 
 
 @router.put("/{post_id}", response_model=PostResponse)
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from app.core.database import get_db
+from app.core.auth import get_current_user
+from app.services.timeline_service import TimelineService
+from app.schemas.post import PostResponse
+
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[PostResponse])
+def get_timeline(
+    before: Optional[datetime] = Query(None, description="Only posts created before this time (created_at of the last post of the previous page)"),
+    before_id: Optional[str] = Query(None, description="id of the last post of the previous page; with before, posts created at that time are paged past it instead of skipped"),
+    limit: int = Query(20, ge=1, le=100, description="Number of posts to return"),
+    current_user: dict = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Get your home timeline: posts by the users you follow, newest first.
+
+    - **before**, **before_id**: created_at and id of the last post of the previous page (optional)
+    - **limit**: Max number of posts to return (default: 20, max: 100)
+    """
+    service = TimelineService(db)
+    return service.get_timeline(current_user["google_user_id"], before=before, before_id=before_id, limit=limit)
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import StreamingResponse
+from app.core.database import get_db
+from app.core.auth import get_current_user
+from app.exceptions import ForbiddenError
+from app.services.export_service import export_ndjson
+from app.services.timeline_service import TimelineService
+
+
+router = APIRouter()
+
+
+@router.post("/{google_user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+def follow_user(
+    google_user_id: str,
+    current_user: dict = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Follow a user. Their posts appear in your home timeline (`GET /api/timeline`).
+    Following someone you already follow is a no-op.
+
+    - **google_user_id**: Google user ID of the user to follow
+    """
+    service = TimelineService(db)
+    service.follow(current_user["google_user_id"], google_user_id)
+    return None
+
+
+@router.delete("/{google_user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+def unfollow_user(
+    google_user_id: str,
+    current_user: dict = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Unfollow a user. Their posts are removed from your home timeline.
+
+    - **google_user_id**: Google user ID of the user to unfollow
+    """
+    service = TimelineService(db)
+    service.unfollow(current_user["google_user_id"], google_user_id)
+    return None
+
+
+@router.get("/{google_user_id}/export")
+def export_user_data(
+    google_user_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Download all your posts and comments as NDJSON (one JSON object per line,
+    with a "type" of "post" or "comment"). Streamed, so it works for any size.
+    Only your own data can be exported.
+
+    - **google_user_id**: Your Google user ID
+    """
+    if current_user["google_user_id"] != google_user_id:
+        raise ForbiddenError("You can only export your own data")
+    return StreamingResponse(
+        export_ndjson(google_user_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="export-{google_user_id}.ndjson"'},
+    )
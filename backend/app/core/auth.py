@@ -1,7 +1,10 @@
-from fastapi import Depends, HTTPException, status
+import hmac
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from app.core.config import settings
+from app.exceptions import ForbiddenError, NotFoundError
 
 security = HTTPBearer()
 
@@ -37,3 +40,16 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+def require_internal_token(x_internal_token: Optional[str] = Header(None)) -> None:
+    """
+    Guard for internal endpoints: requires the X-Internal-Token header to match
+    INTERNAL_API_TOKEN. Fails closed: without a configured token the endpoints
+    answer 404, as if they did not exist.
+    """
+    expected = settings.INTERNAL_API_TOKEN
+    if not expected:
+        raise NotFoundError("Not Found")
+    if not hmac.compare_digest(x_internal_token or "", expected):
+        raise ForbiddenError("Invalid internal token")
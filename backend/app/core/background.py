@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs a function on a daemon thread every `interval` seconds.
+
+    `wake()` runs it early (e.g. when a buffer hits its size threshold) and
+    `stop()` runs it one last time before returning, so buffered work is not
+    lost on graceful shutdown.
+    """
+
+    def __init__(self, name: str, func: Callable[[], None], interval: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self._run_once()
+        # Final run: stop() may have been called while the last one was in progress, after it
+        # had taken its work, so anything buffered since would otherwise be lost
+        self._run_once()
+
+    def _run_once(self) -> None:
+        try:
+            self.func()
+        except Exception:
+            logger.exception("Periodic task %s failed", self.name)
+
+
+class DelayedCalls:
+    """
+    Runs functions after a delay on one daemon thread, started on first use,
+    instead of a thread per call. Scheduling a call that is already pending
+    (same function and arguments) moves it to the later time, so a burst of
+    events makes one call and the pending calls stay bounded.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._heap: List[Tuple[float, int, Callable, tuple]] = []  # May hold superseded entries, see _next
+        self._due: Dict[Tuple[Callable, tuple], float] = {}
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def call_later(self, delay: float, func: Callable, *args) -> None:
+        due = time.monotonic() + delay
+        with self._condition:
+            if (func, args) not in self._due:
+                heapq.heappush(self._heap, (due, next(self._order), func, args))
+                self._condition.notify()
+            self._due[(func, args)] = due
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _next(self) -> Tuple[Callable, tuple]:
+        """Wait for the next call that is due."""
+        with self._condition:
+            while True:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                due, _, func, args = self._heap[0]
+                remaining = due - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                heapq.heappop(self._heap)
+                latest = self._due[(func, args)]
+                if latest > due:
+                    # Rescheduled meanwhile: wait for the later time
+                    heapq.heappush(self._heap, (latest, next(self._order), func, args))
+                    continue
+                del self._due[(func, args)]
+                return func, args
+
+    def _run(self) -> None:
+        while True:
+            func, args = self._next()
+            try:
+                func(*args)
+            except Exception:
+                logger.exception("Delayed call %s failed", self.name)
+
+
+# Shared by the read-your-writes re-evictions (app.services.caches, app.services.feed_snapshot)
+delayed_calls = DelayedCalls("delayed-calls")
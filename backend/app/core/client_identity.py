@@ -0,0 +1,57 @@
+from contextvars import ContextVar
+from typing import Tuple
+
+from jose import jwt, JWTError
+
+
+# Keys identifying the client of the current request: ("user:<sub>",) or, for anonymous
+# clients, ("ip:<addr>",)
+_client_keys: ContextVar[Tuple[str, ...]] = ContextVar("client_keys", default=())
+
+
+def current_client_keys() -> Tuple[str, ...]:
+    """Keys of the client whose request is being handled (empty outside requests)."""
+    return _client_keys.get()
+
+
+def identify(authorization: str, client_host: str) -> Tuple[str, ...]:
+    """
+    Derive client keys from the bearer token subject, falling back to the
+    client address for anonymous clients only: many users can share one
+    address (a proxy or NAT), so a write by one must not pin the reads of all.
+    The token is not verified here: the keys only steer routing decisions,
+    never authorization.
+    """
+    if authorization.lower().startswith("bearer "):
+        try:
+            subject = jwt.get_unverified_claims(authorization[7:]).get("sub")
+        except JWTError:
+            subject = None
+        if subject:
+            return (f"user:{subject}",)
+    if client_host:
+        return (f"ip:{client_host}",)
+    return ()
+
+
+class ClientIdentityMiddleware:
+    """Pure ASGI middleware making the client keys of each request available through current_client_keys()."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        authorization = ""
+        for key, value in scope["headers"]:
+            if key == b"authorization":
+                authorization = value.decode("latin-1")
+                break
+        client = scope.get("client")
+        token = _client_keys.set(identify(authorization, client[0] if client else ""))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _client_keys.reset(token)
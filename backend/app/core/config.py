@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "FastAPI Backend"
@@ -11,6 +11,8 @@ class Settings(BaseSettings):
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000", "http://localhost:5173"]
     # For production, use "*" to allow all origins or specific origins
     CORS_ALLOW_ALL: bool = False
+    # How long browsers may cache a CORS preflight response (Chrome caps it at 2 hours)
+    CORS_MAX_AGE_SECONDS: int = 86400
 
     # Frontend URL for redirects
     FRONTEND_URL: str = "http://localhost:5173"
@@ -25,6 +27,17 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "fastapi_db"
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: str = "5432"
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    # "psycopg2", or "psycopg" (psycopg 3; both are in requirements.txt) to use server-side prepared
+    # statements: a query run POSTGRES_PREPARE_THRESHOLD times on a connection is prepared there
+    POSTGRES_DRIVER: str = "psycopg2"
+    # 0 disables prepared statements (e.g. behind PgBouncer in transaction pooling mode)
+    POSTGRES_PREPARE_THRESHOLD: int = 5
+    # Optional read replicas ("host" or "host:port"), used by read-only service methods
+    POSTGRES_REPLICA_HOSTS: List[str] = []
+    # Clients that wrote read from the primary for this long (read-your-writes)
+    READ_YOUR_WRITES_SECONDS: float = 5.0
 
     # Firestore configuration (for Google Cloud)
     GCP_PROJECT_ID: Optional[str] = None
@@ -34,9 +47,53 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         """Generate database URL based on DB_TYPE"""
         if self.DB_TYPE == "postgresql":
-            return f"postgresql+psycopg2://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+            return f"postgresql+{self.POSTGRES_DRIVER}://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         return ""
 
+    @property
+    def REPLICA_DATABASE_URLS(self) -> List[str]:
+        """Database URLs of the read replicas (same credentials and database as the primary)"""
+        urls = []
+        for replica in self.POSTGRES_REPLICA_HOSTS:
+            host, _, port = replica.partition(":")
+            urls.append(
+                f"postgresql+{self.POSTGRES_DRIVER}://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{host}:{port or self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+            )
+        return urls
+
+    # Production server (python -m app.server)
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WEB_CONCURRENCY: Optional[int] = None  # Worker processes; default is sized from the CPU quota
+    SERVER_MAX_WORKERS: int = 8
+    SERVER_THREADPOOL_SIZE: Optional[int] = None  # Threads for sync routes per worker; default matches the DB pool
+    # Request drain on SIGTERM; workers get 3s more for their shutdown flushes, and Cloud Run kills the
+    # container 10s after SIGTERM, so keep this at most 6
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: float = 5.0
+    SERVER_WORKER_MAX_MEMORY_MB: Optional[int] = None  # Recycle workers above this RSS
+    SERVER_WORKER_MAX_REQUESTS: Optional[int] = None  # Recycle workers after this many requests
+    # Proxy addresses or CIDRs whose X-Forwarded-For/-Proto is trusted for the client address
+    # (rate limit buckets, sticky reads). Empty: the headers are ignored, and app.server refuses
+    # to start with RATE_LIMIT_ENABLED. On Cloud Run the peer is its proxy in 169.254.0.0/16
+    SERVER_TRUSTED_PROXIES: List[str] = []
+
+    # Startup warm-up (GET /api/ready turns 200 when done): pool connections to open per
+    # engine, capped at the pool size, and the time limit per warm-up step
+    WARMUP_DB_CONNECTIONS: int = 5
+    WARMUP_TIMEOUT_SECONDS: float = 20.0
+
+    @property
+    def threadpool_size(self) -> int:
+        """
+        Threads available to sync routes in one worker. Every sync route holds a
+        DB session, so more threads than pooled connections only adds waiting.
+        """
+        if self.SERVER_THREADPOOL_SIZE:
+            return self.SERVER_THREADPOOL_SIZE
+        if self.DB_TYPE == "postgresql":
+            return self.POSTGRES_POOL_SIZE + self.POSTGRES_MAX_OVERFLOW
+        return 40  # anyio's default
+
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -53,6 +110,105 @@ class Settings(BaseSettings):
     MAX_POST_CONTENT_LENGTH: int = 280
     MAX_COMMENT_CONTENT_LENGTH: int = 280
 
+    # View counter: views are aggregated in memory and flushed in batches
+    VIEW_COUNT_FLUSH_INTERVAL_SECONDS: float = 5.0
+    VIEW_COUNT_FLUSH_BATCH_SIZE: int = 500  # Flush early once this many posts have pending views
+
+    # Trending ranking: decayed comment/view velocity, kept in memory and checkpointed to the DB
+    TRENDING_HALF_LIFE_HOURS: float = 6.0
+    TRENDING_CAPACITY: int = 1000  # Posts tracked in memory (the top-K candidates)
+    TRENDING_COMMENT_WEIGHT: float = 5.0
+    TRENDING_VIEW_WEIGHT: float = 1.0
+    TRENDING_CHECKPOINT_INTERVAL_SECONDS: float = 60.0
+
+    # Home timeline: posts are copied into followers' timelines on write, except for authors
+    # with at least this many followers, whose posts are merged in when a timeline is read
+    TIMELINE_FANOUT_THRESHOLD: int = 10000
+    TIMELINE_BACKFILL_SIZE: int = 20  # Recent posts copied into a timeline on follow
+
+    # Notifications (@mentions): queued in memory by post/comment creation and written in batches
+    # (mentioned names resolved with one lookup per batch), every interval or once this many are queued
+    NOTIFICATION_FLUSH_INTERVAL_SECONDS: float = 1.0
+    NOTIFICATION_FLUSH_BATCH_SIZE: int = 200
+    NOTIFICATION_MAX_PENDING: int = 10000  # Mentions kept for retry while writes fail; the oldest are dropped
+
+    # Delta sync (GET /api/posts/changes): changes younger than the settle time wait for the next
+    # poll, so writes still committing (or replicating) are not skipped; keep it above replica lag.
+    # Deletions are kept as tombstones for the retention period; older tokens must reload everything
+    SYNC_SETTLE_SECONDS: float = 5.0
+    TOMBSTONE_RETENTION_DAYS: int = 30
+    TOMBSTONE_PRUNE_INTERVAL_SECONDS: float = 3600.0
+
+    # NDJSON export (GET /api/users/{id}/export, /api/internal/export, scripts/export_ndjson.py):
+    # rows fetched per server-side cursor batch / Datastore query, and lines per response chunk
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Monthly partitions of posts and comments (PostgreSQL, see app.core.partitions): created this many
+    # months ahead, and detached from the table (kept as archive tables) once entirely older than the
+    # retention; 0 keeps everything. Feed pages are read from the newest PARTITION_HOT_MONTHS first
+    PARTITION_PREMAKE_MONTHS: int = 3
+    PARTITION_RETENTION_MONTHS: int = 0
+    PARTITION_HOT_MONTHS: int = 2
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: float = 3600.0
+
+    # In-process read cache, evicted across workers by the invalidation bus
+    CACHE_TTL_SECONDS: float = 30.0
+    CACHE_MAX_ENTRIES: int = 10000
+    # "auto" = Postgres LISTEN/NOTIFY on postgresql, unix sockets otherwise; or "postgres", "socket", "local".
+    # Unix sockets reach only the workers of one instance: "auto" warns when it picks them outside
+    # DEV_MODE or on Cloud Run, where other instances see changes only after CACHE_TTL_SECONDS
+    INVALIDATION_BACKEND: str = "auto"
+    INVALIDATION_CHANNEL: str = "posts_invalidation"
+    INVALIDATION_SOCKET_DIR: str = "/tmp/posts-invalidation"
+
+    # Pre-rendered first page of GET /api/posts (default parameters): rebuilt in the background on
+    # post/comment changes (at most once per min interval) and every refresh interval (view counts);
+    # the previous page is served meanwhile, but never once it is older than the max stale age
+    FEED_SNAPSHOT_ENABLED: bool = True
+    FEED_SNAPSHOT_REFRESH_SECONDS: float = 15.0
+    FEED_SNAPSHOT_MIN_INTERVAL_SECONDS: float = 1.0
+    FEED_SNAPSHOT_MAX_STALE_SECONDS: float = 60.0
+
+    # Rate limiting: token buckets per route, keyed by JWT subject or client IP.
+    # Keys are "METHOD /path/{param}", values "<count>/<second|minute|hour|day>"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: Dict[str, str] = {
+        "POST /api/posts": "10/minute",
+        "POST /api/posts/{post_id}/comments": "30/minute",
+        "GET /api/posts": "120/minute",
+        "GET /api/posts/trending": "120/minute",
+        "GET /api/posts/changes": "120/minute",
+        "GET /api/posts/user/{google_user_id}": "120/minute",
+        "GET /api/posts/{post_id}/comments": "240/minute",
+        "GET /api/comments/user/{google_user_id}": "120/minute",
+        "GET /api/timeline": "120/minute",
+        "GET /api/notifications": "120/minute",
+        "POST /api/notifications/read": "60/minute",
+        "POST /api/users/{google_user_id}/follow": "30/minute",
+        "GET /api/users/{google_user_id}/export": "10/hour",
+    }
+    # "memory" = per worker; "redis" = shared by all workers/instances
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Request tracing: "none" (off), "file" (JSON lines) or "otlp" (OTLP/HTTP collector).
+    # Only TRACE_SAMPLE_RATE of requests are traced, unless a traceparent header says otherwise
+    TRACE_EXPORTER: str = "none"
+    TRACE_SAMPLE_RATE: float = 0.01
+    TRACE_FILE_PATH: str = "traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318"
+    TRACE_EXPORT_INTERVAL_SECONDS: float = 5.0
+
+    # Slow-query log (PostgreSQL): statements over the threshold are aggregated per shape and
+    # caller; a sample of slow SELECTs is re-run with EXPLAIN (ANALYZE, BUFFERS) in the background
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = 300.0  # At most one EXPLAIN per statement shape per interval
+    SLOW_QUERY_MAX_STATEMENTS: int = 500
+
+    # Token required by /api/internal endpoints (metrics, export, ...). Unset = the endpoints are off (404)
+    INTERNAL_API_TOKEN: Optional[str] = None
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,22 +1,61 @@
-from typing import Generator, Union
+from contextlib import contextmanager
+from typing import Generator, Iterator, Union
 from app.core.config import settings
 
 if settings.DB_TYPE == "postgresql":
-    from sqlalchemy import create_engine
+    import time
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.engine import Engine
     from sqlalchemy.orm import sessionmaker, Session
+    from app.core.metrics import metrics
+    from app.core.routing_session import RoutingSession
+    from app.core.slow_queries import slow_query_log
+    from app.core.tracing import record_query
 
-    # Create database engine
-    engine = create_engine(
-        settings.DATABASE_URL,
-        pool_pre_ping=True,  # Verify connections before using
-        echo=False,  # Set to True for SQL query logging during development
-    )
+    def _create_engine(url: str, name: str) -> Engine:
+        connect_args = {}
+        if settings.POSTGRES_DRIVER == "psycopg":
+            # psycopg 3 prepares a statement server-side once it ran this many times on a connection
+            # (psycopg2 has no prepared statements); None turns preparing off
+            connect_args["prepare_threshold"] = settings.POSTGRES_PREPARE_THRESHOLD or None
+        new_engine = create_engine(
+            url,
+            pool_pre_ping=True,  # Verify connections before using
+            pool_size=settings.POSTGRES_POOL_SIZE,
+            max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+            echo=False,  # Set to True for SQL query logging during development
+            connect_args=connect_args,
+        )
+        latency = metrics.histogram("db_query_seconds", engine=name)
+
+        @event.listens_for(new_engine, "before_cursor_execute")
+        def _start_timer(conn, cursor, statement, parameters, context, executemany):
+            context._query_started = time.perf_counter()
+
+        @event.listens_for(new_engine, "after_cursor_execute")
+        def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - context._query_started
+            latency.observe(elapsed)
+            record_query(name, statement, cursor.rowcount, elapsed)
+            slow_query_log.observe(name, conn, statement, parameters, context, executemany, elapsed)
+
+        return new_engine
+
+    # Create database engines: the primary takes all writes, replicas serve read-only service methods
+    engine = _create_engine(settings.DATABASE_URL, "primary")
+    replica_engines = [
+        _create_engine(url, f"replica-{index}") for index, url in enumerate(settings.REPLICA_DATABASE_URLS)
+    ]
+    engines = {"primary": engine}
+    engines.update({f"replica-{index}": replica for index, replica in enumerate(replica_engines)})
 
     # Create session factory
     SessionLocal = sessionmaker(
+        class_=RoutingSession,
         autocommit=False,
         autoflush=False,
-        bind=engine
+        bind=engine,
+        info={"replicas": replica_engines}
     )
 
     def get_db() -> Generator[Session, None, None]:
@@ -35,21 +74,41 @@ if settings.DB_TYPE == "postgresql":
         finally:
             db.close()
 
+    @contextmanager
+    def db_session() -> Iterator[Session]:
+        """
+        Database session for code running outside a request (background tasks, CLIs).
+        """
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
 elif settings.DB_TYPE == "firestore":
+    # Only the Datastore client is used at runtime; importing google.cloud.firestore
+    # as well would add its import cost to every cold start
     from app.core.firestore_client import get_firestore_client
-    from google.cloud import firestore
+    from google.cloud import datastore
 
-    def get_db() -> firestore.Client:
+    def get_db() -> datastore.Client:
         """
-        Firestore client dependency for FastAPI routes.
-        Returns the Firestore client singleton.
+        Datastore client dependency for FastAPI routes.
+        Returns the Datastore client singleton.
 
         Usage:
             @app.get("/items")
-            def get_items(db: firestore.Client = Depends(get_db)):
-                return db.collection('items').stream()
+            def get_items(db: datastore.Client = Depends(get_db)):
+                return list(db.query(kind='Item').fetch())
         """
         return get_firestore_client()
 
+    @contextmanager
+    def db_session() -> Iterator[datastore.Client]:
+        """
+        Datastore client for code running outside a request (background tasks, CLIs).
+        """
+        yield get_firestore_client()
+
 else:
     raise ValueError(f"Invalid DB_TYPE: {settings.DB_TYPE}. Must be 'postgresql' or 'firestore'.")
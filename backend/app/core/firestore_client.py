@@ -1,18 +1,25 @@
+import threading
 from google.cloud import datastore
 from app.core.config import settings
 from typing import Optional
 
 _db_client: Optional[datastore.Client] = None
+_db_client_lock = threading.Lock()
 
 def get_firestore_client() -> datastore.Client:
-    """Get Datastore client singleton."""
+    """
+    Get Datastore client singleton.
+    Created once even when the first calls race (startup warm-up and requests in the threadpool).
+    """
     global _db_client
     if _db_client is None:
-        if settings.GCP_PROJECT_ID:
-            _db_client = datastore.Client(project=settings.GCP_PROJECT_ID)
-        else:
-            # Use default project from environment
-            _db_client = datastore.Client()
+        with _db_client_lock:
+            if _db_client is None:
+                if settings.GCP_PROJECT_ID:
+                    _db_client = datastore.Client(project=settings.GCP_PROJECT_ID)
+                else:
+                    # Use default project from environment
+                    _db_client = datastore.Client()
     return _db_client
 
 def get_db():
@@ -0,0 +1,276 @@
+import json
+import logging
+import os
+import select
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional, Union
+
+from app.core.client_identity import current_client_keys
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+EntityId = Union[int, str, None]
+
+
+class InvalidationEvent:
+    """
+    An entity changed. entity is "post", "comment", ... or "*" for "assume
+    everything changed". clients are the keys of the client that made the change.
+    """
+
+    __slots__ = ("entity", "entity_id", "post_id", "clients")
+
+    def __init__(self, entity: str, entity_id: EntityId = None, post_id: EntityId = None, clients: tuple = ()):
+        self.entity = entity
+        self.entity_id = entity_id
+        self.post_id = post_id
+        self.clients = clients
+
+    def __repr__(self):
+        return f"<InvalidationEvent(entity={self.entity}, id={self.entity_id}, post_id={self.post_id})>"
+
+
+Subscriber = Callable[[InvalidationEvent], None]
+
+
+class LocalTransport:
+    """No cross-process delivery. Subscribers in this process are still notified."""
+
+    name = "local"
+
+    def start(self, on_message: Callable[[str], None], on_resync: Callable[[], None]) -> None:
+        pass
+
+    def send(self, payload: str) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class UnixSocketTransport:
+    """
+    Dev stand-in for a real bus: every worker on the host binds a datagram
+    socket in a shared directory, and publishing sends the payload to every
+    socket found there. Sockets left behind by dead workers are removed on
+    the first failed send.
+    """
+
+    name = "socket"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._sock: Optional[socket.socket] = None
+        self._path: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self, on_message: Callable[[str], None], on_resync: Callable[[], None]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._path = os.path.join(self.directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self._path)
+        self._sock.settimeout(1.0)
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._receive, args=(on_message,), name="invalidation-socket", daemon=True)
+        self._thread.start()
+
+    def _receive(self, on_message: Callable[[str], None]) -> None:
+        while not self._stopping.is_set():
+            try:
+                data = self._sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            on_message(data.decode())
+
+    def send(self, payload: str) -> None:
+        data = payload.encode()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if path == self._path or not name.endswith(".sock"):
+                    continue
+                try:
+                    sender.sendto(data, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._sock is not None:
+            self._sock.close()
+        if self._thread is not None:
+            self._thread.join(2.0)
+        if self._path and os.path.exists(self._path):
+            os.unlink(self._path)
+
+
+class PostgresNotifyTransport:
+    """
+    Postgres LISTEN/NOTIFY. Publishing runs pg_notify() on a pooled
+    connection; a dedicated connection per worker listens on the channel.
+    Notifications sent while the listener was disconnected are lost, so
+    subscribers are told to resync after every (re)connect.
+    """
+
+    name = "postgres"
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self, on_message: Callable[[str], None], on_resync: Callable[[], None]) -> None:
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._listen, args=(on_message, on_resync), name="invalidation-listen", daemon=True
+        )
+        self._thread.start()
+
+    def _listen(self, on_message: Callable[[str], None], on_resync: Callable[[], None]) -> None:
+        import psycopg2
+        from psycopg2 import sql
+
+        dsn = settings.DATABASE_URL.replace(f"postgresql+{settings.POSTGRES_DRIVER}://", "postgresql://", 1)
+        while not self._stopping.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(dsn)
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+                on_resync()
+                while not self._stopping.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        on_message(conn.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Invalidation listener lost its connection, reconnecting")
+                self._stopping.wait(1.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def send(self, payload: str) -> None:
+        from sqlalchemy import text
+        from app.core.database import engine
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+            conn.commit()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+
+
+class InvalidationBus:
+    """
+    Broadcasts entity change events to every worker.
+
+    Services publish after their write has committed. Subscribers in the
+    publishing process run synchronously; other workers get the event
+    through the transport and record the propagation delay.
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+        self._subscribers: List[Subscriber] = []
+        self._origin = ""
+        self._started = False
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.append(subscriber)
+
+    def publish(self, entity: str, entity_id: EntityId, post_id: EntityId = None) -> None:
+        clients = current_client_keys()
+        event = InvalidationEvent(entity, entity_id, post_id, clients)
+        self._dispatch(event)
+        if not self._started:
+            return
+        payload = json.dumps({
+            "entity": entity,
+            "id": entity_id,
+            "post_id": post_id,
+            "clients": clients,
+            "origin": self._origin,
+            "ts": time.time(),
+        })
+        try:
+            self.transport.send(payload)
+        except Exception:
+            # The write already committed; other workers fall back to cache TTLs
+            metrics.counter("invalidation_publish_errors_total", transport=self.transport.name).inc()
+            logger.exception("Could not publish %r", event)
+
+    def _on_message(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("origin") == self._origin:
+            return
+        metrics.histogram("invalidation_propagation_seconds", transport=self.transport.name).observe(
+            max(0.0, time.time() - message["ts"])
+        )
+        self._dispatch(InvalidationEvent(
+            message["entity"], message.get("id"), message.get("post_id"), tuple(message.get("clients", ()))
+        ))
+
+    def _on_resync(self) -> None:
+        self._dispatch(InvalidationEvent("*"))
+
+    def _dispatch(self, event: InvalidationEvent) -> None:
+        for subscriber in self._subscribers:
+            try:
+                subscriber(event)
+            except Exception:
+                logger.exception("Invalidation subscriber failed for %r", event)
+
+    def start(self) -> None:
+        # Identify this worker after fork, not at import time
+        self._origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.transport.start(self._on_message, self._on_resync)
+        self._started = True
+
+    def stop(self) -> None:
+        self._started = False
+        self.transport.stop()
+
+
+def _create_transport():
+    backend = settings.INVALIDATION_BACKEND
+    if backend == "auto":
+        backend = "postgres" if settings.DB_TYPE == "postgresql" else "socket"
+        # K_SERVICE is set on Cloud Run, which runs several instances whatever DEV_MODE says
+        if backend == "socket" and (not settings.DEV_MODE or os.environ.get("K_SERVICE")):
+            logger.warning(
+                "INVALIDATION_BACKEND=auto uses unix sockets with DB_TYPE=%s: only workers of this "
+                "instance are invalidated, other instances serve cached reads for up to "
+                "CACHE_TTL_SECONDS (%ss). Set INVALIDATION_BACKEND=socket if there is one instance",
+                settings.DB_TYPE, settings.CACHE_TTL_SECONDS,
+            )
+    if backend == "postgres":
+        return PostgresNotifyTransport(settings.INVALIDATION_CHANNEL)
+    if backend == "socket":
+        return UnixSocketTransport(settings.INVALIDATION_SOCKET_DIR)
+    if backend == "local":
+        return LocalTransport()
+    raise ValueError(f"Invalid INVALIDATION_BACKEND: {backend}. Must be 'auto', 'postgres', 'socket' or 'local'.")
+
+
+invalidation_bus = InvalidationBus(_create_transport())
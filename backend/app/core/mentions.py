@@ -0,0 +1,33 @@
+"""
+@mentions in post and comment text.
+
+A mention is "@" followed by a user's display name with spaces written as
+underscores, e.g. "@Ada_Lovelace" for "Ada Lovelace". Names are matched
+exactly (case-sensitive), so resolving the mentions of a whole batch of
+posts and comments is one equality/IN lookup on the user name. Trailing
+punctuation ("@Ada_Lovelace, ..." or "... @Ada_Lovelace.") is not part of
+the name; an "@" inside a word (an email address) is not a mention.
+"""
+import re
+from typing import List
+
+# Mentions after the first MAX_MENTIONS distinct names of a text are ignored
+MAX_MENTIONS = 10
+
+# users.name is at most 100 characters
+MAX_NAME_LENGTH = 100
+
+_MENTION = re.compile(r"(?<![\w@])@([^\W_][\w.'-]*)")
+
+
+def extract_mentions(text: str) -> List[str]:
+    """Distinct mentioned names in order of first appearance, with underscores turned back into spaces."""
+    names: List[str] = []
+    for match in _MENTION.finditer(text):
+        name = match.group(1).rstrip(".'-").replace("_", " ").strip()
+        if not name or len(name) > MAX_NAME_LENGTH or name in names:
+            continue
+        names.append(name)
+        if len(names) == MAX_MENTIONS:
+            break
+    return names
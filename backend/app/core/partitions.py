@@ -0,0 +1,52 @@
+"""
+Monthly range partitioning of posts and comments (PostgreSQL).
+
+Each table is partitioned by created_at into one partition per calendar month
+(UTC), named <table>_pYYYY_MM. Partitions are created ahead of time by the
+partition maintenance job (app.services.partition_maintenance); there is no
+default partition, so range-ordered scans stay ordered appends that stop at
+the newest partitions once a LIMIT is satisfied.
+"""
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+
+PARTITIONED_TABLES = ("posts", "comments")
+
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+def month_start(moment: datetime) -> datetime:
+    """First instant (UTC) of the month containing `moment`."""
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """Start of the month `months` after (or before, when negative) the month starting at `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(table: str, name: str) -> Optional[datetime]:
+    """Month of a partition named by partition_name, or None for tables not following the scheme."""
+    match = _PARTITION_NAME.match(name)
+    if match is None or match["table"] != table:
+        return None
+    return datetime(int(match["year"]), int(match["month"]), 1, tzinfo=timezone.utc)
+
+
+def hot_since(now: Optional[datetime] = None) -> datetime:
+    """
+    Lower created_at bound of the hot partitions (the current month and the
+    PARTITION_HOT_MONTHS - 1 before it). A query filtering on it is pruned to
+    those partitions when it is planned.
+    """
+    current = month_start(now or datetime.now(timezone.utc))
+    return add_months(current, -(max(settings.PARTITION_HOT_MONTHS, 1) - 1))
@@ -0,0 +1,179 @@
+import json
+import logging
+import math
+import re
+import time
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from jose import jwt, JWTError
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+
+class RateLimitRule:
+    """"<count>/<period>" for one route: a bucket of `count` tokens refilled evenly over the period."""
+
+    def __init__(self, route: str, limit: str):
+        self.route = route
+        method, _, path = route.partition(" ")
+        self.method = method.upper()
+        self.pattern: Pattern = re.compile("^" + re.sub(r"\\{[^/]+?\\}", "[^/]+", re.escape(path)) + "$")
+        # More literal characters = more specific; checked first
+        self.specificity = len(re.sub(r"\{[^/]+?\}", "", path))
+
+        count, _, period = limit.partition("/")
+        self.capacity = float(count)
+        self.refill_per_second = self.capacity / _PERIODS[period.strip().rstrip("s")]
+
+
+def parse_rules(limits: Dict[str, str]) -> List[RateLimitRule]:
+    rules = [RateLimitRule(route, limit) for route, limit in limits.items()]
+    return sorted(rules, key=lambda rule: rule.specificity, reverse=True)
+
+
+class MemoryBucketStore:
+    """
+    Token buckets in a plain dict of immutable (tokens, updated_at) tuples.
+    The middleware only touches it from the event loop thread, so there is
+    nothing to lock; each update is a single dict assignment.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """Take one token. Returns 0 if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            retry_after = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            retry_after = (1 - tokens) / refill_per_second
+        if len(self._buckets) > self.max_keys:
+            self._prune(now)
+        return retry_after
+
+    def _prune(self, now: float) -> None:
+        # Buckets untouched for an hour are full again for any sane rule; dropping them is free
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if now - bucket[1] < 3600}
+
+
+_REDIS_TAKE = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 't', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisBucketStore:
+    """
+    Token buckets shared by all workers/instances, updated atomically by a
+    Lua script. If Redis is unreachable requests are allowed (fail open).
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio
+
+        self._client = redis.asyncio.from_url(url)
+        self._take = self._client.register_script(_REDIS_TAKE)
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        try:
+            result = await self._take(keys=[f"ratelimit:{key}"], args=[capacity, refill_per_second, time.time()])
+        except Exception:
+            metrics.counter("rate_limit_backend_errors_total").inc()
+            logger.exception("Rate limit backend unavailable, allowing request")
+            return 0.0
+        return float(result)
+
+
+def client_key(headers: Dict[bytes, bytes], client: Optional[Tuple[str, int]]) -> str:
+    """Verified JWT subject when a valid bearer token is sent, else the client address."""
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    if authorization.lower().startswith("bearer "):
+        try:
+            payload = jwt.decode(authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            payload = {}
+        if payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI per-route token-bucket rate limiter.
+
+    Routes without a rule pass straight through after one method/path
+    match. Limited requests get 429 with a Retry-After header.
+    """
+
+    def __init__(self, app, rules: List[RateLimitRule], store):
+        self.app = app
+        self.rules = rules
+        self.store = store
+
+    def _match(self, method: str, path: str) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if rule.method == method and rule.pattern.match(path):
+                return rule
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        rule = self._match(scope["method"], scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = client_key(dict(scope["headers"]), scope.get("client"))
+        retry_after = await self.store.take(f"{rule.route}:{key}", rule.capacity, rule.refill_per_second)
+        if retry_after <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        metrics.counter("rate_limited_requests_total", route=rule.route).inc()
+        body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_bucket_store():
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemoryBucketStore()
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBucketStore(settings.RATE_LIMIT_REDIS_URL)
+    raise ValueError(f"Invalid RATE_LIMIT_BACKEND: {settings.RATE_LIMIT_BACKEND}. Must be 'memory' or 'redis'.")
@@ -0,0 +1,70 @@
+import functools
+import time
+from typing import Dict, Iterable
+
+from app.core.client_identity import current_client_keys
+from app.core.config import settings
+from app.core.invalidation import InvalidationEvent, invalidation_bus
+
+
+class StickyWrites:
+    """
+    Clients that wrote recently, so their reads go to the primary
+    (read-your-writes) until replicas have caught up.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._until: Dict[str, float] = {}
+
+    def mark(self, keys: Iterable[str]) -> None:
+        until = time.monotonic() + self.window
+        for key in keys:
+            self._until[key] = until
+        if len(self._until) > 10000:
+            self._prune()
+
+    def is_sticky(self, keys: Iterable[str]) -> bool:
+        now = time.monotonic()
+        return any(self._until.get(key, 0.0) > now for key in keys)
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        self._until = {key: until for key, until in self._until.items() if until > now}
+
+
+sticky_writes = StickyWrites(settings.READ_YOUR_WRITES_SECONDS)
+
+
+def _mark_writers(event: InvalidationEvent) -> None:
+    # Change events carry the writing client, so writes handled by other workers make it sticky here too
+    if event.clients:
+        sticky_writes.mark(event.clients)
+
+
+invalidation_bus.subscribe(_mark_writers)
+
+
+def read_only(method):
+    """
+    Mark a service method as read-only so its queries may be served by a read
+    replica. The service must keep its DB handle as `self.db`; backends without
+    replica routing are left alone.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        reading = getattr(self.db, "reading", None)
+        if reading is None:
+            return method(self, *args, **kwargs)
+        with reading():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def prefer_replica() -> bool:
+    """False when the current client wrote within the read-your-writes window."""
+    return not sticky_writes.is_sticky(current_client_keys())
+
+
+def record_write() -> None:
+    sticky_writes.mark(current_client_keys())
@@ -0,0 +1,50 @@
+import itertools
+from contextlib import contextmanager
+
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core.read_routing import prefer_replica, record_write
+
+
+_round_robin = itertools.count()
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads inside `reading()` to a read replica and
+    everything else to the primary.
+
+    Replica engines are passed through `info={"replicas": [...]}`. A session
+    sticks to one replica so its reads see one consistent snapshot. Clients
+    that committed a write recently read from the primary.
+    """
+
+    _reading = 0
+    _replica = None
+    _wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self._wrote = True
+        elif self._reading:
+            replicas = self.info.get("replicas")
+            if replicas and prefer_replica():
+                if self._replica is None:
+                    self._replica = replicas[next(_round_robin) % len(replicas)]
+                return self._replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+    @contextmanager
+    def reading(self):
+        self._reading += 1
+        try:
+            yield
+        finally:
+            self._reading -= 1
+
+    def commit(self):
+        super().commit()
+        if self._wrote:
+            self._wrote = False
+            record_write()
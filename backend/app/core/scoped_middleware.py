@@ -0,0 +1,20 @@
+class PathScopedMiddleware:
+    """
+    Pure ASGI wrapper running a middleware only for paths under `prefix`;
+    every other request goes straight to the inner app.
+
+        app.add_middleware(PathScopedMiddleware, prefix="/api/auth", middleware=SessionMiddleware, secret_key=...)
+    """
+
+    def __init__(self, app, prefix: str, middleware, **options):
+        self.app = app
+        self.prefix = prefix.rstrip("/")
+        self.scoped = middleware(app, **options)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            path = scope["path"]
+            if path == self.prefix or path.startswith(self.prefix + "/"):
+                await self.scoped(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -0,0 +1,56 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.core.metrics import metrics
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for a key is in
+    flight, other callers with the same key wait for it and share its result
+    (or exception) instead of running their own.
+
+    `do()` is for sync code running in the threadpool. Results are shared
+    between callers, so they must be treated as read-only. Callers should put anything that changes
+    what a correct answer is into the key (e.g. a cache generation), so a
+    caller arriving after a write does not join a flight that started before it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            metrics.counter("singleflight_coalesced_total", group=self.name).inc()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
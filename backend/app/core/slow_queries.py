@@ -0,0 +1,187 @@
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+# Execution option that keeps a statement out of the log (the EXPLAINs themselves)
+SKIP_OPTION = "skip_slow_query_log"
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_ROWS = re.compile(r"(\(\?\.\.\.\))(?:\s*,\s*\(\?\.\.\.\))+")
+
+# Frames of these modules are plumbing, not the code that issued the statement
+_PLUMBING_MODULES = ("app.core.database", "app.core.slow_queries", "app.core.routing_session", "app.core.tracing")
+
+
+def normalize(statement: str) -> str:
+    """
+    Statement shape without values: placeholders and literals become ?, and
+    IN lists / VALUES rows of any length collapse, so one query shape is one entry.
+    """
+    text = _WHITESPACE.sub(" ", statement).strip()
+    text = _PLACEHOLDER.sub("?", text)
+    text = _STRING.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _LIST.sub("(?...)", text)
+    return _ROWS.sub(r"\1, ...", text)
+
+
+def find_caller() -> str:
+    """The innermost app function (normally a repository method) on the stack, as module:Qualname."""
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.") and not module.startswith(_PLUMBING_MODULES):
+            code = frame.f_code
+            caller = f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+            if module.startswith("app.repositories."):
+                return caller
+            fallback = fallback or caller
+        frame = frame.f_back
+    return fallback or "unknown"
+
+
+class SlowQueryStats:
+    __slots__ = ("statement", "caller", "engine", "count", "total_ms", "max_ms", "last_parameters",
+                 "last_seen", "explain", "explained_at", "explain_pending")
+
+    def __init__(self, statement: str, caller: str, engine: str):
+        self.statement = statement
+        self.caller = caller
+        self.engine = engine
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_parameters = ""
+        self.last_seen = 0.0
+        self.explain: Optional[str] = None
+        self.explained_at = 0.0
+        self.explain_pending = False
+
+    def to_dict(self) -> dict:
+        return {
+            "statement": self.statement,
+            "caller": self.caller,
+            "engine": self.engine,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3),
+            "max_ms": round(self.max_ms, 3),
+            "last_parameters": self.last_parameters,
+            "last_seen": self.last_seen,
+            "explain": self.explain,
+            "explained_at": self.explained_at or None,
+        }
+
+
+class SlowQueryLog:
+    """
+    Aggregates statements slower than the threshold per (normalized statement,
+    caller). For a sample of slow SELECTs, EXPLAIN (ANALYZE, BUFFERS) is run
+    again on a background thread with the same parameters, at most once per
+    `explain_interval` per statement. Only SELECTs are explained, because
+    ANALYZE executes the statement.
+    """
+
+    def __init__(self, threshold_ms: float, explain_sample_rate: float, explain_interval: float,
+                 max_statements: int, explain_timeout_ms: int = 5000):
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_interval = explain_interval
+        self.max_statements = max_statements
+        self.explain_timeout_ms = explain_timeout_ms
+        self._stats: Dict[Tuple[str, str], SlowQueryStats] = {}
+        self._lock = threading.Lock()
+        self._explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+    def observe(self, engine_name: str, conn, statement: str, parameters, context, executemany: bool,
+                elapsed: float) -> None:
+        """Engine after_cursor_execute hook body; returns at once for statements under the threshold."""
+        if elapsed < self.threshold or context.execution_options.get(SKIP_OPTION):
+            return
+        duration_ms = elapsed * 1000
+        normalized = normalize(statement)
+        caller = find_caller()
+        metrics.counter("slow_queries_total", engine=engine_name).inc()
+        logger.warning("Slow query (%.1f ms, %s, %s): %s", duration_ms, engine_name, caller, normalized[:500])
+
+        key = (normalized, caller)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_statements:
+                    self._evict()
+                stats = self._stats[key] = SlowQueryStats(normalized, caller, engine_name)
+            stats.count += 1
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            stats.last_parameters = repr(parameters)[:1000]
+            stats.last_seen = time.time()
+            explain = (
+                not executemany
+                and normalized.lstrip("( ").upper().startswith(("SELECT", "WITH"))
+                and not stats.explain_pending
+                and stats.last_seen - stats.explained_at >= self.explain_interval
+                and random.random() < self.explain_sample_rate
+            )
+            if explain:
+                stats.explain_pending = True
+        if explain:
+            self._explainer.submit(self._explain, stats, conn.engine, statement, parameters)
+
+    def _evict(self) -> None:
+        # Drop the entry with the least total time to make room
+        del self._stats[min(self._stats, key=lambda key: self._stats[key].total_ms)]
+
+    def _explain(self, stats: SlowQueryStats, engine, statement: str, parameters) -> None:
+        try:
+            with engine.connect() as conn:
+                conn = conn.execution_options(**{SKIP_OPTION: True})
+                # ANALYZE runs the statement: bound its time and never keep anything it did
+                transaction = conn.begin()
+                try:
+                    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}")
+                    rows = conn.exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters).all()
+                finally:
+                    transaction.rollback()
+            stats.explain = "\n".join(row[0] for row in rows)
+            metrics.counter("slow_query_explains_total").inc()
+        except Exception:
+            metrics.counter("slow_query_explain_errors_total").inc()
+            logger.exception("Could not EXPLAIN slow query from %s", stats.caller)
+        finally:
+            stats.explained_at = time.time()
+            stats.explain_pending = False
+
+    def top(self, limit: int = 20) -> List[dict]:
+        """Slow statements with the most total time first."""
+        with self._lock:
+            ranked = sorted(self._stats.values(), key=lambda stats: stats.total_ms, reverse=True)[:limit]
+            return [stats.to_dict() for stats in ranked]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS,
+    max_statements=settings.SLOW_QUERY_MAX_STATEMENTS,
+)
@@ -0,0 +1,41 @@
+"""
+Materialized paths of threaded comments.
+
+A comment's path is its parent's path followed by its own segment (a
+top-level comment's path is its segment alone). Segments have a fixed width
+per backend and sort in creation order, so ordering a post's comments by
+path lists every thread depth-first, replies in order under their parent,
+and the replies below a comment, at any depth, are the contiguous path
+range (path, path + SUBTREE_END): one index range scan either way.
+
+    PostgreSQL: the comment id, zero-padded to 10 digits
+    Datastore:  created_at in microseconds (16 digits), then 8 hex digits of the key
+"""
+import calendar
+from datetime import datetime
+from typing import Optional
+
+# Top-level comments have depth 0; replies to a comment at MAX_DEPTH are rejected
+MAX_DEPTH = 15
+
+# Sorts after every character a segment is made of (digits, lowercase hex)
+SUBTREE_END = "~"
+
+
+def sql_segment(comment_id: int) -> str:
+    return f"{comment_id:010d}"
+
+
+def datastore_segment(created_at: datetime, comment_id: str) -> str:
+    """Segment of a Datastore comment; `created_at` is naive UTC, as the repositories write it."""
+    micros = calendar.timegm(created_at.utctimetuple()) * 1_000_000 + created_at.microsecond
+    return f"{micros:016d}{comment_id.replace('-', '')[:8]}"
+
+
+def child_path(parent_path: Optional[str], segment: str) -> str:
+    return (parent_path or "") + segment
+
+
+def subtree_end(path: str) -> str:
+    """Exclusive upper bound of the paths below `path`."""
+    return path + SUBTREE_END
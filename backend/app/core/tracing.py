@@ -0,0 +1,339 @@
+import abc
+import functools
+import inspect
+import json
+import logging
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+# Span of the current request (None when the request is not sampled, or outside requests)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+_STATEMENT_MAX_LENGTH = 2000
+
+
+class Trace:
+    """All spans of one sampled request. Spans from threadpool threads append concurrently."""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], kind: str = "internal",
+                 attributes: Optional[Dict] = None, start_ns: Optional[int] = None):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes if attributes is not None else {}
+        self.error: Optional[str] = None
+        trace.spans.append(self)
+
+    def finish(self, end_ns: Optional[int] = None) -> None:
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def __repr__(self):
+        return f"<Span(name={self.name}, duration_ms={self.duration_ms:.3f})>"
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def _run_in_span(parent: Span, name: str, attributes: Dict, func: Callable, args, kwargs):
+    span = Span(parent.trace, name, parent.span_id, attributes=attributes)
+    token = _current_span.set(span)
+    try:
+        result = func(*args, **kwargs)
+    except BaseException as error:
+        span.error = repr(error)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.finish()
+    if isinstance(result, list):
+        span.attributes["result.count"] = len(result)
+    return result
+
+
+def _trace_function(name: str, layer: str, func: Callable) -> Callable:
+    attributes = {"code.layer": layer}
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        parent = _current_span.get()
+        if parent is None:
+            # Not sampled: one context variable lookup is all tracing costs
+            return func(*args, **kwargs)
+        return _run_in_span(parent, name, dict(attributes), func, args, kwargs)
+
+    return wrapper
+
+
+def traced(layer: str):
+    """
+    Class decorator: every public method runs in a span named "<Class>.<method>"
+    when the current request is sampled.
+
+        @traced("service")
+        class PostService: ...
+    """
+    def decorate(cls):
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(attribute):
+                continue
+            setattr(cls, name, _trace_function(f"{cls.__name__}.{name}", layer, attribute))
+        return cls
+    return decorate
+
+
+def record_query(engine: str, statement: str, rowcount: int, elapsed: float) -> None:
+    """Record a finished SQL statement as a span of the current request (if sampled)."""
+    parent = _current_span.get()
+    if parent is None:
+        return
+    end_ns = time.time_ns()
+    span = Span(parent.trace, "db.query", parent.span_id, kind="client", start_ns=end_ns - int(elapsed * 1e9), attributes={
+        "db.system": "postgresql",
+        "db.engine": engine,
+        "db.statement": statement[:_STATEMENT_MAX_LENGTH],
+        "db.rows": rowcount,
+    })
+    span.finish(end_ns)
+
+
+def _parse_traceparent(header: str):
+    """W3C traceparent "00-<trace id>-<parent id>-<flags>" -> (trace_id, parent_id, sampled) or None."""
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening the root span of each sampled request.
+
+    Requests are sampled at `sample_rate`, unless the caller sent a W3C
+    `traceparent` header, whose sampled flag (and trace id) is followed.
+    Unsampled requests pass straight through.
+    """
+
+    def __init__(self, app, sample_rate: float, exporter):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        parent_id = None
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = _parse_traceparent(value.decode("latin-1"))
+                break
+        if traceparent is not None:
+            trace_id, parent_id, sampled = traceparent
+        else:
+            trace_id, sampled = None, random.random() < self.sample_rate
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(trace_id or f"{random.getrandbits(128):032x}")
+        root = Span(trace, f"{scope['method']} {scope['path']}", parent_id, kind="server", attributes={
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+        token = _current_span.set(root)
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException as error:
+            root.error = repr(error)
+            raise
+        finally:
+            _current_span.reset(token)
+            root.finish()
+            # Name by route template (set during routing) so traces group per endpoint
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                root.name = f"{scope['method']} {scope.get('root_path', '')}{route.path}"
+            self.exporter.export(trace)
+
+
+class BatchExporter(abc.ABC):
+    """
+    Queues finished traces and writes them out in batches on a background
+    thread, so exporting never blocks a request. When the queue is full the
+    oldest traces are dropped. Subclasses implement write().
+    """
+
+    name = "batch"
+
+    def __init__(self, interval: float = 5.0, max_queue: int = 10000):
+        self._queue: deque = deque(maxlen=max_queue)
+        self._task = PeriodicTask(f"trace-export-{self.name}", self.flush, interval)
+
+    def export(self, trace: Trace) -> None:
+        self._queue.append(trace)
+
+    def flush(self) -> None:
+        batch = []
+        while self._queue:
+            batch.append(self._queue.popleft())
+        if not batch:
+            return
+        try:
+            self.write(batch)
+        except Exception:
+            metrics.counter("trace_export_errors_total", exporter=self.name).inc()
+            raise
+        metrics.counter("traces_exported_total", exporter=self.name).inc(len(batch))
+
+    @abc.abstractmethod
+    def write(self, traces: List[Trace]) -> None:
+        """Write out one batch of traces; an exception counts as an export error."""
+
+    def start(self) -> None:
+        self._task.start()
+
+    def stop(self) -> None:
+        self._task.stop()
+
+
+class FileExporter(BatchExporter):
+    """One JSON line per trace. Each span carries self_ms: its time not spent in child spans."""
+
+    name = "file"
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+
+    def write(self, traces: List[Trace]) -> None:
+        with open(self.path, "a") as file:
+            for trace in traces:
+                file.write(json.dumps(self._serialize(trace), default=str) + "\n")
+
+    @staticmethod
+    def _serialize(trace: Trace) -> dict:
+        child_ms: Dict[str, float] = {}
+        for span in trace.spans:
+            if span.parent_id is not None:
+                child_ms[span.parent_id] = child_ms.get(span.parent_id, 0.0) + span.duration_ms
+        return {
+            "trace_id": trace.trace_id,
+            "spans": [
+                {
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "name": span.name,
+                    "kind": span.kind,
+                    "start_ns": span.start_ns,
+                    "duration_ms": round(span.duration_ms, 3),
+                    "self_ms": round(span.duration_ms - child_ms.get(span.span_id, 0.0), 3),
+                    "attributes": span.attributes,
+                    "error": span.error,
+                }
+                for span in sorted(trace.spans, key=lambda span: span.start_ns)
+            ],
+        }
+
+
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpExporter(BatchExporter):
+    """OTLP/HTTP with JSON encoding, accepted by the OpenTelemetry Collector, Jaeger, Tempo, ..."""
+
+    name = "otlp"
+
+    def __init__(self, endpoint: str, service_name: str, **kwargs):
+        super().__init__(**kwargs)
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+
+    def write(self, traces: List[Trace]) -> None:
+        import httpx
+
+        spans = [
+            {
+                "traceId": trace.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id or "",
+                "name": span.name,
+                "kind": _OTLP_KINDS[span.kind],
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+            }
+            for trace in traces
+            for span in trace.spans
+        ]
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}],
+        }]}
+        httpx.post(self.url, json=payload, timeout=5.0).raise_for_status()
+
+
+def create_exporter() -> Optional[BatchExporter]:
+    if settings.TRACE_EXPORTER == "none":
+        return None
+    if settings.TRACE_EXPORTER == "file":
+        return FileExporter(settings.TRACE_FILE_PATH, interval=settings.TRACE_EXPORT_INTERVAL_SECONDS)
+    if settings.TRACE_EXPORTER == "otlp":
+        return OtlpHttpExporter(
+            settings.TRACE_OTLP_ENDPOINT, settings.PROJECT_NAME, interval=settings.TRACE_EXPORT_INTERVAL_SECONDS
+        )
+    raise ValueError(f"Invalid TRACE_EXPORTER: {settings.TRACE_EXPORTER}. Must be 'none', 'file' or 'otlp'.")
+
+
+trace_exporter = create_exporter()
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import db_session
+
+
+logger = logging.getLogger(__name__)
+
+
+def _open_connection(engine):
+    connection = engine.connect()
+    try:
+        connection.exec_driver_sql("SELECT 1")
+    except Exception:
+        connection.close()
+        raise
+    return connection
+
+
+def warm_database(connections: int) -> None:
+    """
+    Open connections ahead of the first requests.
+
+    PostgreSQL: check out `connections` connections per engine at once (so the
+    handshakes run in parallel), then return them to the pool, which keeps them
+    open. Datastore: create the client and make one lookup, which sets up the
+    gRPC channel and fetches credentials.
+    """
+    if settings.DB_TYPE == "postgresql":
+        from app.core.database import engines
+
+        for engine in engines.values():
+            count = max(1, min(connections, engine.pool.size()))
+            with ThreadPoolExecutor(max_workers=count) as pool:
+                futures = [pool.submit(_open_connection, engine) for _ in range(count)]
+            errors = []
+            for future in futures:
+                try:
+                    future.result().close()
+                except Exception as error:
+                    errors.append(error)
+            if errors:
+                raise errors[0]
+    else:
+        from app.core.firestore_client import get_firestore_client
+
+        client = get_firestore_client()
+        client.get(client.key("Warmup", "warmup"))
+
+    # Repository modules are imported on first use; do that now rather than in a request
+    from app.repositories import get_comment_repository, get_post_repository, get_user_repository
+
+    with db_session() as db:
+        for factory in (get_user_repository, get_post_repository, get_comment_repository):
+            factory(db)
+
+
+def check_partitions() -> None:
+    """Create the partitions rows will be inserted into (PostgreSQL); fails if the current or next month has none."""
+    from app.services.partition_maintenance import maintain_partitions
+
+    maintain_partitions()
+
+
+async def warm_oauth() -> None:
+    """Fetch and cache Google's OpenID configuration and signing keys used by /api/auth."""
+    from app.api.routes.auth import get_oauth
+
+    google = get_oauth().google
+    await google.load_server_metadata()
+    await google.fetch_jwk_set()
+
+
+class Warmup:
+    """
+    Startup warm-up run from the app lifespan. Readiness (GET /api/ready) is
+    reported once every step has finished; a step that fails or times out is
+    logged and left to happen lazily on first use, so it never keeps the
+    instance out of rotation for good.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.steps: Dict[str, dict] = {}
+
+    async def _step(self, name: str, warm: Callable[[], Awaitable[None]]) -> None:
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(warm(), settings.WARMUP_TIMEOUT_SECONDS)
+        except Exception as error:
+            logger.warning("Warm-up step %s failed: %r", name, error)
+            self.steps[name] = {"ok": False, "seconds": round(time.monotonic() - started, 3), "error": repr(error)}
+        else:
+            self.steps[name] = {"ok": True, "seconds": round(time.monotonic() - started, 3)}
+
+    async def run(self) -> None:
+        steps = {
+            "database": lambda: run_in_threadpool(warm_database, settings.WARMUP_DB_CONNECTIONS),
+        }
+        if settings.DB_TYPE == "postgresql":
+            steps["partitions"] = lambda: run_in_threadpool(check_partitions)
+        if not settings.DEV_MODE:
+            steps["oauth"] = warm_oauth
+        started = time.monotonic()
+        await asyncio.gather(*(self._step(name, warm) for name, warm in steps.items()))
+        self.ready = True
+        logger.info("Warm-up finished in %.2fs: %s", time.monotonic() - started, self.steps)
+
+
+warmup = Warmup()
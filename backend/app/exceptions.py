@@ -17,3 +17,9 @@ class ValidationError(HTTPException):
     """Raised when validation fails."""
     def __init__(self, detail: str):
         super().__init__(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+
+class GoneError(HTTPException):
+    """Raised when a resource (or state a client refers to) no longer exists."""
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_410_GONE, detail=detail)
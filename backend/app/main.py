@@ -1,17 +1,78 @@
+import asyncio
+from contextlib import asynccontextmanager
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.sessions import SessionMiddleware
 from app.core.config import settings
-from app.api.routes import health, posts, comments, auth
+from app.api.routes import health, posts, comments, auth, internal, users, timeline, notifications
+from app.core.client_identity import ClientIdentityMiddleware
+from app.core.invalidation import invalidation_bus
+from app.core.rate_limit import RateLimitMiddleware, create_bucket_store, parse_rules
+from app.core.scoped_middleware import PathScopedMiddleware
+from app.core.tracing import TracingMiddleware, trace_exporter
+from app.core.warmup import warmup
+from app.services.changes_service import tombstone_pruner
+from app.services.feed_snapshot import feed_snapshot
+from app.services.notification_writer import notification_writer
+from app.services.partition_maintenance import partition_maintainer
+from app.services.trending import trending
+from app.services.view_counter import view_counter
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync routes run in anyio's threadpool; size it to what the DB pool can serve
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+    if trace_exporter is not None:
+        trace_exporter.start()
+    # Warm up in the background; /api/ready reports 503 until it is done
+    warmup_task = asyncio.create_task(warmup.run())
+    invalidation_bus.start()
+    view_counter.start()
+    notification_writer.start()
+    await run_in_threadpool(trending.start)
+    tombstone_pruner.start()
+    if settings.FEED_SNAPSHOT_ENABLED:
+        feed_snapshot.start()
+    if settings.DB_TYPE == "postgresql":
+        # Its first run is the "partitions" warm-up step, which reports missing partitions on /api/ready
+        partition_maintainer.start()
+    yield
+    warmup_task.cancel()
+    # Flush pending view counts (which also feed trending) before the final checkpoint
+    await run_in_threadpool(view_counter.stop)
+    await run_in_threadpool(notification_writer.stop)
+    await run_in_threadpool(trending.stop)
+    await run_in_threadpool(tombstone_pruner.stop)
+    await run_in_threadpool(feed_snapshot.stop)
+    await run_in_threadpool(partition_maintainer.stop)
+    await run_in_threadpool(invalidation_bus.stop)
+    if trace_exporter is not None:
+        await run_in_threadpool(trace_exporter.stop)
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    description=settings.DESCRIPTION
+    description=settings.DESCRIPTION,
+    lifespan=lifespan
+)
+
+# The session only carries OAuth state between /api/auth/login and /api/auth/callback;
+# other requests neither decode nor receive the session cookie
+app.add_middleware(
+    PathScopedMiddleware,
+    prefix="/api/auth",
+    middleware=SessionMiddleware,
+    secret_key=settings.SECRET_KEY,
+    path="/api/auth",
 )
 
-# Add session middleware for OAuth
-app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
+# Rate limiting sits inside CORS so 429 responses still carry CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, rules=parse_rules(settings.RATE_LIMITS), store=create_bucket_store())
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,12 +80,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=settings.CORS_MAX_AGE_SECONDS,
 )
 
+# Identify the client (token subject / address) for read-your-writes routing
+app.add_middleware(ClientIdentityMiddleware)
+
+# Outermost, so the root span of a sampled request covers every other middleware
+if trace_exporter is not None:
+    app.add_middleware(TracingMiddleware, sample_rate=settings.TRACE_SAMPLE_RATE, exporter=trace_exporter)
+
 app.include_router(health.router, prefix="/api", tags=["health"])
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(posts.router, prefix="/api/posts", tags=["posts"])
 app.include_router(comments.router, prefix="/api", tags=["comments"])
+app.include_router(users.router, prefix="/api/users", tags=["users"])
+app.include_router(timeline.router, prefix="/api/timeline", tags=["timeline"])
+app.include_router(notifications.router, prefix="/api/notifications", tags=["notifications"])
+app.include_router(internal.router, prefix="/api/internal", tags=["internal"])
 
 @app.get("/")
 async def root():
@@ -2,5 +2,10 @@ from app.models.base import Base
 from app.models.post import Post
 from app.models.comment import Comment
 from app.models.user import User
+from app.models.trending_score import TrendingScore
+from app.models.follow import Follow
+from app.models.timeline_entry import TimelineEntry
+from app.models.tombstone import Tombstone
+from app.models.notification import Notification
 
-__all__ = ["Base", "Post", "Comment", "User"]
+__all__ = ["Base", "Post", "Comment", "User", "TrendingScore", "Follow", "TimelineEntry", "Tombstone", "Notification"]
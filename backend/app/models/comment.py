@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
@@ -7,15 +7,19 @@ from app.models.base import Base
 class Comment(Base):
     __tablename__ = "comments"
 
-    # Primary Key
-    id = Column(Integer, primary_key=True, index=True)
+    # Primary Key: (id, created_at), as the key of a partitioned table must include the partition key
+    id = Column(Integer, primary_key=True, autoincrement=True)
 
-    # Foreign Key
-    post_id = Column(
-        Integer,
-        ForeignKey("posts.id", ondelete="CASCADE"),
-        nullable=False
-    )
+    # Post (not a foreign key: posts is partitioned; comments are deleted with their post by the ORM cascade)
+    post_id = Column(Integer, nullable=False)
+
+    # Thread: the comment replied to (None for a top-level comment) and the materialized path
+    # that lists a post's comments depth-first (see app.core.threads). Byte-wise ("C") collation,
+    # so the index order is the path order and a subtree is one range
+    parent_id = Column(Integer, nullable=True)
+    path = Column(String(255, collation="C"), nullable=False)
+    depth = Column(Integer, nullable=False, default=0, server_default="0")
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")  # Direct replies
 
     # Content
     content = Column(Text, nullable=False)
@@ -27,6 +31,7 @@ class Comment(Base):
     # Timestamps
     created_at = Column(
         DateTime(timezone=True),
+        primary_key=True,
         server_default=func.now(),
         nullable=False
     )
@@ -38,12 +43,15 @@ class Comment(Base):
     )
 
     # Relationships
-    post = relationship("Post", back_populates="comments")
+    post = relationship("Post", primaryjoin="foreign(Comment.post_id) == Post.id", back_populates="comments")
 
     # Indexes
     __table_args__ = (
         Index('idx_comments_post_id_created_at', 'post_id', 'created_at'),
-        Index('idx_comments_google_user_id', 'google_user_id'),
+        Index('idx_comments_post_id_path', 'post_id', 'path'),  # Threads and subtrees in path order
+        Index('idx_comments_google_user_id_created_at', 'google_user_id', 'created_at'),
+        Index('idx_comments_updated_at', 'updated_at'),  # Delta sync: changes since a point in time
+        {'postgresql_partition_by': 'RANGE (created_at)'},  # Monthly partitions
     )
 
     def __repr__(self):
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+
+class Follow(Base):
+    """
+    follower_id follows followee_id.
+
+    fan_out_on_read marks edges to authors with many followers: their posts are
+    not copied into the follower's timeline but merged in when it is read.
+    """
+    __tablename__ = "follows"
+
+    # Primary Key (one row per edge)
+    follower_id = Column(
+        String(255),
+        ForeignKey("users.google_user_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    followee_id = Column(
+        String(255),
+        ForeignKey("users.google_user_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    fan_out_on_read = Column(Boolean, nullable=False, default=False, server_default=text("false"))
+
+    # Timestamps
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    # Partial indexes: each side only scans the edges it acts on
+    __table_args__ = (
+        # Fan-out on write: followers to copy a new post to
+        Index('idx_follows_followee_id_fan_out_on_write', 'followee_id', postgresql_where=text("NOT fan_out_on_read")),
+        # Timeline read: followed authors to merge in (empty for most users)
+        Index('idx_follows_follower_id_fan_out_on_read', 'follower_id', postgresql_where=text("fan_out_on_read")),
+    )
+
+    def __repr__(self):
+        return f"<Follow(follower_id={self.follower_id}, followee_id={self.followee_id})>"
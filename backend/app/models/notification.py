@@ -0,0 +1,44 @@
+from sqlalchemy import BigInteger, Boolean, Column, Integer, String, DateTime, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+
+class Notification(Base):
+    """An entry in a user's notifications inbox, e.g. a post or comment that @mentions them."""
+    __tablename__ = "notifications"
+
+    # Primary Key: increases with every write, so inbox pages are ordered (and paged) by id
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    user_id = Column(
+        String(255),
+        ForeignKey("users.google_user_id", ondelete="CASCADE"),
+        nullable=False
+    )  # The recipient
+    kind = Column(String(20), nullable=False)  # "mention"
+
+    # Who did it, and where
+    actor_id = Column(String(255), nullable=False)
+    actor_name = Column(String(100), nullable=False)
+    post_id = Column(Integer, nullable=False)  # Not a foreign key: posts is partitioned
+    comment_id = Column(Integer, nullable=True)  # None for a mention in the post itself
+
+    read = Column(Boolean, nullable=False, default=False, server_default=text("false"))
+
+    # Timestamps
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    # Indexes
+    __table_args__ = (
+        # Inbox pages, newest first
+        Index('idx_notifications_user_id_id', 'user_id', 'id'),
+        # Mark-as-read only touches unread rows (few, compared to a long-lived inbox)
+        Index('idx_notifications_user_id_unread', 'user_id', 'id', postgresql_where=text("NOT read")),
+    )
+
+    def __repr__(self):
+        return f"<Notification(id={self.id}, user_id={self.user_id}, kind={self.kind})>"
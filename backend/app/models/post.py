@@ -7,8 +7,9 @@ from app.models.base import Base
 class Post(Base):
     __tablename__ = "posts"
 
-    # Primary Key
-    id = Column(Integer, primary_key=True, index=True)
+    # Primary Key: (id, created_at), as the key of a partitioned table must include the partition key.
+    # ids come from the sequence alone and are unique by themselves
+    id = Column(Integer, primary_key=True, autoincrement=True)
 
     # Content
     subject = Column(String(255), nullable=False)
@@ -18,9 +19,13 @@ class Post(Base):
     google_user_id = Column(String(255), nullable=False)
     author_name = Column(String(100), nullable=False)
 
+    # Counters (view_count is written in batches by the view counter)
+    view_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Timestamps
     created_at = Column(
         DateTime(timezone=True),
+        primary_key=True,
         server_default=func.now(),
         nullable=False
     )
@@ -31,9 +36,10 @@ class Post(Base):
         nullable=False
     )
 
-    # Relationships
+    # Relationships (no foreign key: posts is partitioned, see app.core.partitions)
     comments = relationship(
         "Comment",
+        primaryjoin="Post.id == foreign(Comment.post_id)",
         back_populates="post",
         cascade="all, delete-orphan",  # Delete comments when post is deleted
         lazy="selectin"  # Eager loading for better performance
@@ -42,7 +48,9 @@ class Post(Base):
     # Indexes
     __table_args__ = (
         Index('idx_posts_created_at', 'created_at'),
-        Index('idx_posts_google_user_id', 'google_user_id'),
+        Index('idx_posts_google_user_id_created_at', 'google_user_id', 'created_at'),
+        Index('idx_posts_updated_at', 'updated_at'),  # Delta sync: changes since a point in time
+        {'postgresql_partition_by': 'RANGE (created_at)'},  # Monthly partitions
     )
 
     def __repr__(self):
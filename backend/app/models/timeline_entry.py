@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.models.base import Base
+
+
+class TimelineEntry(Base):
+    """A post copied into a follower's home timeline (fan-out on write)."""
+    __tablename__ = "timeline_entries"
+
+    # Primary Key: a timeline page is one range scan of this index
+    user_id = Column(
+        String(255),
+        ForeignKey("users.google_user_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    created_at = Column(DateTime(timezone=True), primary_key=True)  # The post's created_at
+    post_id = Column(Integer, primary_key=True)  # Not a foreign key: posts is partitioned
+
+    author_id = Column(String(255), nullable=False)
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_timeline_entries_post_id', 'post_id'),  # For deleting a post's entries with the post
+    )
+
+    def __repr__(self):
+        return f"<TimelineEntry(user_id={self.user_id}, post_id={self.post_id})>"
@@ -0,0 +1,29 @@
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+
+class Tombstone(Base):
+    """A deleted post or comment, kept so delta sync (GET /api/posts/changes) can report the deletion."""
+    __tablename__ = "tombstones"
+
+    # Primary Key
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    entity_type = Column(String(20), nullable=False)  # "post" or "comment"
+    entity_id = Column(Integer, nullable=False)
+    post_id = Column(Integer, nullable=False)  # The comment's post; for a post, the post itself
+
+    deleted_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_tombstones_deleted_at', 'deleted_at'),
+    )
+
+    def __repr__(self):
+        return f"<Tombstone(entity_type={self.entity_type}, entity_id={self.entity_id})>"
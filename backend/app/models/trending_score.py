@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Float, DateTime
+from app.models.base import Base
+
+
+class TrendingScore(Base):
+    """Checkpoint of the in-memory trending ranking (see app.services.trending)."""
+    __tablename__ = "trending_scores"
+
+    # Primary Key (one row per ranked post; not a foreign key, posts is partitioned)
+    post_id = Column(Integer, primary_key=True)
+
+    # Decayed score as of scored_at
+    score = Column(Float, nullable=False)
+    scored_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<TrendingScore(post_id={self.post_id}, score={self.score})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Index
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.sql import func
 from app.models.base import Base
 
@@ -14,6 +14,10 @@ class User(Base):
     name = Column(String(100), nullable=False)
     picture = Column(String(500), nullable=True)  # Google profile picture URL
 
+    # Counters (maintained by follow/unfollow, and by the notification writer/mark-as-read)
+    follower_count = Column(Integer, nullable=False, default=0, server_default="0")
+    unread_notification_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Timestamps
     created_at = Column(
         DateTime(timezone=True),
@@ -30,6 +34,7 @@ class User(Base):
     # Indexes
     __table_args__ = (
         Index('idx_users_email', 'email'),
+        Index('idx_users_name', 'name'),  # Resolving @mentions (app.core.mentions)
     )
 
     def __repr__(self):
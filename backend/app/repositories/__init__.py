@@ -1,45 +1,89 @@
-from app.repositories.post_repository import PostRepository
-from app.repositories.comment_repository import CommentRepository
-from app.repositories.user_repository import UserRepository
-from app.repositories.firestore_post_repository import FirestorePostRepository
-from app.repositories.firestore_comment_repository import FirestoreCommentRepository
-from app.repositories.firestore_user_repository import FirestoreUserRepository
-from app.repositories.datastore_post_repository import DatastorePostRepository
-from app.repositories.datastore_comment_repository import DatastoreCommentRepository
-from app.repositories.datastore_user_repository import DatastoreUserRepository
+from importlib import import_module
 from app.core.config import settings
 
-__all__ = ["PostRepository", "CommentRepository", "UserRepository",
-           "FirestorePostRepository", "FirestoreCommentRepository", "FirestoreUserRepository",
-           "DatastorePostRepository", "DatastoreCommentRepository", "DatastoreUserRepository",
-           "get_user_repository", "get_post_repository", "get_comment_repository"]
+# Repository classes are imported on first use, so a process only loads the
+# client library of the backend selected by DB_TYPE (SQLAlchemy or google-cloud).
+_REPOSITORY_MODULES = {
+    "PostRepository": "app.repositories.post_repository",
+    "CommentRepository": "app.repositories.comment_repository",
+    "UserRepository": "app.repositories.user_repository",
+    "TrendingRepository": "app.repositories.trending_repository",
+    "FollowRepository": "app.repositories.follow_repository",
+    "TimelineRepository": "app.repositories.timeline_repository",
+    "TombstoneRepository": "app.repositories.tombstone_repository",
+    "NotificationRepository": "app.repositories.notification_repository",
+    "PartitionRepository": "app.repositories.partition_repository",
+    "FirestorePostRepository": "app.repositories.firestore_post_repository",
+    "FirestoreCommentRepository": "app.repositories.firestore_comment_repository",
+    "FirestoreUserRepository": "app.repositories.firestore_user_repository",
+    "DatastorePostRepository": "app.repositories.datastore_post_repository",
+    "DatastoreCommentRepository": "app.repositories.datastore_comment_repository",
+    "DatastoreUserRepository": "app.repositories.datastore_user_repository",
+    "DatastoreTrendingRepository": "app.repositories.datastore_trending_repository",
+    "DatastoreFollowRepository": "app.repositories.datastore_follow_repository",
+    "DatastoreTimelineRepository": "app.repositories.datastore_timeline_repository",
+    "DatastoreTombstoneRepository": "app.repositories.datastore_tombstone_repository",
+    "DatastoreNotificationRepository": "app.repositories.datastore_notification_repository",
+}
 
+__all__ = list(_REPOSITORY_MODULES) + [
+    "get_user_repository", "get_post_repository", "get_comment_repository",
+    "get_trending_repository", "get_follow_repository", "get_timeline_repository",
+    "get_tombstone_repository", "get_notification_repository",
+]
 
-def get_user_repository(db):
-    """Factory function to get the appropriate user repository based on DB_TYPE."""
+
+def __getattr__(name):
+    module = _REPOSITORY_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module), name)
+
+
+def _get_repository(postgresql_class: str, firestore_class: str, db):
     if settings.DB_TYPE == "postgresql":
-        return UserRepository(db)
+        return __getattr__(postgresql_class)(db)
     elif settings.DB_TYPE == "firestore":
-        return DatastoreUserRepository(db)
+        return __getattr__(firestore_class)(db)
     else:
         raise ValueError(f"Unknown DB_TYPE: {settings.DB_TYPE}")
 
 
+def get_user_repository(db):
+    """Factory function to get the appropriate user repository based on DB_TYPE."""
+    return _get_repository("UserRepository", "DatastoreUserRepository", db)
+
+
 def get_post_repository(db):
     """Factory function to get the appropriate post repository based on DB_TYPE."""
-    if settings.DB_TYPE == "postgresql":
-        return PostRepository(db)
-    elif settings.DB_TYPE == "firestore":
-        return DatastorePostRepository(db)
-    else:
-        raise ValueError(f"Unknown DB_TYPE: {settings.DB_TYPE}")
+    return _get_repository("PostRepository", "DatastorePostRepository", db)
 
 
 def get_comment_repository(db):
     """Factory function to get the appropriate comment repository based on DB_TYPE."""
-    if settings.DB_TYPE == "postgresql":
-        return CommentRepository(db)
-    elif settings.DB_TYPE == "firestore":
-        return DatastoreCommentRepository(db)
-    else:
-        raise ValueError(f"Unknown DB_TYPE: {settings.DB_TYPE}")
+    return _get_repository("CommentRepository", "DatastoreCommentRepository", db)
+
+
+def get_trending_repository(db):
+    """Factory function to get the appropriate trending checkpoint repository based on DB_TYPE."""
+    return _get_repository("TrendingRepository", "DatastoreTrendingRepository", db)
+
+
+def get_follow_repository(db):
+    """Factory function to get the appropriate follow graph repository based on DB_TYPE."""
+    return _get_repository("FollowRepository", "DatastoreFollowRepository", db)
+
+
+def get_timeline_repository(db):
+    """Factory function to get the appropriate home timeline repository based on DB_TYPE."""
+    return _get_repository("TimelineRepository", "DatastoreTimelineRepository", db)
+
+
+def get_tombstone_repository(db):
+    """Factory function to get the appropriate tombstone repository based on DB_TYPE."""
+    return _get_repository("TombstoneRepository", "DatastoreTombstoneRepository", db)
+
+
+def get_notification_repository(db):
+    """Factory function to get the appropriate notification inbox repository based on DB_TYPE."""
+    return _get_repository("NotificationRepository", "DatastoreNotificationRepository", db)
@@ -1,53 +1,192 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional
+from sqlalchemy import Select, bindparam, delete, func, select, text, update
+from sqlalchemy.orm import Session, load_only
 from app.models.comment import Comment
+from app.models.tombstone import Tombstone
+from app.core.threads import SUBTREE_END, child_path, sql_segment, subtree_end
+from app.core.tracing import traced
 
+# Hot queries, built once with bound parameters (see post_repository)
+_BY_ID = select(Comment).where(Comment.id == bindparam("comment_id")).limit(1)
+# An index-only count on idx_comments_post_id_created_at, not a count over a subquery of whole rows
+_COUNT_BY_POST = select(func.count()).select_from(Comment).where(Comment.post_id == bindparam("post_id"))
+_COUNT_BY_POSTS = (
+    select(Comment.post_id, func.count())
+    .where(Comment.post_id.in_(bindparam("post_ids", expanding=True)))
+    .group_by(Comment.post_id)
+)
 
+# The id is taken before the INSERT: it is the last segment of the comment's own path
+_NEXT_ID = text("SELECT nextval('comments_id_seq')")
+
+# Comments of a post (or below one comment) in path order after a cursor: a range scan of
+# idx_comments_post_id_path. No reply is older than its post or parent, so `since` (their
+# created_at) prunes the partitions before it
+_THREAD = (
+    select(Comment)
+    .where(
+        Comment.post_id == bindparam("post_id"),
+        Comment.path > bindparam("after"),
+        Comment.path < bindparam("end"),
+        Comment.created_at >= bindparam("since"),
+    )
+    .order_by(Comment.path)
+    .limit(bindparam("limit"))
+)
+
+# The replies below a comment (the comment itself is deleted through the session)
+_DELETE_REPLIES = (
+    delete(Comment)
+    .where(
+        Comment.post_id == bindparam("post_id"),
+        Comment.path > bindparam("root"),
+        Comment.path < bindparam("end"),
+        Comment.created_at >= bindparam("since"),
+    )
+    .returning(Comment.id)
+    .execution_options(synchronize_session=False)
+)
+
+# Keeps updated_at: a reply is not an edit of the comment replied to. The parent is not newer
+# than any reply, so `not_after` (a reply's or the parent's created_at) prunes later partitions
+_ADD_REPLIES = (
+    update(Comment)
+    .where(Comment.id == bindparam("reply_to"), Comment.created_at <= bindparam("not_after"))
+    .values(reply_count=Comment.reply_count + bindparam("delta"), updated_at=Comment.updated_at)
+    .execution_options(synchronize_session=False)
+)
+
+
+@lru_cache(maxsize=128)
+def _list_statement(fields: Optional[FrozenSet[str]]) -> Select:
+    """Statement for list pages; with `fields`, only those columns (plus id) are selected."""
+    statement = select(Comment)
+    if fields is not None:
+        columns = [getattr(Comment, name) for name in sorted(fields) if name in Comment.__table__.c]
+        statement = statement.options(load_only(Comment.id, *columns))
+    return statement
+
+
+@lru_cache(maxsize=128)
+def _by_post_statement(fields: Optional[FrozenSet[str]]) -> Select:
+    return (
+        _list_statement(fields)
+        .where(Comment.post_id == bindparam("post_id"))
+        .order_by(Comment.created_at.asc())  # Oldest first for comments
+        .offset(bindparam("skip"))
+        .limit(bindparam("limit"))
+    )
+
+
+@lru_cache(maxsize=128)
+def _by_user_statement(fields: Optional[FrozenSet[str]]) -> Select:
+    return (
+        _list_statement(fields)
+        .where(Comment.google_user_id == bindparam("google_user_id"))
+        .order_by(Comment.created_at.desc())
+        .offset(bindparam("skip"))
+        .limit(bindparam("limit"))
+    )
+
+
+def _fields_key(fields: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+    return None if fields is None else frozenset(fields)
+
+
+@traced("repository")
 class CommentRepository:
     """Repository for Comment database operations. Each method performs ONE database operation."""
 
     def __init__(self, db: Session):
         self.db = db
 
-    def create(self, post_id: int, content: str, google_user_id: str, author_name: str) -> Comment:
-        """Create a new comment in the database."""
+    def create(self, post_id: int, content: str, google_user_id: str, author_name: str,
+               parent: Optional[Comment] = None) -> Comment:
+        """
+        Create a new comment in the database, as a reply to `parent` when given; the parent's
+        reply_count is incremented in the same transaction.
+        """
+        comment_id = self.db.execute(_NEXT_ID).scalar_one()
         comment = Comment(
+            id=comment_id,
             post_id=post_id,
+            parent_id=parent.id if parent is not None else None,
+            path=child_path(parent.path if parent is not None else None, sql_segment(comment_id)),
+            depth=parent.depth + 1 if parent is not None else 0,
             content=content,
             google_user_id=google_user_id,
             author_name=author_name
         )
         self.db.add(comment)
+        if parent is not None:
+            self.db.execute(_ADD_REPLIES, {"reply_to": parent.id, "not_after": parent.created_at, "delta": 1})
         self.db.commit()
         self.db.refresh(comment)
         return comment
 
     def get_by_id(self, comment_id: int) -> Optional[Comment]:
         """Get a single comment by ID."""
-        return self.db.query(Comment).filter(Comment.id == comment_id).first()
+        return self.db.scalars(_BY_ID, {"comment_id": comment_id}).first()
 
-    def get_by_post_id(self, post_id: int, skip: int = 0, limit: int = 100) -> List[Comment]:
+    def get_by_post_id(self, post_id: int, skip: int = 0, limit: int = 100,
+                       fields: Optional[Iterable[str]] = None) -> List[Comment]:
         """Get all comments for a specific post."""
-        return (
-            self.db.query(Comment)
-            .filter(Comment.post_id == post_id)
-            .order_by(Comment.created_at.asc())  # Oldest first for comments
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        return self.db.scalars(
+            _by_post_statement(_fields_key(fields)), {"post_id": post_id, "skip": skip, "limit": limit}
+        ).all()
 
-    def get_by_user_id(self, google_user_id: str, skip: int = 0, limit: int = 100) -> List[Comment]:
+    def get_by_user_id(self, google_user_id: str, skip: int = 0, limit: int = 100,
+                       fields: Optional[Iterable[str]] = None) -> List[Comment]:
         """Get all comments by a specific user."""
+        return self.db.scalars(
+            _by_user_statement(_fields_key(fields)),
+            {"google_user_id": google_user_id, "skip": skip, "limit": limit},
+        ).all()
+
+    def get_thread(self, post_id: int, since: datetime, root_path: Optional[str] = None,
+                   after: Optional[str] = None, limit: int = 100) -> List[Comment]:
+        """
+        A page of a post's comments in path order (every thread depth-first), after the path
+        `after`. With `root_path`, only the replies below that comment, at any depth. `since`
+        is the created_at of the post (or of the root comment).
+        """
+        return self.db.scalars(_THREAD, {
+            "post_id": post_id,
+            "after": max(root_path or "", after or ""),
+            "end": subtree_end(root_path) if root_path else SUBTREE_END,
+            "since": since,
+            "limit": limit,
+        }).all()
+
+    def get_changed(self, since: datetime, until: datetime, limit: int, after_id: Optional[str] = None) -> List[Comment]:
+        """
+        Comments created or updated in (since, until] in (updated_at, id) order (a range scan of
+        idx_comments_updated_at); with `after_id`, also the ones updated at `since` with a greater
+        id. Raises ValueError for a malformed `after_id`.
+        """
+        changed = Comment.updated_at > since
+        if after_id is not None:
+            changed = (Comment.updated_at >= since) & (changed | (Comment.id > int(after_id)))
         return (
             self.db.query(Comment)
-            .filter(Comment.google_user_id == google_user_id)
-            .order_by(Comment.created_at.desc())
-            .offset(skip)
+            .filter(changed, Comment.updated_at <= until)
+            .order_by(Comment.updated_at.asc(), Comment.id.asc())
             .limit(limit)
             .all()
         )
 
+    def iter_all(self, google_user_id: Optional[str] = None, batch_size: int = 1000) -> Iterator[Comment]:
+        """
+        All comments (of one user), oldest first, streamed from a server-side cursor `batch_size`
+        rows at a time (in created_at order, which idx_comments_google_user_id_created_at serves).
+        """
+        query = self.db.query(Comment)
+        if google_user_id is not None:
+            query = query.filter(Comment.google_user_id == google_user_id)
+        return iter(query.order_by(Comment.created_at.asc()).yield_per(batch_size))
+
     def update(self, comment: Comment, content: str) -> Comment:
         """Update a comment's content."""
         comment.content = content
@@ -57,9 +196,33 @@ class CommentRepository:
 
     def count_by_post_id(self, post_id: int) -> int:
         """Count comments for a specific post."""
-        return self.db.query(Comment).filter(Comment.post_id == post_id).count()
+        return self.db.scalars(_COUNT_BY_POST, {"post_id": post_id}).one()
 
-    def delete(self, comment: Comment) -> None:
-        """Delete a comment from the database."""
+    def count_by_post_ids(self, post_ids: Iterable[int]) -> Dict[int, int]:
+        """Count the comments of several posts with one grouped count. Posts without comments are left out."""
+        post_ids = list(post_ids)
+        if not post_ids:
+            return {}
+        return dict(self.db.execute(_COUNT_BY_POSTS, {"post_ids": post_ids}).all())
+
+    def delete(self, comment: Comment) -> int:
+        """
+        Delete a comment and every reply below it (one range of idx_comments_post_id_path),
+        leaving tombstones for delta sync and decrementing the parent's reply_count, in one
+        transaction. Returns the number of comments deleted.
+        """
+        if comment.parent_id is not None:
+            self.db.execute(_ADD_REPLIES, {"reply_to": comment.parent_id, "not_after": comment.created_at, "delta": -1})
+        deleted = self.db.execute(_DELETE_REPLIES, {
+            "post_id": comment.post_id,
+            "root": comment.path,
+            "end": subtree_end(comment.path),
+            "since": comment.created_at,
+        }).scalars().all()
+        deleted.append(comment.id)
+        self.db.add_all(
+            Tombstone(entity_type="comment", entity_id=comment_id, post_id=comment.post_id) for comment_id in deleted
+        )
         self.db.delete(comment)
         self.db.commit()
+        return len(deleted)
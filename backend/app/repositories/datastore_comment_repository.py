@@ -1,22 +1,22 @@
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from google.cloud import datastore
 from datetime import datetime
 import uuid
+from app.core.threads import SUBTREE_END, child_path, datastore_segment, subtree_end
+from app.core.tracing import traced
+from app.repositories.datastore_tombstone_repository import DatastoreTombstoneRepository, fetch_changed
+from app.repositories.entity_models import CommentModel, comment_converter
 
 
-class CommentModel:
-    """Simple model class to mimic SQLAlchemy Comment model."""
-    def __init__(self, id: str, post_id: str, google_user_id: str, author_name: str, content: str,
-                 created_at: datetime, updated_at: datetime):
-        self.id = id
-        self.post_id = post_id
-        self.google_user_id = google_user_id
-        self.author_name = author_name
-        self.content = content
-        self.created_at = created_at
-        self.updated_at = updated_at
+# Properties every Comment entity has, minus content. Each query shape projecting
+# these needs its composite index in index.yaml.
+SUMMARY_PROPERTIES = ('post_id', 'author_name', 'google_user_id', 'created_at', 'updated_at')
 
+# Entities per commit: a commit takes at most 500 mutations, and each deleted comment adds a tombstone
+DELETE_BATCH = 250
 
+
+@traced("repository")
 class DatastoreCommentRepository:
     """Repository for Comment Datastore operations."""
 
@@ -24,31 +24,44 @@ class DatastoreCommentRepository:
         self.db = db
         self.kind = 'Comment'
 
-    def create(self, post_id: str, google_user_id: str, author_name: str, content: str) -> CommentModel:
-        """Create a new comment in Datastore."""
+    def create(self, post_id: str, google_user_id: str, author_name: str, content: str,
+               parent: Optional[CommentModel] = None) -> CommentModel:
+        """
+        Create a new comment in Datastore, as a reply to `parent` when given; the parent's
+        reply_count is incremented in the same transaction.
+        """
         now = datetime.utcnow()
         comment_id = str(uuid.uuid4())
         key = self.db.key(self.kind, comment_id)
         entity = datastore.Entity(key=key)
+        parent_path = None
+        if parent is not None:
+            # A comment written before threads gets its path when first replied to
+            parent_path = parent.path or datastore_segment(parent.created_at, parent.id)
         entity.update({
             'post_id': post_id,
+            'parent_id': parent.id if parent is not None else None,
+            'path': child_path(parent_path, datastore_segment(now, comment_id)),
+            'depth': parent.depth + 1 if parent is not None else 0,
+            'reply_count': 0,
             'google_user_id': google_user_id,
             'author_name': author_name,
             'content': content,
             'created_at': now,
             'updated_at': now
         })
-        self.db.put(entity)
-
-        return CommentModel(
-            id=comment_id,
-            post_id=post_id,
-            google_user_id=google_user_id,
-            author_name=author_name,
-            content=content,
-            created_at=now,
-            updated_at=now
-        )
+        if parent is None:
+            self.db.put(entity)
+            return comment_converter.from_entity(entity)
+
+        with self.db.transaction():
+            parent_entity = self.db.get(self.db.key(self.kind, parent.id))
+            if parent_entity is not None:
+                parent_entity['path'] = parent_path
+                parent_entity['reply_count'] = parent_entity.get('reply_count', 0) + 1
+                self.db.put(parent_entity)
+            self.db.put(entity)
+        return comment_converter.from_entity(entity)
 
     def get_by_id(self, comment_id: str) -> Optional[CommentModel]:
         """Get a comment by ID."""
@@ -58,77 +71,157 @@ class DatastoreCommentRepository:
         if not entity:
             return None
 
-        return CommentModel(
-            id=comment_id,
-            post_id=entity['post_id'],
-            google_user_id=entity['google_user_id'],
-            author_name=entity['author_name'],
-            content=entity['content'],
-            created_at=entity['created_at'],
-            updated_at=entity['updated_at']
-        )
+        return comment_converter.from_entity(entity)
+
+    @staticmethod
+    def _summary_projection(fields: Optional[Iterable[str]], exclude: tuple = ()) -> Optional[List[str]]:
+        """The summary projection when every requested field is covered by it, else None."""
+        if fields is None or not set(fields) - {'id'} <= set(SUMMARY_PROPERTIES):
+            return None
+        return [name for name in SUMMARY_PROPERTIES if name not in exclude]
 
-    def get_by_post_id(self, post_id: str, skip: int = 0, limit: int = 100) -> List[CommentModel]:
+    def get_by_post_id(self, post_id: str, skip: int = 0, limit: int = 100,
+                       fields: Optional[Iterable[str]] = None) -> List[CommentModel]:
         """Get comments for a post ordered by created_at ascending."""
         query = self.db.query(kind=self.kind)
         query.add_filter('post_id', '=', post_id)
         query.order = ['created_at']
-        results = list(query.fetch(limit=limit, offset=skip))
-
-        return [
-            CommentModel(
-                id=entity.key.name,
-                post_id=entity['post_id'],
-                google_user_id=entity['google_user_id'],
-                author_name=entity['author_name'],
-                content=entity['content'],
-                created_at=entity['created_at'],
-                updated_at=entity['updated_at']
-            )
-            for entity in results
-        ]
-
-    def get_by_user_id(self, google_user_id: str, skip: int = 0, limit: int = 100) -> List[CommentModel]:
+        # A property used in an equality filter cannot be projected; its value is known anyway
+        projection = self._summary_projection(fields, exclude=('post_id',))
+        if projection:
+            query.projection = projection
+            return comment_converter.from_entities(query.fetch(limit=limit, offset=skip), post_id=post_id)
+        return comment_converter.from_entities(query.fetch(limit=limit, offset=skip))
+
+    def get_by_user_id(self, google_user_id: str, skip: int = 0, limit: int = 100,
+                       fields: Optional[Iterable[str]] = None) -> List[CommentModel]:
         """Get comments by user ordered by created_at descending."""
         query = self.db.query(kind=self.kind)
         query.add_filter('google_user_id', '=', google_user_id)
         query.order = ['-created_at']
-        results = list(query.fetch(limit=limit, offset=skip))
-
-        return [
-            CommentModel(
-                id=entity.key.name,
-                post_id=entity['post_id'],
-                google_user_id=entity['google_user_id'],
-                author_name=entity['author_name'],
-                content=entity['content'],
-                created_at=entity['created_at'],
-                updated_at=entity['updated_at']
-            )
-            for entity in results
-        ]
+        projection = self._summary_projection(fields, exclude=('google_user_id',))
+        if projection:
+            query.projection = projection
+            return comment_converter.from_entities(query.fetch(limit=limit, offset=skip), google_user_id=google_user_id)
+        return comment_converter.from_entities(query.fetch(limit=limit, offset=skip))
+
+    def get_thread(self, post_id: str, since: datetime, root_path: Optional[str] = None,
+                   after: Optional[str] = None, limit: int = 100) -> List[CommentModel]:
+        """
+        A page of a post's comments in path order (every thread depth-first), after the path
+        `after`. With `root_path`, only the replies below that comment, at any depth. One range
+        of the (post_id, path) index; `since` is not needed here (no partitions).
+        """
+        query = self.db.query(kind=self.kind)
+        query.add_filter('post_id', '=', post_id)
+        query.add_filter('path', '>', max(root_path or '', after or ''))
+        query.add_filter('path', '<', subtree_end(root_path) if root_path else SUBTREE_END)
+        query.order = ['path']
+        return comment_converter.from_entities(query.fetch(limit=limit))
+
+    def backfill_paths(self, batch_size: int = 500) -> int:
+        """
+        Give the comments written before threads (no path property, so left out of the
+        (post_id, path) index) the path of a top-level comment, as `create` does when one
+        is first replied to. Scans every comment in key order, `batch_size` at a time;
+        each batch is re-read and written in a transaction, so concurrent replies and
+        edits are kept. Returns the number of comments updated.
+        """
+        query = self.db.query(kind=self.kind)
+        cursor = None
+        updated = 0
+        while True:
+            iterator = query.fetch(start_cursor=cursor, limit=batch_size)
+            batch = list(iterator)
+            keys = [entity.key for entity in batch if entity.get('path') is None]
+            if keys:
+                with self.db.transaction():
+                    entities = [entity for entity in self.db.get_multi(keys) if entity.get('path') is None]
+                    for entity in entities:
+                        entity.update({
+                            'parent_id': None,
+                            'path': datastore_segment(entity['created_at'], entity.key.name),
+                            'depth': 0,
+                            'reply_count': entity.get('reply_count', 0),
+                        })
+                    self.db.put_multi(entities)
+                updated += len(entities)
+            cursor = iterator.next_page_token
+            if len(batch) < batch_size or not cursor:
+                return updated
+
+    def get_changed(self, since: datetime, until: datetime, limit: int,
+                    after_id: Optional[str] = None) -> List[CommentModel]:
+        """
+        Comments created or updated in (since, until] in (updated_at, key) order (built-in
+        updated_at index); with `after_id`, also the ones updated at `since` with a greater key.
+        """
+        return comment_converter.from_entities(
+            fetch_changed(self.db, self.kind, 'updated_at', since, until, limit, after_id)
+        )
+
+    def iter_all(self, google_user_id: Optional[str] = None, batch_size: int = 1000) -> Iterator[CommentModel]:
+        """
+        All comments (of one user) in key order, fetched `batch_size` at a time; each
+        batch query starts at the previous one's end cursor, so only one batch is in memory.
+        """
+        query = self.db.query(kind=self.kind)
+        if google_user_id is not None:
+            query.add_filter('google_user_id', '=', google_user_id)
+        cursor = None
+        while True:
+            iterator = query.fetch(start_cursor=cursor, limit=batch_size)
+            batch = list(iterator)
+            yield from comment_converter.from_entities(batch)
+            cursor = iterator.next_page_token
+            if len(batch) < batch_size or not cursor:
+                return
 
     def update(self, comment: CommentModel, content: str) -> CommentModel:
-        """Update an existing comment."""
-        key = self.db.key(self.kind, comment.id)
-        entity = datastore.Entity(key=key)
-        entity.update({
-            'post_id': comment.post_id,
-            'google_user_id': comment.google_user_id,
-            'author_name': comment.author_name,
-            'content': content,
-            'created_at': comment.created_at,
-            'updated_at': datetime.utcnow()
-        })
-        self.db.put(entity)
+        """
+        Update an existing comment. Read and written in a transaction, so a reply_count
+        incremented meanwhile by a new reply is kept.
+        """
+        now = datetime.utcnow()
+        with self.db.transaction():
+            entity = self.db.get(self.db.key(self.kind, comment.id))
+            if entity is not None:
+                entity['content'] = content
+                entity['updated_at'] = now
+                self.db.put(entity)
         comment.content = content
-        comment.updated_at = datetime.utcnow()
+        comment.updated_at = now
         return comment
 
-    def delete(self, comment: CommentModel) -> None:
-        """Delete a comment."""
-        key = self.db.key(self.kind, comment.id)
-        self.db.delete(key)
+    def delete(self, comment: CommentModel) -> int:
+        """
+        Delete a comment and every reply below it (one range of the (post_id, path) index),
+        leaving tombstones for delta sync, and decrement the parent's reply_count. Each batch
+        of DELETE_BATCH comments is deleted with its tombstones in one commit; the parent is
+        updated with the batch holding the comment itself. Returns the number of comments deleted.
+        """
+        keys = [self.db.key(self.kind, comment.id)]
+        if comment.path is not None:
+            query = self.db.query(kind=self.kind)
+            query.add_filter('post_id', '=', comment.post_id)
+            query.add_filter('path', '>', comment.path)
+            query.add_filter('path', '<', subtree_end(comment.path))
+            query.keys_only()
+            keys += [entity.key for entity in query.fetch()]
+
+        tombstones = DatastoreTombstoneRepository(self.db)
+        # Deepest replies last in path order: delete from the end, so an interrupted delete leaves no orphans
+        for end in range(len(keys), 0, -DELETE_BATCH):
+            batch = keys[max(end - DELETE_BATCH, 0):end]
+            with self.db.transaction():
+                if end <= DELETE_BATCH and comment.parent_id is not None:
+                    parent = self.db.get(self.db.key(self.kind, comment.parent_id))
+                    if parent is not None and parent.get('reply_count', 0) > 0:
+                        parent['reply_count'] -= 1
+                        self.db.put(parent)
+                self.db.delete_multi(batch)
+                self.db.put_multi([tombstones.entity('comment', key.name, comment.post_id) for key in batch])
+        return len(keys)
 
     def count_by_post_id(self, post_id: str) -> int:
         """Count comments for a specific post."""
@@ -137,3 +230,11 @@ class DatastoreCommentRepository:
         query.keys_only()
         results = list(query.fetch())
         return len(results)
+
+    def count_by_post_ids(self, post_ids: Iterable[str]) -> Dict[str, int]:
+        """
+        Count the comments of several posts. Datastore has no grouped count, so this is one
+        keys-only query per post. Posts without comments are left out.
+        """
+        counts = {post_id: self.count_by_post_id(post_id) for post_id in set(post_ids)}
+        return {post_id: count for post_id, count in counts.items() if count}
@@ -0,0 +1,71 @@
+from typing import List, Optional
+from google.cloud import datastore
+from datetime import datetime
+from app.core.tracing import traced
+
+
+@traced("repository")
+class DatastoreFollowRepository:
+    """Repository for the follow graph in Datastore (Follow entities and User.follower_count)."""
+
+    def __init__(self, db: datastore.Client):
+        self.db = db
+        self.kind = 'Follow'
+
+    def _key(self, follower_id: str, followee_id: str) -> datastore.Key:
+        return self.db.key(self.kind, f'{follower_id}:{followee_id}')
+
+    def follow(self, follower_id: str, followee_id: str, fan_out_threshold: int) -> Optional[bool]:
+        """
+        Add a follow edge and bump the followee's follower_count in one transaction.
+        Returns None if the edge already existed, else whether it is fan-out-on-read.
+        When the followee reaches fan_out_threshold followers, all edges to them are
+        switched to fan-out-on-read.
+        """
+        key = self._key(follower_id, followee_id)
+        with self.db.transaction():
+            if self.db.get(key) is not None:
+                return None
+            user = self.db.get(self.db.key('User', followee_id))
+            user['follower_count'] = user.get('follower_count', 0) + 1
+            fan_out_on_read = user['follower_count'] >= fan_out_threshold
+            entity = datastore.Entity(key=key)
+            entity.update({
+                'follower_id': follower_id,
+                'followee_id': followee_id,
+                'fan_out_on_read': fan_out_on_read,
+                'created_at': datetime.utcnow()
+            })
+            self.db.put_multi([user, entity])
+
+        if fan_out_on_read:
+            query = self.db.query(kind=self.kind)
+            query.add_filter('followee_id', '=', followee_id)
+            query.add_filter('fan_out_on_read', '=', False)
+            edges = list(query.fetch())
+            for edge in edges:
+                edge['fan_out_on_read'] = True
+            # put_multi accepts at most 500 entities per call
+            for start in range(0, len(edges), 500):
+                self.db.put_multi(edges[start:start + 500])
+        return fan_out_on_read
+
+    def unfollow(self, follower_id: str, followee_id: str) -> bool:
+        """Remove a follow edge and decrement follower_count. Returns False if there was no edge."""
+        key = self._key(follower_id, followee_id)
+        with self.db.transaction():
+            if self.db.get(key) is None:
+                return False
+            user = self.db.get(self.db.key('User', followee_id))
+            self.db.delete(key)
+            if user is not None:
+                user['follower_count'] = max(0, user.get('follower_count', 0) - 1)
+                self.db.put(user)
+        return True
+
+    def get_fan_out_on_read_followees(self, follower_id: str) -> List[str]:
+        """Followed authors whose posts are merged in at read time."""
+        query = self.db.query(kind=self.kind)
+        query.add_filter('follower_id', '=', follower_id)
+        query.add_filter('fan_out_on_read', '=', True)
+        return [entity['followee_id'] for entity in query.fetch()]
@@ -0,0 +1,131 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from google.cloud import datastore
+from app.core.tracing import traced
+from app.repositories.entity_models import NotificationModel, notification_converter
+
+
+@traced("repository")
+class DatastoreNotificationRepository:
+    """
+    Repository for notification inboxes in Datastore (Notification entities, plus
+    User.unread_notification_count). Pages use the (user_id, -created_at, -__key__) index.
+    """
+
+    def __init__(self, db: datastore.Client):
+        self.db = db
+        self.kind = 'Notification'
+
+    def _key(self, notification: Dict) -> datastore.Key:
+        """One notification per (post, comment, recipient), so a retried batch overwrites instead of adding."""
+        return self.db.key(self.kind, '{post_id}-{comment_id}-{user_id}'.format(
+            post_id=notification['post_id'], comment_id=notification.get('comment_id') or 0,
+            user_id=notification['user_id']))
+
+    def add_batch(self, notifications: List[Dict]) -> None:
+        """
+        Write a batch of notifications (property dicts) and add them to their recipients'
+        unread counters. Each chunk and its counter increments are written in one
+        transaction, and notifications that already exist (a retried batch) are skipped,
+        so retries neither duplicate notifications nor count them twice.
+        """
+        entities = {}
+        for notification in notifications:
+            entity = datastore.Entity(key=self._key(notification))
+            entity.update({'read': False, **notification})
+            entities[entity.key] = entity
+        entities = list(entities.values())
+        # A transaction writes at most 500 entities: the chunk, plus one user per notification
+        for start in range(0, len(entities), 250):
+            chunk = entities[start:start + 250]
+            with self.db.transaction():
+                existing = {entity.key for entity in self.db.get_multi([entity.key for entity in chunk])}
+                chunk = [entity for entity in chunk if entity.key not in existing]
+                if not chunk:
+                    continue
+                self.db.put_multi(chunk)
+                deltas = Counter(entity['user_id'] for entity in chunk)
+                users = self.db.get_multi([self.db.key('User', user_id) for user_id in deltas])
+                for user in users:
+                    user['unread_notification_count'] = user.get('unread_notification_count', 0) + deltas[user.key.name]
+                self.db.put_multi(users)
+
+    def get_page(self, user_id: str, before: Optional[str] = None,
+                 limit: int = 20) -> Tuple[List[NotificationModel], Optional[str]]:
+        """
+        A page of a user's notifications, newest first, and the position to pass as
+        `before` for the next page (None on the last page). Raises ValueError for a
+        malformed `before`.
+
+        Notifications are ordered by (created_at, key), both descending, so a position is
+        the last notification's created_at and key: the rest of the notifications written
+        at that time come from a second query on the same index.
+        """
+        entities = []
+        created_at = None
+        if before is not None:
+            position, _, key_name = before.partition(' ')
+            created_at = datetime.fromisoformat(position)
+            if key_name:
+                query = self.db.query(kind=self.kind)
+                query.add_filter('user_id', '=', user_id)
+                query.add_filter('created_at', '=', created_at)
+                query.key_filter(self.db.key(self.kind, key_name), '<')
+                query.order = ['-__key__']
+                entities = list(query.fetch(limit=limit))
+        if len(entities) < limit:
+            query = self.db.query(kind=self.kind)
+            query.add_filter('user_id', '=', user_id)
+            if created_at is not None:
+                query.add_filter('created_at', '<', created_at)
+            query.order = ['-created_at', '-__key__']
+            entities += query.fetch(limit=limit - len(entities))
+        notifications = notification_converter.from_entities(entities)
+        if len(notifications) < limit:
+            return notifications, None
+        return notifications, f'{notifications[-1].created_at.isoformat()} {notifications[-1].id}'
+
+    def get_unread_count(self, user_id: str) -> int:
+        user = self.db.get(self.db.key('User', user_id))
+        return user.get('unread_notification_count', 0) if user is not None else 0
+
+    def mark_read(self, user_id: str, ids: Optional[Iterable[str]] = None) -> Tuple[int, int]:
+        """
+        Mark a user's unread notifications (all of them, or those of `ids`) as read and take
+        them off the unread counter. Each chunk of notifications is re-read, marked and
+        taken off the counter in one transaction, so concurrent calls neither count a
+        notification twice nor leave the counter out of step. Returns (how many were
+        marked, unread count after).
+        """
+        if ids is not None:
+            keys = [self.db.key(self.kind, str(notification_id)) for notification_id in ids]
+        else:
+            query = self.db.query(kind=self.kind)
+            query.add_filter('user_id', '=', user_id)
+            query.add_filter('read', '=', False)
+            query.keys_only()
+            keys = [entity.key for entity in query.fetch()]
+
+        marked = 0
+        unread_count = None
+        user_key = self.db.key('User', user_id)
+        # A transaction writes at most 500 entities: the chunk, plus the user
+        for start in range(0, len(keys), 499):
+            with self.db.transaction():
+                entities = [entity for entity in self.db.get_multi(keys[start:start + 499])
+                            if entity['user_id'] == user_id and not entity.get('read', False)]
+                if not entities:
+                    continue
+                for entity in entities:
+                    entity['read'] = True
+                self.db.put_multi(entities)
+                user = self.db.get(user_key)
+                if user is not None:
+                    user['unread_notification_count'] = max(0, user.get('unread_notification_count', 0) - len(entities))
+                    self.db.put(user)
+                    unread_count = user['unread_notification_count']
+            marked += len(entities)
+        if unread_count is None:
+            unread_count = self.get_unread_count(user_id)
+        return marked, unread_count
@@ -1,23 +1,19 @@
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from google.cloud import datastore
 from datetime import datetime
 import uuid
+from app.core.tracing import traced
+from app.repositories.datastore_tombstone_repository import DatastoreTombstoneRepository, fetch_changed
+from app.repositories.entity_models import PostModel, post_converter
 
 
-class PostModel:
-    """Simple model class to mimic SQLAlchemy Post model."""
-    def __init__(self, id: str, google_user_id: str, author_name: str, subject: str, content: str,
-                 created_at: datetime, updated_at: datetime, comment_count: int = 0):
-        self.id = id
-        self.google_user_id = google_user_id
-        self.author_name = author_name
-        self.subject = subject
-        self.content = content
-        self.created_at = created_at
-        self.updated_at = updated_at
-        self.comment_count = comment_count
+# Properties every Post entity has, minus content. A projection query only returns entities
+# that have all projected properties, so later additions (view_count) must stay out of it.
+# Each query shape projecting these needs its composite index in index.yaml.
+SUMMARY_PROPERTIES = ('subject', 'author_name', 'google_user_id', 'created_at', 'updated_at')
 
 
+@traced("repository")
 class DatastorePostRepository:
     """Repository for Post Datastore operations."""
 
@@ -38,20 +34,12 @@ class DatastorePostRepository:
             'content': content,
             'created_at': now,
             'updated_at': now,
-            'comment_count': 0
+            'comment_count': 0,
+            'view_count': 0
         })
         self.db.put(entity)
 
-        return PostModel(
-            id=post_id,
-            google_user_id=google_user_id,
-            author_name=author_name,
-            subject=subject,
-            content=content,
-            created_at=now,
-            updated_at=now,
-            comment_count=0
-        )
+        return post_converter.from_entity(entity)
 
     def get_by_id(self, post_id: str) -> Optional[PostModel]:
         """Get a post by ID."""
@@ -61,90 +49,113 @@ class DatastorePostRepository:
         if not entity:
             return None
 
-        return PostModel(
-            id=post_id,
-            google_user_id=entity['google_user_id'],
-            author_name=entity['author_name'],
-            subject=entity['subject'],
-            content=entity['content'],
-            created_at=entity['created_at'],
-            updated_at=entity['updated_at'],
-            comment_count=entity.get('comment_count', 0)
-        )
+        return post_converter.from_entity(entity)
+
+    def get_by_ids(self, post_ids: List[str]) -> List[PostModel]:
+        """Get several posts by ID with one get_multi (order not preserved)."""
+        if not post_ids:
+            return []
+        entities = self.db.get_multi([self.db.key(self.kind, post_id) for post_id in post_ids])
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[PostModel]:
+        return post_converter.from_entities(entities)
+
+    @staticmethod
+    def _summary_projection(fields: Optional[Iterable[str]], exclude: tuple = ()) -> Optional[List[str]]:
+        """
+        The summary projection when every requested field is covered by it, else None.
+        Only this one shape is projected, so one composite index per query serves any
+        field combination; comment_count is counted separately and not read from the entity.
+        """
+        if fields is None or not set(fields) - {'id', 'comment_count'} <= set(SUMMARY_PROPERTIES):
+            return None
+        return [name for name in SUMMARY_PROPERTIES if name not in exclude]
+
+    def get_all(self, skip: int = 0, limit: int = 100, fields: Optional[Iterable[str]] = None) -> List[PostModel]:
         """Get all posts ordered by created_at descending."""
         query = self.db.query(kind=self.kind)
         query.order = ['-created_at']
-        results = list(query.fetch(limit=limit, offset=skip))
-
-        return [
-            PostModel(
-                id=entity.key.name,
-                google_user_id=entity['google_user_id'],
-                author_name=entity['author_name'],
-                subject=entity['subject'],
-                content=entity['content'],
-                created_at=entity['created_at'],
-                updated_at=entity['updated_at'],
-                comment_count=entity.get('comment_count', 0)
-            )
-            for entity in results
-        ]
-
-    def get_by_user_id(self, google_user_id: str, skip: int = 0, limit: int = 100) -> List[PostModel]:
+        projection = self._summary_projection(fields)
+        if projection:
+            query.projection = projection
+        return post_converter.from_entities(query.fetch(limit=limit, offset=skip))
+
+    def get_by_user_id(self, google_user_id: str, skip: int = 0, limit: int = 100,
+                       fields: Optional[Iterable[str]] = None) -> List[PostModel]:
         """Get posts by user ordered by created_at descending."""
         query = self.db.query(kind=self.kind)
         query.add_filter('google_user_id', '=', google_user_id)
         query.order = ['-created_at']
-        results = list(query.fetch(limit=limit, offset=skip))
-
-        return [
-            PostModel(
-                id=entity.key.name,
-                google_user_id=entity['google_user_id'],
-                author_name=entity['author_name'],
-                subject=entity['subject'],
-                content=entity['content'],
-                created_at=entity['created_at'],
-                updated_at=entity['updated_at'],
-                comment_count=entity.get('comment_count', 0)
-            )
-            for entity in results
-        ]
+        # A property used in an equality filter cannot be projected; its value is known anyway
+        projection = self._summary_projection(fields, exclude=('google_user_id',))
+        if projection:
+            query.projection = projection
+            return post_converter.from_entities(query.fetch(limit=limit, offset=skip), google_user_id=google_user_id)
+        return post_converter.from_entities(query.fetch(limit=limit, offset=skip))
+
+    def get_changed(self, since: datetime, until: datetime, limit: int,
+                    after_id: Optional[str] = None) -> List[PostModel]:
+        """
+        Posts created or updated in (since, until] in (updated_at, key) order (built-in updated_at
+        index); with `after_id`, also the ones updated at `since` with a greater key.
+        """
+        return post_converter.from_entities(
+            fetch_changed(self.db, self.kind, 'updated_at', since, until, limit, after_id)
+        )
 
-    def update(self, post: PostModel, subject: Optional[str] = None, content: Optional[str] = None) -> PostModel:
-        """Update an existing post."""
-        if subject is not None:
-            post.subject = subject
-        if content is not None:
-            post.content = content
+    def iter_all(self, google_user_id: Optional[str] = None, batch_size: int = 1000) -> Iterator[PostModel]:
+        """
+        All posts (of one user) in key order, fetched `batch_size` at a time; each
+        batch query starts at the previous one's end cursor, so only one batch is in memory.
+        """
+        query = self.db.query(kind=self.kind)
+        if google_user_id is not None:
+            query.add_filter('google_user_id', '=', google_user_id)
+        cursor = None
+        while True:
+            iterator = query.fetch(start_cursor=cursor, limit=batch_size)
+            batch = list(iterator)
+            yield from post_converter.from_entities(batch)
+            cursor = iterator.next_page_token
+            if len(batch) < batch_size or not cursor:
+                return
 
-        key = self.db.key(self.kind, post.id)
-        entity = datastore.Entity(key=key)
-        entity.update({
-            'google_user_id': post.google_user_id,
-            'author_name': post.author_name,
-            'subject': post.subject,
-            'content': post.content,
-            'created_at': post.created_at,
-            'updated_at': datetime.utcnow(),
-            'comment_count': post.comment_count
-        })
-        self.db.put(entity)
-        post.updated_at = datetime.utcnow()
-        return post
+    def update(self, post: PostModel, subject: Optional[str] = None, content: Optional[str] = None) -> PostModel:
+        """
+        Update an existing post. The entity is re-read and written in one transaction,
+        changing only subject, content and updated_at, so view and comment counts
+        flushed concurrently are kept.
+        """
+        with self.db.transaction():
+            entity = self.db.get(self.db.key(self.kind, post.id))
+            if entity is None:
+                return post
+            if subject is not None:
+                entity['subject'] = subject
+            if content is not None:
+                entity['content'] = content
+            entity['updated_at'] = datetime.utcnow()
+            self.db.put(entity)
+        return post_converter.from_entity(entity)
 
     def delete(self, post: PostModel) -> None:
-        """Delete a post and all its comments (CASCADE)."""
+        """Delete a post and all its comments (CASCADE), leaving a tombstone for delta sync."""
         # First, delete all comments associated with this post
         comment_query = self.db.query(kind='Comment')
         comment_query.add_filter('post_id', '=', post.id)
         comment_keys = [entity.key for entity in comment_query.fetch()]
 
-        # Delete comments and post in a batch
-        keys_to_delete = comment_keys + [self.db.key(self.kind, post.id)]
-        self.db.delete_multi(keys_to_delete)
+        # ...and its copies in followers' home timelines
+        timeline_query = self.db.query(kind='TimelineEntry')
+        timeline_query.add_filter('post_id', '=', post.id)
+        timeline_query.keys_only()
+        timeline_keys = [entity.key for entity in timeline_query.fetch()]
+
+        # Delete comments, timeline entries and post in batches (at most 500 keys per call)
+        keys_to_delete = comment_keys + timeline_keys + [self.db.key(self.kind, post.id)]
+        for start in range(0, len(keys_to_delete), 500):
+            self.db.delete_multi(keys_to_delete[start:start + 500])
+        # Last, so a failed delete does not report a post that still exists as deleted
+        self.db.put(DatastoreTombstoneRepository(self.db).entity('post', post.id, post.id))
 
     def increment_comment_count(self, post_id: str) -> None:
         """Increment the comment count for a post."""
@@ -161,3 +172,15 @@ class DatastorePostRepository:
         if entity and entity.get('comment_count', 0) > 0:
             entity['comment_count'] = entity['comment_count'] - 1
             self.db.put(entity)
+
+    def add_view_counts(self, deltas: Dict[str, int]) -> None:
+        """Add batched view deltas to many posts with get_multi/put_multi in one transaction per chunk."""
+        post_ids = list(deltas)
+        # A Datastore transaction can write at most 500 entities
+        for start in range(0, len(post_ids), 500):
+            keys = [self.db.key(self.kind, post_id) for post_id in post_ids[start:start + 500]]
+            with self.db.transaction():
+                entities = self.db.get_multi(keys)
+                for entity in entities:
+                    entity['view_count'] = entity.get('view_count', 0) + deltas[entity.key.name]
+                self.db.put_multi(entities)
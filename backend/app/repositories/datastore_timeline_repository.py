@@ -0,0 +1,103 @@
+from typing import List, Optional, Tuple
+from google.cloud import datastore
+from datetime import datetime
+from app.core.tracing import traced
+
+# (created_at, post_id), newest first
+TimelineItem = Tuple[datetime, str]
+
+
+@traced("repository")
+class DatastoreTimelineRepository:
+    """Repository for home timelines in Datastore (TimelineEntry entities, keyed user:post)."""
+
+    def __init__(self, db: datastore.Client):
+        self.db = db
+        self.kind = 'TimelineEntry'
+
+    def _put_entries(self, user_ids: List[str], post_id: str, author_id: str, created_at: datetime) -> None:
+        entities = []
+        for user_id in user_ids:
+            entity = datastore.Entity(key=self.db.key(self.kind, f'{user_id}:{post_id}'))
+            entity.update({
+                'user_id': user_id,
+                'post_id': post_id,
+                'author_id': author_id,
+                'created_at': created_at
+            })
+            entities.append(entity)
+        # put_multi accepts at most 500 entities per call
+        for start in range(0, len(entities), 500):
+            self.db.put_multi(entities[start:start + 500])
+
+    def fan_out(self, post_id: str, author_id: str, created_at: datetime) -> None:
+        """Copy a new post into the timeline of every fan-out-on-write follower."""
+        query = self.db.query(kind='Follow')
+        query.add_filter('followee_id', '=', author_id)
+        query.add_filter('fan_out_on_read', '=', False)
+        follower_ids = [entity['follower_id'] for entity in query.fetch()]
+        self._put_entries(follower_ids, post_id, author_id, created_at)
+
+    def backfill(self, user_id: str, author_id: str, limit: int) -> None:
+        """Copy an author's most recent posts into a timeline (after a follow)."""
+        for created_at, post_id in self.get_author_entries(author_id, limit=limit):
+            self._put_entries([user_id], post_id, author_id, created_at)
+
+    def remove_author(self, user_id: str, author_id: str) -> None:
+        """Remove an author's posts from a timeline (after an unfollow)."""
+        query = self.db.query(kind=self.kind)
+        query.add_filter('user_id', '=', user_id)
+        query.add_filter('author_id', '=', author_id)
+        query.keys_only()
+        keys = [entity.key for entity in query.fetch()]
+        for start in range(0, len(keys), 500):
+            self.db.delete_multi(keys[start:start + 500])
+
+    def get_entries(self, user_id: str, before: Optional[datetime] = None, before_id: Optional[str] = None,
+                    limit: int = 20) -> List[TimelineItem]:
+        """
+        A page of a user's timeline, newest first (index: user_id, -created_at, -post_id).
+        Starts after (before, before_id): the rest of the entries at `before` come from a
+        second query on the same index. Without `before_id`, starts before `before`.
+        """
+        entries = []
+        if before is not None and before_id is not None:
+            query = self.db.query(kind=self.kind)
+            query.add_filter('user_id', '=', user_id)
+            query.add_filter('created_at', '=', before)
+            query.add_filter('post_id', '<', before_id)
+            query.order = ['-post_id']
+            entries = [(entity['created_at'], entity['post_id']) for entity in query.fetch(limit=limit)]
+        if len(entries) < limit:
+            query = self.db.query(kind=self.kind)
+            query.add_filter('user_id', '=', user_id)
+            if before is not None:
+                query.add_filter('created_at', '<', before)
+            query.order = ['-created_at', '-post_id']
+            entries += [(entity['created_at'], entity['post_id']) for entity in query.fetch(limit=limit - len(entries))]
+        return entries
+
+    def get_author_entries(self, author_id: str, before: Optional[datetime] = None, before_id: Optional[str] = None,
+                           limit: int = 20) -> List[TimelineItem]:
+        """
+        An author's newest posts in timeline order (for fan-out on read), after the same cursor
+        as get_entries, read from the (google_user_id, -created_at, -__key__) index.
+        """
+        entries = []
+        if before is not None and before_id is not None:
+            query = self.db.query(kind='Post')
+            query.add_filter('google_user_id', '=', author_id)
+            query.add_filter('created_at', '=', before)
+            query.key_filter(self.db.key('Post', before_id), '<')
+            query.order = ['-__key__']
+            query.keys_only()
+            entries = [(before, entity.key.name) for entity in query.fetch(limit=limit)]
+        if len(entries) < limit:
+            query = self.db.query(kind='Post')
+            query.add_filter('google_user_id', '=', author_id)
+            if before is not None:
+                query.add_filter('created_at', '<', before)
+            query.order = ['-created_at', '-__key__']
+            query.projection = ['created_at']
+            entries += [(entity['created_at'], entity.key.name) for entity in query.fetch(limit=limit - len(entries))]
+        return entries
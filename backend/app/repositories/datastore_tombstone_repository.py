@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import List, Optional
+from google.cloud import datastore
+import uuid
+from app.core.tracing import traced
+from app.repositories.entity_models import TombstoneModel, tombstone_converter
+
+
+def fetch_changed(db: datastore.Client, kind: str, prop: str, since: datetime, until: datetime, limit: int,
+                  after_id: Optional[str] = None) -> List[datastore.Entity]:
+    """
+    Delta sync query: entities whose `prop` is in (since, until], in (prop, key) order (the
+    built-in index of `prop`, which orders ties by key). With `after_id`, the entities at
+    `since` with a greater key come first, from a second query on the same index.
+    """
+    entities = []
+    if after_id is not None:
+        query = db.query(kind=kind)
+        query.add_filter(prop, '=', since)
+        query.key_filter(db.key(kind, after_id), '>')
+        entities = list(query.fetch(limit=limit))
+    if len(entities) < limit:
+        query = db.query(kind=kind)
+        query.add_filter(prop, '>', since)
+        query.add_filter(prop, '<=', until)
+        query.order = [prop]
+        entities += query.fetch(limit=limit - len(entities))
+    return entities
+
+
+@traced("repository")
+class DatastoreTombstoneRepository:
+    """
+    Repository for Tombstone entities: deleted posts and comments, kept for delta sync.
+    Queries use the built-in single-property index on deleted_at.
+    """
+
+    def __init__(self, db: datastore.Client):
+        self.db = db
+        self.kind = 'Tombstone'
+
+    def entity(self, entity_type: str, entity_id: str, post_id: str) -> datastore.Entity:
+        """A new tombstone entity, for the deleting repository to write with its own batch."""
+        entity = datastore.Entity(key=self.db.key(self.kind, str(uuid.uuid4())))
+        entity.update({
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'post_id': post_id,
+            'deleted_at': datetime.utcnow()
+        })
+        return entity
+
+    def get_since(self, since: datetime, until: datetime, limit: int,
+                  after_id: Optional[str] = None) -> List[TombstoneModel]:
+        """
+        Tombstones written in (since, until] in (deleted_at, key) order; with `after_id`, also
+        the ones written at `since` with a greater key.
+        """
+        return tombstone_converter.from_entities(
+            fetch_changed(self.db, self.kind, 'deleted_at', since, until, limit, after_id)
+        )
+
+    def prune(self, before: datetime) -> int:
+        """Delete tombstones older than `before`. Returns how many were deleted."""
+        query = self.db.query(kind=self.kind)
+        query.add_filter('deleted_at', '<', before)
+        query.keys_only()
+        keys = [entity.key for entity in query.fetch()]
+        for start in range(0, len(keys), 500):
+            self.db.delete_multi(keys[start:start + 500])
+        return len(keys)
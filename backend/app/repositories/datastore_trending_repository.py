@@ -0,0 +1,61 @@
+import math
+from datetime import datetime
+from typing import Dict, List, Tuple
+from google.cloud import datastore
+from app.core.tracing import traced
+
+
+@traced("repository")
+class DatastoreTrendingRepository:
+    """Repository for the trending ranking checkpoint in Datastore."""
+
+    def __init__(self, db: datastore.Client):
+        self.db = db
+        self.kind = 'TrendingScore'
+
+    def merge(self, deltas: Dict[str, float], scored_at: datetime, decay_rate: float, keep: int) -> None:
+        """
+        Add one worker's score deltas to the checkpoint. Workers each see a share of the
+        events, so a post's new score is its stored one decayed to scored_at plus the
+        delta (read and written in one transaction per chunk); posts left without a
+        positive score are dropped and the checkpoint is then trimmed to the `keep` best posts.
+
+        Besides the score, each entity stores its `rank`, log(score) + decay_rate * scored_at:
+        scores all decay at the same rate, so rank orders posts by their decayed scores at
+        any time, and the trim reads only the keys past the `keep` best from its built-in index.
+        """
+        items = [(self.db.key(self.kind, str(post_id)), delta) for post_id, delta in deltas.items()]
+        # A transaction holds at most 500 entities
+        for start in range(0, len(items), 500):
+            chunk = items[start:start + 500]
+            with self.db.transaction():
+                stored = {entity.key.name: entity for entity in self.db.get_multi([key for key, _ in chunk])}
+                entities, dropped = [], []
+                for key, score in chunk:
+                    entity = stored.get(key.name)
+                    if entity is not None:
+                        elapsed = (scored_at - entity['scored_at']).total_seconds()
+                        score += entity['score'] * math.exp(max(-decay_rate * elapsed, -700.0))
+                    if score <= 0:
+                        if entity is not None:
+                            dropped.append(key)
+                        continue
+                    entity = datastore.Entity(key=key)
+                    entity.update({'score': score, 'scored_at': scored_at,
+                                   'rank': math.log(score) + decay_rate * scored_at.timestamp()})
+                    entities.append(entity)
+                self.db.put_multi(entities)
+                self.db.delete_multi(dropped)
+
+        query = self.db.query(kind=self.kind)
+        query.keys_only()
+        query.order = ['-rank']
+        stale_keys = [entity.key for entity in query.fetch(offset=keep)]
+        # Datastore accepts at most 500 mutations per call
+        for start in range(0, len(stale_keys), 500):
+            self.db.delete_multi(stale_keys[start:start + 500])
+
+    def get_all(self) -> List[Tuple[str, float, datetime]]:
+        """Get every checkpointed score as (post_id, score, scored_at)."""
+        query = self.db.query(kind=self.kind)
+        return [(entity.key.name, entity['score'], entity['scored_at']) for entity in query.fetch()]
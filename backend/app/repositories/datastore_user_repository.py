@@ -1,20 +1,11 @@
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 from google.cloud import datastore
 from datetime import datetime
+from app.core.tracing import traced
+from app.repositories.entity_models import UserModel, user_converter
 
 
-class UserModel:
-    """Simple model class to mimic SQLAlchemy User model."""
-    def __init__(self, google_user_id: str, email: str, name: str, picture: Optional[str],
-                 created_at: datetime, updated_at: datetime):
-        self.google_user_id = google_user_id
-        self.email = email
-        self.name = name
-        self.picture = picture
-        self.created_at = created_at
-        self.updated_at = updated_at
-
-
+@traced("repository")
 class DatastoreUserRepository:
     """Repository for User Datastore operations."""
 
@@ -32,18 +23,12 @@ class DatastoreUserRepository:
             'name': name,
             'picture': picture,
             'created_at': now,
-            'updated_at': now
+            'updated_at': now,
+            'follower_count': 0
         })
         self.db.put(entity)
 
-        return UserModel(
-            google_user_id=google_user_id,
-            email=email,
-            name=name,
-            picture=picture,
-            created_at=now,
-            updated_at=now
-        )
+        return user_converter.from_entity(entity)
 
     def get_by_google_id(self, google_user_id: str) -> Optional[UserModel]:
         """Get a user by their Google user ID."""
@@ -53,14 +38,7 @@ class DatastoreUserRepository:
         if not entity:
             return None
 
-        return UserModel(
-            google_user_id=google_user_id,
-            email=entity['email'],
-            name=entity['name'],
-            picture=entity.get('picture'),
-            created_at=entity['created_at'],
-            updated_at=entity['updated_at']
-        )
+        return user_converter.from_entity(entity)
 
     def get_by_email(self, email: str) -> Optional[UserModel]:
         """Get a user by their email."""
@@ -72,27 +50,35 @@ class DatastoreUserRepository:
             return None
 
         entity = results[0]
-        return UserModel(
-            google_user_id=entity.key.name,
-            email=entity['email'],
-            name=entity['name'],
-            picture=entity.get('picture'),
-            created_at=entity['created_at'],
-            updated_at=entity['updated_at']
-        )
+        return user_converter.from_entity(entity)
+
+    def get_ids_by_names(self, names: Iterable[str]) -> Dict[str, List[str]]:
+        """Google user IDs of the users with each of these exact names (for @mentions), keys-only queries."""
+        ids: Dict[str, List[str]] = {}
+        for name in names:
+            query = self.db.query(kind=self.kind)
+            query.add_filter('name', '=', name)
+            query.keys_only()
+            found = [entity.key.name for entity in query.fetch()]
+            if found:
+                ids[name] = found
+        return ids
 
     def update(self, user: UserModel) -> UserModel:
         """Update an existing user."""
         key = self.db.key(self.kind, user.google_user_id)
-        entity = datastore.Entity(key=key)
-        entity.update({
-            'email': user.email,
-            'name': user.name,
-            'picture': user.picture,
-            'created_at': user.created_at,
-            'updated_at': datetime.utcnow()
-        })
-        self.db.put(entity)
+        # Read-modify-write in a transaction so a concurrent follow's follower_count is kept
+        with self.db.transaction():
+            entity = self.db.get(key) or datastore.Entity(key=key)
+            entity.update({
+                'email': user.email,
+                'name': user.name,
+                'picture': user.picture,
+                'created_at': user.created_at,
+                'updated_at': datetime.utcnow()
+            })
+            self.db.put(entity)
+        user.follower_count = entity.get('follower_count', 0)
         user.updated_at = datetime.utcnow()
         return user
 
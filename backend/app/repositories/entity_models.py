@@ -0,0 +1,151 @@
+from datetime import datetime
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+
+class PostModel:
+    """Post loaded from Datastore/Firestore, mimicking the SQLAlchemy Post model."""
+
+    # Slotted: no per-instance __dict__, which is most of a plain object's size.
+    # Slot order is the positional order of __init__ and of EntityConverter rows.
+    __slots__ = ('id', 'google_user_id', 'author_name', 'subject', 'content', 'created_at', 'updated_at',
+                 'comment_count', 'view_count')
+
+    def __init__(self, id: str, google_user_id: str, author_name: str, subject: str, content: str,
+                 created_at: datetime, updated_at: datetime, comment_count: int = 0, view_count: int = 0):
+        self.id = id
+        self.google_user_id = google_user_id
+        self.author_name = author_name
+        self.subject = subject
+        self.content = content
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.comment_count = comment_count
+        self.view_count = view_count
+
+
+class CommentModel:
+    """Comment loaded from Datastore/Firestore, mimicking the SQLAlchemy Comment model."""
+
+    __slots__ = ('id', 'post_id', 'google_user_id', 'author_name', 'content', 'created_at', 'updated_at',
+                 'parent_id', 'path', 'depth', 'reply_count')
+
+    def __init__(self, id: str, post_id: str, google_user_id: str, author_name: str, content: str,
+                 created_at: datetime, updated_at: datetime, parent_id: Optional[str] = None,
+                 path: Optional[str] = None, depth: int = 0, reply_count: int = 0):
+        self.id = id
+        self.post_id = post_id
+        self.google_user_id = google_user_id
+        self.author_name = author_name
+        self.content = content
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.parent_id = parent_id
+        self.path = path  # None for comments written before threads (see app.core.threads)
+        self.depth = depth
+        self.reply_count = reply_count
+
+
+class UserModel:
+    """User loaded from Datastore/Firestore, mimicking the SQLAlchemy User model."""
+
+    __slots__ = ('google_user_id', 'email', 'name', 'picture', 'created_at', 'updated_at', 'follower_count')
+
+    def __init__(self, google_user_id: str, email: str, name: str, picture: Optional[str],
+                 created_at: datetime, updated_at: datetime, follower_count: int = 0):
+        self.google_user_id = google_user_id
+        self.email = email
+        self.name = name
+        self.picture = picture
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.follower_count = follower_count
+
+
+class TombstoneModel:
+    """Tombstone loaded from Datastore, mimicking the SQLAlchemy Tombstone model."""
+
+    __slots__ = ('id', 'entity_type', 'entity_id', 'post_id', 'deleted_at')
+
+    def __init__(self, id: str, entity_type: str, entity_id: str, post_id: str, deleted_at: datetime):
+        self.id = id
+        self.entity_type = entity_type
+        self.entity_id = entity_id
+        self.post_id = post_id
+        self.deleted_at = deleted_at
+
+
+class NotificationModel:
+    """Notification loaded from Datastore, mimicking the SQLAlchemy Notification model."""
+
+    __slots__ = ('id', 'user_id', 'kind', 'actor_id', 'actor_name', 'post_id', 'comment_id', 'read', 'created_at')
+
+    def __init__(self, id: str, user_id: str, kind: str, actor_id: str, actor_name: str, post_id: str,
+                 comment_id: Optional[str], read: bool, created_at: datetime):
+        self.id = id
+        self.user_id = user_id
+        self.kind = kind
+        self.actor_id = actor_id
+        self.actor_name = actor_name
+        self.post_id = post_id
+        self.comment_id = comment_id
+        self.read = read
+        self.created_at = created_at
+
+
+class EntityConverter:
+    """
+    Converts Datastore entities / Firestore documents to `model` instances.
+
+    The first slot of the model is the key (entity key name / document id),
+    the rest are read as properties of the same name with one itemgetter
+    call per entity. A batch with an entity missing a property (written
+    before the property existed, or a projection result) takes the slower
+    per-property path, where missing properties get their default from
+    `defaults`, else None.
+    """
+
+    def __init__(self, model, defaults: Optional[Dict[str, Any]] = None):
+        self.model = model
+        self.fields: Tuple[str, ...] = model.__slots__[1:]
+        self._get = itemgetter(*self.fields)
+        defaults = defaults or {}
+        self._defaults = tuple((name, defaults.get(name)) for name in self.fields)
+
+    def values(self, properties: Mapping) -> tuple:
+        """Property values in slot order."""
+        try:
+            return self._get(properties)
+        except KeyError:
+            return tuple(properties.get(name, default) for name, default in self._defaults)
+
+    def from_entity(self, entity):
+        return self.model(entity.key.name, *self.values(entity))
+
+    def from_entities(self, entities: Iterable, **known) -> list:
+        """
+        Models for a batch of entities. `known` fills properties the query did not
+        return, e.g. the value of an equality filter, which a projection cannot include.
+        """
+        model, get, values = self.model, self._get, self.values
+        if known:
+            return [model(entity.key.name, *values({**entity, **known})) for entity in entities]
+        entities = list(entities)
+        try:
+            return [model(entity.key.name, *get(entity)) for entity in entities]
+        except KeyError:
+            return [model(entity.key.name, *values(entity)) for entity in entities]
+
+    def from_document(self, doc):
+        return self.model(doc.id, *self.values(doc.to_dict()))
+
+    def from_documents(self, docs: Iterable) -> list:
+        model, values = self.model, self.values
+        return [model(doc.id, *values(doc.to_dict())) for doc in docs]
+
+
+post_converter = EntityConverter(PostModel, defaults={'comment_count': 0, 'view_count': 0})
+comment_converter = EntityConverter(CommentModel, defaults={'depth': 0, 'reply_count': 0})
+user_converter = EntityConverter(UserModel, defaults={'follower_count': 0})
+tombstone_converter = EntityConverter(TombstoneModel)
+notification_converter = EntityConverter(NotificationModel, defaults={'read': False})
@@ -1,19 +1,7 @@
 from typing import List, Optional
 from google.cloud import firestore
 from datetime import datetime
-
-
-class CommentModel:
-    """Simple model class to mimic SQLAlchemy Comment model."""
-    def __init__(self, id: str, post_id: str, content: str, google_user_id: str, author_name: str,
-                 created_at: datetime, updated_at: datetime):
-        self.id = id
-        self.post_id = post_id
-        self.content = content
-        self.google_user_id = google_user_id
-        self.author_name = author_name
-        self.created_at = created_at
-        self.updated_at = updated_at
+from app.repositories.entity_models import CommentModel, comment_converter
 
 
 class FirestoreCommentRepository:
@@ -54,16 +42,7 @@ class FirestoreCommentRepository:
         if not doc.exists:
             return None
 
-        data = doc.to_dict()
-        return CommentModel(
-            id=doc.id,
-            post_id=data['post_id'],
-            content=data['content'],
-            google_user_id=data['google_user_id'],
-            author_name=data['author_name'],
-            created_at=data.get('created_at'),
-            updated_at=data.get('updated_at')
-        )
+        return comment_converter.from_document(doc)
 
     def get_by_post_id(self, post_id: str, skip: int = 0, limit: int = 100) -> List[CommentModel]:
         """Get all comments for a specific post, ordered by created_at ascending (oldest first)."""
@@ -74,19 +53,7 @@ class FirestoreCommentRepository:
             .offset(skip)
             .limit(limit)
         )
-        comments = []
-        for doc in query.stream():
-            data = doc.to_dict()
-            comments.append(CommentModel(
-                id=doc.id,
-                post_id=data['post_id'],
-                content=data['content'],
-                google_user_id=data['google_user_id'],
-                author_name=data['author_name'],
-                created_at=data.get('created_at'),
-                updated_at=data.get('updated_at')
-            ))
-        return comments
+        return comment_converter.from_documents(query.stream())
 
     def get_by_user_id(self, google_user_id: str, skip: int = 0, limit: int = 100) -> List[CommentModel]:
         """Get all comments by a specific user, ordered by created_at descending."""
@@ -97,19 +64,7 @@ class FirestoreCommentRepository:
             .offset(skip)
             .limit(limit)
         )
-        comments = []
-        for doc in query.stream():
-            data = doc.to_dict()
-            comments.append(CommentModel(
-                id=doc.id,
-                post_id=data['post_id'],
-                content=data['content'],
-                google_user_id=data['google_user_id'],
-                author_name=data['author_name'],
-                created_at=data.get('created_at'),
-                updated_at=data.get('updated_at')
-            ))
-        return comments
+        return comment_converter.from_documents(query.stream())
 
     def update(self, comment: CommentModel, content: str) -> CommentModel:
         """Update a comment's content."""
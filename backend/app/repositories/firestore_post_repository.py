@@ -1,19 +1,7 @@
 from typing import List, Optional
 from google.cloud import firestore
 from datetime import datetime
-
-
-class PostModel:
-    """Simple model class to mimic SQLAlchemy Post model."""
-    def __init__(self, id: str, subject: str, content: str, google_user_id: str, author_name: str,
-                 created_at: datetime, updated_at: datetime):
-        self.id = id
-        self.subject = subject
-        self.content = content
-        self.google_user_id = google_user_id
-        self.author_name = author_name
-        self.created_at = created_at
-        self.updated_at = updated_at
+from app.repositories.entity_models import PostModel, post_converter
 
 
 class FirestorePostRepository:
@@ -54,33 +42,12 @@ class FirestorePostRepository:
         if not doc.exists:
             return None
 
-        data = doc.to_dict()
-        return PostModel(
-            id=doc.id,
-            subject=data['subject'],
-            content=data['content'],
-            google_user_id=data['google_user_id'],
-            author_name=data['author_name'],
-            created_at=data.get('created_at'),
-            updated_at=data.get('updated_at')
-        )
+        return post_converter.from_document(doc)
 
     def get_all(self, skip: int = 0, limit: int = 100) -> List[PostModel]:
         """Get all posts with pagination, ordered by created_at descending."""
         query = self.collection.order_by('created_at', direction=firestore.Query.DESCENDING).offset(skip).limit(limit)
-        posts = []
-        for doc in query.stream():
-            data = doc.to_dict()
-            posts.append(PostModel(
-                id=doc.id,
-                subject=data['subject'],
-                content=data['content'],
-                google_user_id=data['google_user_id'],
-                author_name=data['author_name'],
-                created_at=data.get('created_at'),
-                updated_at=data.get('updated_at')
-            ))
-        return posts
+        return post_converter.from_documents(query.stream())
 
     def get_by_user_id(self, google_user_id: str, skip: int = 0, limit: int = 100) -> List[PostModel]:
         """Get all posts by a specific user."""
@@ -91,19 +58,7 @@ class FirestorePostRepository:
             .offset(skip)
             .limit(limit)
         )
-        posts = []
-        for doc in query.stream():
-            data = doc.to_dict()
-            posts.append(PostModel(
-                id=doc.id,
-                subject=data['subject'],
-                content=data['content'],
-                google_user_id=data['google_user_id'],
-                author_name=data['author_name'],
-                created_at=data.get('created_at'),
-                updated_at=data.get('updated_at')
-            ))
-        return posts
+        return post_converter.from_documents(query.stream())
 
     def update(self, post: PostModel, subject: Optional[str] = None, content: Optional[str] = None) -> PostModel:
         """Update a post's fields."""
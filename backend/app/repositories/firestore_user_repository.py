@@ -1,18 +1,7 @@
 from typing import Optional
 from google.cloud import firestore
 from datetime import datetime
-
-
-class UserModel:
-    """Simple model class to mimic SQLAlchemy User model."""
-    def __init__(self, google_user_id: str, email: str, name: str, picture: Optional[str],
-                 created_at: datetime, updated_at: datetime):
-        self.google_user_id = google_user_id
-        self.email = email
-        self.name = name
-        self.picture = picture
-        self.created_at = created_at
-        self.updated_at = updated_at
+from app.repositories.entity_models import UserModel, user_converter
 
 
 class FirestoreUserRepository:
@@ -51,29 +40,13 @@ class FirestoreUserRepository:
         if not doc.exists:
             return None
 
-        data = doc.to_dict()
-        return UserModel(
-            google_user_id=doc.id,
-            email=data['email'],
-            name=data['name'],
-            picture=data.get('picture'),
-            created_at=data.get('created_at'),
-            updated_at=data.get('updated_at')
-        )
+        return user_converter.from_document(doc)
 
     def get_by_email(self, email: str) -> Optional[UserModel]:
         """Get a user by their email."""
         docs = self.collection.where('email', '==', email).limit(1).stream()
         for doc in docs:
-            data = doc.to_dict()
-            return UserModel(
-                google_user_id=doc.id,
-                email=data['email'],
-                name=data['name'],
-                picture=data.get('picture'),
-                created_at=data.get('created_at'),
-                updated_at=data.get('updated_at')
-            )
+            return user_converter.from_document(doc)
         return None
 
     def update(self, user: UserModel, name: Optional[str] = None, picture: Optional[str] = None) -> UserModel:
@@ -0,0 +1,71 @@
+from typing import List, Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.follow import Follow
+from app.models.user import User
+from app.core.tracing import traced
+
+
+@traced("repository")
+class FollowRepository:
+    """Repository for the follow graph (follows and users.follower_count)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def follow(self, follower_id: str, followee_id: str, fan_out_threshold: int) -> Optional[bool]:
+        """
+        Add a follow edge and bump the followee's follower_count in one transaction.
+        Returns None if the edge already existed, else whether it is fan-out-on-read.
+        When the followee reaches fan_out_threshold followers, all edges to them are
+        switched to fan-out-on-read (the partial index only holds edges not yet switched).
+        """
+        inserted = self.db.execute(
+            insert(Follow)
+            .values(follower_id=follower_id, followee_id=followee_id)
+            .on_conflict_do_nothing()
+            .returning(Follow.follower_id)
+        ).first()
+        if inserted is None:
+            self.db.rollback()
+            return None
+        follower_count = self.db.execute(
+            update(User)
+            .where(User.google_user_id == followee_id)
+            .values(follower_count=User.follower_count + 1, updated_at=User.updated_at)
+            .returning(User.follower_count)
+        ).scalar_one()
+        fan_out_on_read = follower_count >= fan_out_threshold
+        if fan_out_on_read:
+            self.db.execute(
+                update(Follow)
+                .where(Follow.followee_id == followee_id, Follow.fan_out_on_read.is_(False))
+                .values(fan_out_on_read=True)
+            )
+        self.db.commit()
+        return fan_out_on_read
+
+    def unfollow(self, follower_id: str, followee_id: str) -> bool:
+        """Remove a follow edge and decrement follower_count. Returns False if there was no edge."""
+        deleted = self.db.execute(
+            delete(Follow)
+            .where(Follow.follower_id == follower_id, Follow.followee_id == followee_id)
+            .returning(Follow.follower_id)
+        ).first()
+        if deleted is None:
+            self.db.rollback()
+            return False
+        self.db.execute(
+            update(User)
+            .where(User.google_user_id == followee_id)
+            .values(follower_count=User.follower_count - 1, updated_at=User.updated_at)
+        )
+        self.db.commit()
+        return True
+
+    def get_fan_out_on_read_followees(self, follower_id: str) -> List[str]:
+        """Followed authors whose posts are merged in at read time."""
+        return list(self.db.scalars(
+            select(Follow.followee_id).where(Follow.follower_id == follower_id, Follow.fan_out_on_read.is_(True))
+        ))
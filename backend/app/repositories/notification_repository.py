@@ -0,0 +1,92 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import Integer, String, bindparam, column, func, insert, select, update, values
+from sqlalchemy.orm import Session
+from app.models.notification import Notification
+from app.models.user import User
+from app.core.tracing import traced
+
+# Inbox pages: one range scan of idx_notifications_user_id_id, newest first. The first page
+# passes the largest id, so both cases share one statement (see post_repository)
+_NEWEST = 2 ** 63 - 1
+_PAGE = (
+    select(Notification)
+    .where(Notification.user_id == bindparam("user_id"), Notification.id < bindparam("before"))
+    .order_by(Notification.id.desc())
+    .limit(bindparam("limit"))
+)
+_UNREAD_COUNT = select(User.unread_notification_count).where(User.google_user_id == bindparam("user_id"))
+
+
+@traced("repository")
+class NotificationRepository:
+    """Repository for notification inboxes (notifications, plus users.unread_notification_count)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add_batch(self, notifications: List[Dict]) -> None:
+        """
+        Insert a batch of notifications (column dicts) and add them to their recipients'
+        unread counters, in one transaction: one multi-row INSERT and one UPDATE ... FROM (VALUES ...).
+        """
+        if not notifications:
+            return
+        self.db.execute(insert(Notification), notifications)
+        counts = Counter(notification["user_id"] for notification in notifications)
+        batch = values(
+            column("user_id", String), column("delta", Integer), name="unread_deltas"
+        ).data(list(counts.items()))
+        self.db.execute(
+            update(User)
+            .where(User.google_user_id == batch.c.user_id)
+            # Keep updated_at: a notification is not a profile change
+            .values(unread_notification_count=User.unread_notification_count + batch.c.delta,
+                    updated_at=User.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
+    def get_page(self, user_id: str, before: Optional[str] = None,
+                 limit: int = 20) -> Tuple[List[Notification], Optional[str]]:
+        """
+        A page of a user's notifications, newest first, and the position to pass as
+        `before` for the next page (None on the last page). Raises ValueError for a
+        malformed `before`.
+        """
+        position = _NEWEST if before is None else int(before)
+        notifications = list(self.db.scalars(_PAGE, {"user_id": user_id, "before": position, "limit": limit}))
+        next_before = str(notifications[-1].id) if len(notifications) == limit else None
+        return notifications, next_before
+
+    def get_unread_count(self, user_id: str) -> int:
+        return self.db.scalar(_UNREAD_COUNT, {"user_id": user_id}) or 0
+
+    def mark_read(self, user_id: str, ids: Optional[Iterable[int]] = None) -> Tuple[int, int]:
+        """
+        Mark a user's unread notifications (all of them, or those of `ids`) as read and
+        take them off the unread counter, in one statement:
+
+            WITH marked AS (UPDATE notifications SET read = true WHERE ... RETURNING id)
+            UPDATE users SET unread_notification_count = greatest(unread_notification_count - (SELECT count(*) FROM marked), 0)
+            RETURNING (SELECT count(*) FROM marked), unread_notification_count
+
+        Returns (how many were marked, unread count after).
+        """
+        marked = update(Notification).where(Notification.user_id == user_id, ~Notification.read)
+        if ids is not None:
+            marked = marked.where(Notification.id.in_([int(notification_id) for notification_id in ids]))
+        marked = marked.values(read=True).returning(Notification.id).cte("marked")
+        count = select(func.count()).select_from(marked).scalar_subquery()
+        row = self.db.execute(
+            update(User)
+            .add_cte(marked)
+            .where(User.google_user_id == user_id)
+            .values(unread_notification_count=func.greatest(User.unread_notification_count - count, 0),
+                    updated_at=User.updated_at)
+            .returning(count, User.unread_notification_count)
+            .execution_options(synchronize_session=False)
+        ).first()
+        self.db.commit()
+        # No user row: the notifications (if any) were still marked, but there is no counter
+        return (row[0], row[1]) if row is not None else (0, 0)
@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Dict
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.partitions import partition_month
+from app.core.tracing import traced
+
+# Serializes partition DDL across workers (pg_advisory_xact_lock key)
+_MAINTENANCE_LOCK = 7_364_112_045
+# DDL on a partition locks the parent table; give up rather than queue behind long queries (and block
+# every query queued behind the DDL). The next maintenance run tries again
+_LOCK_TIMEOUT = "5s"
+
+
+@traced("repository")
+class PartitionRepository:
+    """Repository for the monthly partitions of posts and comments (PostgreSQL only)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_partitions(self, table: str) -> Dict[str, datetime]:
+        """Attached partitions of `table` named by the monthly scheme, with their month."""
+        rows = self.db.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits"
+                " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+                " WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+            ),
+            {"table": table},
+        ).scalars()
+        partitions = {}
+        for name in rows:
+            month = partition_month(table, name)
+            if month is not None:
+                partitions[name] = month
+        return partitions
+
+    def _ddl(self, statement: str) -> None:
+        self.db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _MAINTENANCE_LOCK})
+        self.db.execute(text(f"SET LOCAL lock_timeout = '{_LOCK_TIMEOUT}'"))
+        self.db.execute(text(statement))
+        self.db.commit()
+
+    def create_partition(self, table: str, name: str, start: datetime, end: datetime) -> None:
+        """Create the partition of `table` for created_at in [start, end), unless another worker just did."""
+        # Names and bounds come from app.core.partitions, never from user input
+        self._ddl(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table}"
+            f" FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    def detach_partition(self, table: str, name: str) -> None:
+        """Detach a partition: its rows leave `table` at once and stay in `name` as a standalone archive table."""
+        self._ddl(f"ALTER TABLE {table} DETACH PARTITION {name}")
@@ -1,8 +1,73 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional
+from sqlalchemy import Integer, Select, bindparam, column, delete, select, update, values
+from sqlalchemy.orm import Session, lazyload, load_only
+from app.models.comment import Comment
 from app.models.post import Post
+from app.models.timeline_entry import TimelineEntry
+from app.models.tombstone import Tombstone
+from app.models.trending_score import TrendingScore
+from app.core.partitions import hot_since
+from app.core.tracing import traced
 
+# The hot queries are built once, with bound parameters, and reused on every call: a call no longer
+# builds a query and computes its cache key, and the compiled SQL comes from SQLAlchemy's compiled
+# cache. The SQL string is the same on every call, which psycopg 3 prepares server-side
+# (POSTGRES_DRIVER=psycopg).
+# Comments are never loaded with the post: a post can have thousands, and delete removes them in bulk
+_BY_ID = select(Post).options(lazyload(Post.comments)).where(Post.id == bindparam("post_id")).limit(1)
+_BY_IDS = select(Post).where(Post.id.in_(bindparam("post_ids", expanding=True)))
+# Comments are never older than their post: created_at prunes the partitions scanned
+_DELETE_COMMENTS = (
+    delete(Comment)
+    .where(Comment.post_id == bindparam("post_id"), Comment.created_at >= bindparam("since"))
+    .execution_options(synchronize_session=False)
+)
+_DELETE = (
+    delete(Post)
+    .where(Post.id == bindparam("post_id"), Post.created_at == bindparam("created_at"))
+    .execution_options(synchronize_session=False)
+)
 
+
+@lru_cache(maxsize=128)
+def _list_statement(fields: Optional[FrozenSet[str]]) -> Select:
+    """
+    Statement for list pages. Comments are never needed there, so they are not
+    eagerly loaded; with `fields`, only those columns (plus id) are selected.
+    """
+    statement = select(Post).options(lazyload(Post.comments))
+    if fields is not None:
+        columns = [getattr(Post, name) for name in sorted(fields) if name in Post.__table__.c]
+        statement = statement.options(load_only(Post.id, *columns))
+    return statement
+
+
+@lru_cache(maxsize=128)
+def _feed_statement(fields: Optional[FrozenSet[str]], hot: bool) -> Select:
+    statement = _list_statement(fields)
+    if hot:
+        statement = statement.where(Post.created_at >= bindparam("since"))
+    return statement.order_by(Post.created_at.desc()).offset(bindparam("skip")).limit(bindparam("limit"))
+
+
+@lru_cache(maxsize=128)
+def _by_user_statement(fields: Optional[FrozenSet[str]]) -> Select:
+    return (
+        _list_statement(fields)
+        .where(Post.google_user_id == bindparam("google_user_id"))
+        .order_by(Post.created_at.desc())
+        .offset(bindparam("skip"))
+        .limit(bindparam("limit"))
+    )
+
+
+def _fields_key(fields: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+    return None if fields is None else frozenset(fields)
+
+
+@traced("repository")
 class PostRepository:
     """Repository for Post database operations. Each method performs ONE database operation."""
 
@@ -24,22 +89,62 @@ class PostRepository:
 
     def get_by_id(self, post_id: int) -> Optional[Post]:
         """Get a single post by ID."""
-        return self.db.query(Post).filter(Post.id == post_id).first()
+        return self.db.scalars(_BY_ID, {"post_id": post_id}).first()
+
+    def get_by_ids(self, post_ids: List[int]) -> List[Post]:
+        """Get several posts by ID in one query (order not preserved)."""
+        if not post_ids:
+            return []
+        return self.db.scalars(_BY_IDS, {"post_ids": list(post_ids)}).all()
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[Post]:
-        """Get all posts with pagination."""
-        return self.db.query(Post).order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
+    def get_all(self, skip: int = 0, limit: int = 100, fields: Optional[Iterable[str]] = None) -> List[Post]:
+        """
+        Get all posts with pagination, newest first.
+        The page is first read from the hot partitions only (the others are pruned when the query
+        is planned, or when a prepared statement starts); only a page reaching past them is read
+        again from the whole table.
+        """
+        key = _fields_key(fields)
+        page = {"skip": skip, "limit": limit}
+        posts = self.db.scalars(_feed_statement(key, True), {**page, "since": hot_since()}).all()
+        if len(posts) == limit:
+            return posts
+        return self.db.scalars(_feed_statement(key, False), page).all()
 
-    def get_by_user_id(self, google_user_id: str, skip: int = 0, limit: int = 100) -> List[Post]:
+    def get_by_user_id(self, google_user_id: str, skip: int = 0, limit: int = 100,
+                       fields: Optional[Iterable[str]] = None) -> List[Post]:
         """Get all posts by a specific user."""
-        return (
-            self.db.query(Post)
-            .filter(Post.google_user_id == google_user_id)
-            .order_by(Post.created_at.desc())
-            .offset(skip)
+        return self.db.scalars(
+            _by_user_statement(_fields_key(fields)),
+            {"google_user_id": google_user_id, "skip": skip, "limit": limit},
+        ).all()
+
+    def get_changed(self, since: datetime, until: datetime, limit: int, after_id: Optional[str] = None) -> List[Post]:
+        """
+        Posts created or updated in (since, until] in (updated_at, id) order (a range scan of
+        idx_posts_updated_at); with `after_id`, also the ones updated at `since` with a greater id.
+        Raises ValueError for a malformed `after_id`.
+        """
+        changed = Post.updated_at > since
+        if after_id is not None:
+            changed = (Post.updated_at >= since) & (changed | (Post.id > int(after_id)))
+        return self.db.scalars(
+            _list_statement(None)
+            .where(changed, Post.updated_at <= until)
+            .order_by(Post.updated_at.asc(), Post.id.asc())
             .limit(limit)
-            .all()
-        )
+        ).all()
+
+    def iter_all(self, google_user_id: Optional[str] = None, batch_size: int = 1000) -> Iterator[Post]:
+        """
+        All posts (of one user), oldest first, streamed from a server-side cursor
+        `batch_size` rows at a time. The session's identity map only holds rows
+        weakly, so memory stays flat however many rows are read.
+        """
+        query = self.db.query(Post).options(lazyload(Post.comments))
+        if google_user_id is not None:
+            query = query.filter(Post.google_user_id == google_user_id)
+        return iter(query.order_by(Post.created_at.asc()).yield_per(batch_size))
 
     def update(self, post: Post, subject: Optional[str] = None, content: Optional[str] = None) -> Post:
         """Update a post's fields."""
@@ -52,6 +157,33 @@ class PostRepository:
         return post
 
     def delete(self, post: Post) -> None:
-        """Delete a post from the database."""
-        self.db.delete(post)
+        """
+        Delete a post and its comments, timeline entries and trending score, leaving a
+        tombstone for delta sync, in one transaction. posts is partitioned, so nothing
+        references it with a foreign key that would cascade; the comments go in one bulk
+        DELETE rather than the ORM cascade, which would load and delete them one by one.
+        """
+        self.db.execute(_DELETE_COMMENTS, {"post_id": post.id, "since": post.created_at})
+        self.db.execute(delete(TimelineEntry).where(TimelineEntry.post_id == post.id))
+        self.db.execute(delete(TrendingScore).where(TrendingScore.post_id == post.id))
+        self.db.add(Tombstone(entity_type="post", entity_id=post.id, post_id=post.id))
+        self.db.execute(_DELETE, {"post_id": post.id, "created_at": post.created_at})
+        # Deleted behind the session's back: keep the loaded post usable after the commit
+        self.db.expunge(post)
+        self.db.commit()
+
+    def add_view_counts(self, deltas: Dict[int, int]) -> None:
+        """Add batched view deltas to many posts in one UPDATE ... FROM (VALUES ...)."""
+        if not deltas:
+            return
+        batch = values(
+            column("post_id", Integer), column("delta", Integer), name="view_deltas"
+        ).data([(int(post_id), delta) for post_id, delta in deltas.items()])
+        self.db.execute(
+            update(Post)
+            .where(Post.id == batch.c.post_id)
+            # Keep updated_at: a view is not an edit
+            .values(view_count=Post.view_count + batch.c.delta, updated_at=Post.updated_at)
+            .execution_options(synchronize_session=False)
+        )
         self.db.commit()
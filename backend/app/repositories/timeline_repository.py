@@ -0,0 +1,81 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.follow import Follow
+from app.models.post import Post
+from app.models.timeline_entry import TimelineEntry
+from app.core.tracing import traced
+
+# (created_at, post_id), newest first
+TimelineItem = Tuple[datetime, int]
+
+
+@traced("repository")
+class TimelineRepository:
+    """Repository for home timelines (timeline_entries, plus author pages for fan-out on read)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def fan_out(self, post_id: int, author_id: str, created_at: datetime) -> None:
+        """Copy a new post into the timeline of every fan-out-on-write follower with one INSERT ... SELECT."""
+        followers = select(
+            Follow.follower_id, literal(created_at), literal(post_id), literal(author_id)
+        ).where(Follow.followee_id == author_id, Follow.fan_out_on_read.is_(False))
+        self.db.execute(
+            insert(TimelineEntry)
+            .from_select(["user_id", "created_at", "post_id", "author_id"], followers)
+            .on_conflict_do_nothing()
+        )
+        self.db.commit()
+
+    def backfill(self, user_id: str, author_id: str, limit: int) -> None:
+        """Copy an author's most recent posts into a timeline (after a follow)."""
+        recent = (
+            select(literal(user_id), Post.created_at, Post.id, Post.google_user_id)
+            .where(Post.google_user_id == author_id)
+            .order_by(Post.created_at.desc())
+            .limit(limit)
+        )
+        self.db.execute(
+            insert(TimelineEntry)
+            .from_select(["user_id", "created_at", "post_id", "author_id"], recent)
+            .on_conflict_do_nothing()
+        )
+        self.db.commit()
+
+    def remove_author(self, user_id: str, author_id: str) -> None:
+        """Remove an author's posts from a timeline (after an unfollow)."""
+        self.db.execute(
+            delete(TimelineEntry).where(TimelineEntry.user_id == user_id, TimelineEntry.author_id == author_id)
+        )
+        self.db.commit()
+
+    def get_entries(self, user_id: str, before: Optional[datetime] = None, before_id: Optional[str] = None,
+                    limit: int = 20) -> List[TimelineItem]:
+        """
+        A page of a user's timeline, newest first: one range scan of the primary key. Starts
+        after (before, before_id), or before `before` without `before_id`. Raises ValueError
+        for a malformed `before_id`.
+        """
+        query = select(TimelineEntry.created_at, TimelineEntry.post_id).where(TimelineEntry.user_id == user_id)
+        if before is not None and before_id is not None:
+            query = query.where(tuple_(TimelineEntry.created_at, TimelineEntry.post_id) < tuple_(before, int(before_id)))
+        elif before is not None:
+            query = query.where(TimelineEntry.created_at < before)
+        query = query.order_by(TimelineEntry.created_at.desc(), TimelineEntry.post_id.desc()).limit(limit)
+        return [tuple(row) for row in self.db.execute(query)]
+
+    def get_author_entries(self, author_id: str, before: Optional[datetime] = None, before_id: Optional[str] = None,
+                           limit: int = 20) -> List[TimelineItem]:
+        """An author's newest posts in timeline order (for fan-out on read), after the same cursor as get_entries."""
+        query = select(Post.created_at, Post.id).where(Post.google_user_id == author_id)
+        if before is not None and before_id is not None:
+            # The plain created_at bound prunes the partitions after it
+            query = query.where(Post.created_at <= before, tuple_(Post.created_at, Post.id) < tuple_(before, int(before_id)))
+        elif before is not None:
+            query = query.where(Post.created_at < before)
+        query = query.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit)
+        return [tuple(row) for row in self.db.execute(query)]
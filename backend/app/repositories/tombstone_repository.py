@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.models.tombstone import Tombstone
+from app.core.tracing import traced
+
+
+@traced("repository")
+class TombstoneRepository:
+    """Repository for tombstones of deleted posts and comments (written by their repositories' delete)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_since(self, since: datetime, until: datetime, limit: int,
+                  after_id: Optional[str] = None) -> List[Tombstone]:
+        """
+        Tombstones written in (since, until] in (deleted_at, id) order (a range scan of
+        idx_tombstones_deleted_at); with `after_id`, also the ones written at `since` with a
+        greater id. Raises ValueError for a malformed `after_id`.
+        """
+        written = Tombstone.deleted_at > since
+        if after_id is not None:
+            written = (Tombstone.deleted_at >= since) & (written | (Tombstone.id > int(after_id)))
+        return (
+            self.db.query(Tombstone)
+            .filter(written, Tombstone.deleted_at <= until)
+            .order_by(Tombstone.deleted_at.asc(), Tombstone.id.asc())
+            .limit(limit)
+            .all()
+        )
+
+    def prune(self, before: datetime) -> int:
+        """Delete tombstones older than `before`. Returns how many were deleted."""
+        deleted = (
+            self.db.query(Tombstone)
+            .filter(Tombstone.deleted_at < before)
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
+        return deleted
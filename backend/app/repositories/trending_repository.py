@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Dict, List, Tuple
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.trending_score import TrendingScore
+from app.core.tracing import traced
+
+# PostgreSQL raises an error instead of returning 0 when exp() underflows double precision
+_MIN_EXPONENT = -700.0
+
+
+def _decay(decay_rate: float, elapsed):
+    """exp(-decay_rate * elapsed) for an elapsed interval expression."""
+    return func.exp(func.greatest(-decay_rate * func.extract("epoch", elapsed), _MIN_EXPONENT))
+
+
+@traced("repository")
+class TrendingRepository:
+    """Repository for the trending ranking checkpoint."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def merge(self, deltas: Dict[int, float], scored_at: datetime, decay_rate: float, keep: int) -> None:
+        """
+        Add one worker's score deltas to the checkpoint in one transaction. Workers each
+        see a share of the events, so a post's new score is its stored one decayed to
+        scored_at plus the delta (one INSERT ... ON CONFLICT DO UPDATE); posts left
+        without a positive score are dropped and the checkpoint is then trimmed to the
+        `keep` best posts.
+        """
+        if deltas:
+            statement = insert(TrendingScore).values(
+                [{"post_id": post_id, "score": delta, "scored_at": scored_at} for post_id, delta in deltas.items()]
+            )
+            stored = TrendingScore.score * _decay(decay_rate, statement.excluded.scored_at - TrendingScore.scored_at)
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=[TrendingScore.post_id],
+                set_={"score": stored + statement.excluded.score, "scored_at": statement.excluded.scored_at},
+            ))
+        decayed = TrendingScore.score * _decay(decay_rate, literal(scored_at) - TrendingScore.scored_at)
+        best = select(TrendingScore.post_id).where(TrendingScore.score > 0).order_by(decayed.desc()).limit(keep)
+        self.db.execute(delete(TrendingScore).where(TrendingScore.post_id.not_in(best)))
+        self.db.commit()
+
+    def get_all(self) -> List[Tuple[int, float, datetime]]:
+        """Get every checkpointed score as (post_id, score, scored_at)."""
+        rows = self.db.query(TrendingScore.post_id, TrendingScore.score, TrendingScore.scored_at).all()
+        return [tuple(row) for row in rows]
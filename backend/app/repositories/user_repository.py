@@ -1,8 +1,15 @@
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 from app.models.user import User
+from app.core.tracing import traced
 
+# Looked up on every sign-in and follow; built once with a bound parameter (see post_repository)
+_BY_GOOGLE_ID = select(User).where(User.google_user_id == bindparam("google_user_id")).limit(1)
+_IDS_BY_NAMES = select(User.name, User.google_user_id).where(User.name.in_(bindparam("names", expanding=True)))
 
+
+@traced("repository")
 class UserRepository:
     """Repository for User database operations."""
 
@@ -24,12 +31,22 @@ class UserRepository:
 
     def get_by_google_id(self, google_user_id: str) -> Optional[User]:
         """Get a user by their Google user ID."""
-        return self.db.query(User).filter(User.google_user_id == google_user_id).first()
+        return self.db.scalars(_BY_GOOGLE_ID, {"google_user_id": google_user_id}).first()
 
     def get_by_email(self, email: str) -> Optional[User]:
         """Get a user by their email."""
         return self.db.query(User).filter(User.email == email).first()
 
+    def get_ids_by_names(self, names: Iterable[str]) -> Dict[str, List[str]]:
+        """Google user IDs of the users with each of these exact names (for @mentions), in one query."""
+        ids: Dict[str, List[str]] = {}
+        names = list(names)
+        if not names:
+            return ids
+        for name, google_user_id in self.db.execute(_IDS_BY_NAMES, {"names": names}):
+            ids.setdefault(name, []).append(google_user_id)
+        return ids
+
     def update(self, user: User, name: Optional[str] = None, picture: Optional[str] = None) -> User:
         """Update a user's fields."""
         if name is not None:
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import datetime
+from typing import List, Union
+from app.schemas.comment import CommentResponse
+from app.schemas.post import PostResponse
+
+
+class DeletedResponse(BaseModel):
+    """Schema for a deleted post or comment (from its tombstone)."""
+    type: str = Field(..., validation_alias="entity_type", description='"post" or "comment"')
+    id: Union[int, str] = Field(..., validation_alias="entity_id")
+    post_id: Union[int, str]  # The comment's post; for a post, the post itself
+    deleted_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ChangesResponse(BaseModel):
+    """Schema for delta sync: everything that changed since the client's token."""
+    posts: List[PostResponse]  # Created or updated posts
+    comments: List[CommentResponse]  # Created or updated comments
+    deleted: List[DeletedResponse]  # Comments of a deleted post are not listed separately
+    next_token: str  # Pass as `since` on the next poll
+    has_more: bool  # More changes are waiting; poll again right away with next_token
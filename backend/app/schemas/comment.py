@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 
 class CommentBase(BaseModel):
@@ -10,7 +10,7 @@ class CommentBase(BaseModel):
 
 class CommentCreate(CommentBase):
     """Schema for creating a comment (request body)."""
-    pass
+    parent_id: Optional[Union[int, str]] = Field(None, description="Comment to reply to (default: a top-level comment)")
 
 
 class CommentUpdate(BaseModel):
@@ -22,9 +22,18 @@ class CommentResponse(CommentBase):
     """Schema for comment response (includes all fields from DB)."""
     id: Union[int, str]  # int for PostgreSQL, str for Firestore
     post_id: Union[int, str]  # int for PostgreSQL, str for Firestore
+    parent_id: Optional[Union[int, str]] = None  # The comment replied to; None for a top-level comment
+    depth: int = 0  # 0 for a top-level comment, parent's depth + 1 for a reply
+    reply_count: int = 0  # Direct replies
     google_user_id: str
     author_name: str
     created_at: datetime
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CommentThreadResponse(BaseModel):
+    """Schema for a page of a comment thread: depth-first, each reply after its parent."""
+    comments: List[CommentResponse]
+    next_cursor: Optional[str] = None  # Pass as `cursor` for the next page; None on the last page
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field, ConfigDict
+from datetime import datetime
+from typing import List, Optional, Union
+
+
+class NotificationResponse(BaseModel):
+    """Schema for a notification, e.g. `actor_name` mentioned you in a post or comment."""
+    id: Union[int, str]  # int for PostgreSQL, str for Firestore
+    kind: str  # "mention"
+    actor_id: str
+    actor_name: str
+    post_id: Union[int, str]
+    comment_id: Optional[Union[int, str]] = None  # None for a mention in the post itself
+    read: bool
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class NotificationPageResponse(BaseModel):
+    """Schema for a page of the notifications inbox, newest first."""
+    notifications: List[NotificationResponse]
+    unread_count: int  # All unread notifications, not only this page's
+    next_cursor: Optional[str] = None  # Pass as `cursor` for the next page; None on the last page
+
+
+class NotificationsRead(BaseModel):
+    """Schema for marking notifications as read (request body)."""
+    ids: Optional[List[Union[int, str]]] = Field(
+        None, max_length=500, description="Notifications to mark as read (default: all unread notifications)"
+    )
+
+
+class NotificationsReadResponse(BaseModel):
+    """Schema for the result of marking notifications as read."""
+    marked: int  # Notifications that were unread and are now read
+    unread_count: int
@@ -28,5 +28,6 @@ class PostResponse(PostBase):
     created_at: datetime
     updated_at: datetime
     comment_count: int = 0
+    view_count: int = 0
 
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,53 @@
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Type
+
+from fastapi import Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from app.exceptions import ValidationError
+
+
+def parse_fields(raw: Optional[str], model: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a `fields=` query parameter ("id,subject,author_name") against a response model.
+    Returns None when the full model is wanted; `id` is always included.
+    """
+    if not raw:
+        return None
+    fields = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = fields - set(model.model_fields)
+    if unknown:
+        raise ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    fields.add("id")
+    if fields >= set(model.model_fields):
+        return None
+    return frozenset(fields)
+
+
+@lru_cache(maxsize=256)
+def sparse_model(model: Type[BaseModel], fields: FrozenSet[str]) -> Type[BaseModel]:
+    """Response model with only the given fields of `model`, generated once per field set."""
+    definitions = {
+        name: (info.annotation, info)
+        for name, info in model.model_fields.items()
+        if name in fields
+    }
+    return create_model(
+        f"{model.__name__}[{','.join(sorted(fields))}]",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+@lru_cache(maxsize=256)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Cached serializer for a list of `model` (straight to JSON bytes)."""
+    return TypeAdapter(List[model])
+
+
+def sparse_response(items: list, model: Type[BaseModel], fields: FrozenSet[str]) -> Response:
+    """
+    Serialize sparse items straight to a JSON response. Returning a Response skips
+    FastAPI re-validating them against the route's full response_model.
+    """
+    return Response(list_adapter(sparse_model(model, fields)).dump_json(items), media_type="application/json")
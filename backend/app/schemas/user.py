@@ -15,6 +15,7 @@ class UserCreate(UserBase):
 
 class UserResponse(UserBase):
     google_user_id: str
+    follower_count: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,228 @@
+"""
+Production entry point: python -m app.server
+
+Imports the application once in a master process, binds the listening
+socket and forks uvicorn workers that share it. The master:
+
+- sizes the worker count from the container CPU quota (or WEB_CONCURRENCY),
+- forwards SIGTERM/SIGINT so workers stop accepting and drain in-flight
+  requests for up to SERVER_GRACEFUL_TIMEOUT_SECONDS,
+- replaces workers that die, and recycles workers whose RSS exceeds
+  SERVER_WORKER_MAX_MEMORY_MB (a replacement is started first, then the old
+  worker is drained).
+"""
+import logging
+import math
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional, Set
+
+import uvicorn
+
+from app.core.config import settings
+
+
+logger = logging.getLogger("app.server")
+
+# After the drain, time for the lifespan shutdown (final flushes) before a worker is killed. The drain
+# and this must stay under Cloud Run's 10s between SIGTERM and SIGKILL
+SHUTDOWN_GRACE_SECONDS = 3.0
+# Exit status of a worker whose app failed to start (as uvicorn.run uses)
+STARTUP_FAILURE = 3
+
+
+def cpu_quota() -> float:
+    """CPUs available to this container: cgroup quota if set, else the CPU affinity mask."""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        try:
+            # cgroup v1
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                quota = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+            if quota > 0:
+                return quota / period
+        except (OSError, ValueError):
+            pass
+    if hasattr(os, "sched_getaffinity"):
+        return float(len(os.sched_getaffinity(0)))
+    return float(os.cpu_count() or 1)
+
+
+def worker_count() -> int:
+    if settings.WEB_CONCURRENCY:
+        return settings.WEB_CONCURRENCY
+    return max(1, min(settings.SERVER_MAX_WORKERS, math.ceil(cpu_quota())))
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process in MiB (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class Master:
+    def __init__(self, app, sock: socket.socket, workers: int):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.children: Dict[int, float] = {}  # pid -> start time
+        self.retiring: Set[int] = set()
+        self.stopping = False
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self.children[pid] = time.monotonic()
+        logger.info("Started worker %s", pid)
+        return pid
+
+    def _run_worker(self) -> None:
+        # Child: uvicorn installs its own SIGTERM/SIGINT handlers (graceful shutdown)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        config = uvicorn.Config(
+            self.app,
+            lifespan="on",
+            # Anyone can send X-Forwarded-For: only take it from the configured proxies
+            proxy_headers=bool(settings.SERVER_TRUSTED_PROXIES),
+            forwarded_allow_ips=",".join(settings.SERVER_TRUSTED_PROXIES) or None,
+            timeout_graceful_shutdown=int(settings.SERVER_GRACEFUL_TIMEOUT_SECONDS),
+            limit_max_requests=settings.SERVER_WORKER_MAX_REQUESTS,
+            access_log=False,
+        )
+        server = uvicorn.Server(config)
+        try:
+            server.run(sockets=[self.sock])
+        except BaseException:
+            logger.exception("Worker %s failed", os.getpid())
+            os._exit(1)
+        # 0: drained after SIGTERM, or recycled after SERVER_WORKER_MAX_REQUESTS
+        os._exit(0 if server.started else STARTUP_FAILURE)
+
+    def retire(self, pid: int) -> None:
+        """Drain a worker; its replacement is already running."""
+        self.retiring.add(pid)
+        os.kill(pid, signal.SIGTERM)
+
+    def handle_stop(self, signum, frame) -> None:
+        self.stopping = True
+
+    def reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.children.pop(pid, None)
+            expected = pid in self.retiring or self.stopping
+            self.retiring.discard(pid)
+            if started is None or expected:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code == 0:
+                # uvicorn stops a worker that served SERVER_WORKER_MAX_REQUESTS; the loop replaces it
+                logger.info("Worker %s recycled after %s requests", pid, settings.SERVER_WORKER_MAX_REQUESTS)
+                continue
+            logger.warning("Worker %s exited with status %s", pid, code)
+            # Avoid a tight fork loop if workers crash on startup
+            if time.monotonic() - started < 1.0:
+                time.sleep(1.0)
+
+    def check_memory(self) -> None:
+        limit = settings.SERVER_WORKER_MAX_MEMORY_MB
+        if not limit:
+            return
+        for pid in list(self.children):
+            if pid in self.retiring:
+                continue
+            usage = rss_mb(pid)
+            if usage is not None and usage > limit:
+                logger.warning("Worker %s uses %.0f MiB (limit %s MiB), recycling", pid, usage, limit)
+                self.spawn()
+                self.retire(pid)
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        while not self.stopping:
+            self.reap()
+            active = len(self.children) - len(self.retiring)
+            for _ in range(self.workers - active):
+                if not self.stopping:
+                    self.spawn()
+            self.check_memory()
+            time.sleep(1.0)
+
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        logger.info("Draining %s workers", len(self.children))
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + settings.SERVER_GRACEFUL_TIMEOUT_SECONDS + SHUTDOWN_GRACE_SECONDS
+        while self.children and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.children):
+            logger.warning("Worker %s did not drain in time, killing", pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(name)s] %(message)s")
+
+    # Behind a proxy every anonymous peer address is the proxy, so per-IP rate limit
+    # buckets would be shared by all clients
+    if settings.RATE_LIMIT_ENABLED and not settings.SERVER_TRUSTED_PROXIES:
+        logger.error(
+            "RATE_LIMIT_ENABLED requires SERVER_TRUSTED_PROXIES (the proxy's address range) "
+            "so clients are told apart by X-Forwarded-For; set it or disable rate limiting"
+        )
+        sys.exit(1)
+
+    # Preload: import the application once so forked workers share its memory pages
+    from app.main import app
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((settings.HOST, settings.PORT))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    workers = worker_count()
+    logger.info(
+        "Listening on %s:%s with %s workers (cpu quota %.2f, threadpool %s per worker)",
+        settings.HOST, settings.PORT, workers, cpu_quota(), settings.threadpool_size,
+    )
+    Master(app, sock, workers).run()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
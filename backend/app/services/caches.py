@@ -0,0 +1,38 @@
+from app.core.background import delayed_calls
+from app.core.cache import EntityCache
+from app.core.config import settings
+from app.core.invalidation import InvalidationEvent, invalidation_bus
+
+
+# Read-through cache for single posts and per-post comment pages, tagged with post_tag(post_id)
+post_cache = EntityCache("posts", max_entries=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL_SECONDS)
+
+
+def post_tag(post_id) -> tuple:
+    """
+    Tag of the entries built from a post. Post ids arrive as int or str (path
+    parameters are Union[int, str], invalidation events carry the model's id),
+    so they are compared as str.
+    """
+    return ("post", str(post_id))
+
+
+def _evict(event: InvalidationEvent) -> None:
+    if event.entity == "*":
+        post_cache.clear()
+        return
+    if event.entity == "post":
+        tag = post_tag(event.entity_id)
+    elif event.entity == "comment":
+        # Comment pages and comment counts hang off the post
+        tag = post_tag(event.post_id)
+    else:
+        return
+    post_cache.invalidate(tag)
+    if settings.POSTGRES_REPLICA_HOSTS:
+        # A lagging replica can hand a pre-write row to the next cache miss; evict
+        # again once replicas should have caught up
+        delayed_calls.call_later(settings.READ_YOUR_WRITES_SECONDS, post_cache.invalidate, tag)
+
+
+invalidation_bus.subscribe(_evict)
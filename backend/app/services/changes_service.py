@@ -0,0 +1,151 @@
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional, Tuple
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import db_session
+from app.core.metrics import metrics
+from app.core.read_routing import read_only
+from app.exceptions import GoneError, ValidationError
+from app.repositories import get_comment_repository, get_post_repository, get_tombstone_repository
+from app.schemas.changes import ChangesResponse, DeletedResponse
+from app.schemas.comment import CommentResponse
+from app.schemas.post import PostResponse
+from app.core.tracing import traced
+
+
+# Changes are paged in (time, kind, id) order; kinds sort by these names
+KINDS = ("comment", "deleted", "post")
+
+# Smallest step of the stored timestamps (microseconds on both backends)
+_TICK = timedelta(microseconds=1)
+
+
+class Position(NamedTuple):
+    """
+    Where a sync token resumes: after the change of `kind` and `id` at `time`, or, without
+    a kind, after every change at `time`.
+    """
+    time: datetime
+    kind: Optional[str] = None
+    id: Optional[str] = None
+
+
+def encode_token(position: Position) -> str:
+    """Opaque sync token for a position: the time, then the kind and id of the last change read."""
+    parts = [position.time.astimezone(timezone.utc).isoformat()]
+    if position.kind is not None:
+        parts += [position.kind, str(position.id)]
+    return base64.urlsafe_b64encode(" ".join(parts).encode()).decode().rstrip("=")
+
+
+def decode_token(token: str) -> Position:
+    try:
+        parts = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode().split(" ")
+        time = datetime.fromisoformat(parts[0])
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError("Invalid sync token")
+    if time.tzinfo is None or len(parts) not in (1, 3) or (len(parts) == 3 and parts[1] not in KINDS):
+        raise ValidationError("Invalid sync token")
+    return Position(time, *parts[1:])
+
+
+def _resume(position: Position, kind: str) -> Tuple[datetime, Optional[str]]:
+    """(since, after_id) that resumes reading changes of `kind` after `position`."""
+    if position.kind is None or kind < position.kind:
+        return position.time, None  # Every change of this kind at that time was read
+    if kind == position.kind:
+        return position.time, position.id
+    return position.time - _TICK, None  # None of them were
+
+
+@traced("service")
+class ChangesService:
+    """
+    Service layer for delta sync (GET /api/posts/changes).
+
+    Changes are ordered by (time, kind, id): a post's or comment's updated_at,
+    a tombstone's deleted_at. A token is a position in that order, and a poll
+    returns the changes after it: one index range scan each for posts,
+    comments and tombstones, so changes sharing a timestamp are never skipped
+    at a page boundary. Changes from the last SYNC_SETTLE_SECONDS are
+    left for the next poll, so a write whose transaction started before the
+    poll but committed after it (or that a replica has not applied yet) is
+    never skipped. Tokens older than the tombstone retention are rejected with
+    410: deletions since then may have been pruned, so the client must reload.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.post_repository = get_post_repository(db)
+        self.comment_repository = get_comment_repository(db)
+        self.tombstone_repository = get_tombstone_repository(db)
+
+    @read_only
+    def get_changes(self, token: Optional[str], limit: int = 500) -> ChangesResponse:
+        """
+        Get changes after a sync token.
+        Business Logic:
+        - Without a token, returns no changes and a token for "now" (get it before loading the full list)
+        - At most `limit` changes in (time, kind, id) order; has_more tells the client to poll again at once
+        """
+        now = datetime.now(timezone.utc)
+        until = now - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+        position = decode_token(token) if token is not None else None
+        if position is None or position.time >= until:
+            return ChangesResponse(posts=[], comments=[], deleted=[],
+                                   next_token=encode_token(position or Position(until)), has_more=False)
+        if position.time < now - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS):
+            raise GoneError("Sync token expired, reload all posts")
+
+        # One more than the limit from each source tells whether anything is left after the page
+        changes: List[Tuple[datetime, str, object]] = []
+        sources = (
+            ("post", self.post_repository.get_changed, "updated_at"),
+            ("comment", self.comment_repository.get_changed, "updated_at"),
+            ("deleted", self.tombstone_repository.get_since, "deleted_at"),
+        )
+        try:
+            for kind, read, changed_at in sources:
+                since, after_id = _resume(position, kind)
+                changes += [(getattr(item, changed_at), kind, item)
+                            for item in read(since, until, limit + 1, after_id=after_id)]
+        except ValueError:
+            raise ValidationError("Invalid sync token")
+        changes.sort(key=lambda change: (change[0], change[1], change[2].id))
+
+        # Each source returned every unread change up to its last row, and one that hit its limit has
+        # at least `limit` changes before that row, so the first `limit` changes are complete
+        has_more = len(changes) > limit
+        page = changes[:limit]
+        if has_more:
+            changed_at, kind, item = page[-1]
+            next_position = Position(changed_at, kind, item.id)
+        else:
+            next_position = Position(until)
+
+        response = ChangesResponse(posts=[], comments=[], deleted=[], next_token=encode_token(next_position),
+                                   has_more=has_more)
+        comment_counts = self.comment_repository.count_by_post_ids(item.id for _, kind, item in page if kind == "post")
+        for _, kind, item in page:
+            if kind == "post":
+                post = PostResponse.model_validate(item)
+                post.comment_count = comment_counts.get(item.id, 0)
+                response.posts.append(post)
+            elif kind == "comment":
+                response.comments.append(CommentResponse.model_validate(item))
+            else:
+                response.deleted.append(DeletedResponse.model_validate(item))
+        return response
+
+
+def prune_tombstones() -> None:
+    """Delete tombstones past the retention; tokens that old are rejected anyway."""
+    before = datetime.now(timezone.utc) - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+    with db_session() as db:
+        pruned = get_tombstone_repository(db).prune(before)
+    metrics.counter("tombstones_pruned_total").inc(pruned)
+
+
+tombstone_pruner = PeriodicTask("tombstone-prune", prune_tombstones, settings.TOMBSTONE_PRUNE_INTERVAL_SECONDS)
@@ -1,41 +1,93 @@
-from typing import List
+import base64
+import binascii
+from typing import FrozenSet, List, Optional
+from pydantic import BaseModel
 from app.repositories import get_comment_repository, get_post_repository
-from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse
-from app.exceptions import NotFoundError, ForbiddenError
+from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse, CommentThreadResponse
+from app.schemas.sparse import sparse_model
+from app.exceptions import NotFoundError, ForbiddenError, ValidationError
+from app.core.invalidation import invalidation_bus
+from app.core.mentions import extract_mentions
+from app.core.threads import MAX_DEPTH
+from app.core.read_routing import prefer_replica, read_only
+from app.core.singleflight import SingleFlight
+from app.services.caches import post_cache, post_tag
+from app.services.notification_writer import Mention, notification_writer
+from app.services.trending import trending
+from app.core.tracing import traced
 
 
 # Default mock user constants for backward compatibility
 MOCK_USER_ID = "1"
 MOCK_USER_NAME = "Test User"
 
+# Coalesces concurrent cache misses for the same comment page into one query
+_comment_reads = SingleFlight("comments")
 
+
+def encode_cursor(path: str) -> str:
+    """Opaque thread cursor: the path of the last comment of a page."""
+    return base64.urlsafe_b64encode(path.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        path = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError("Invalid cursor")
+    if not path.isalnum():
+        raise ValidationError("Invalid cursor")
+    return path
+
+
+@traced("service")
 class CommentService:
     """Service layer for comment business logic."""
 
     def __init__(self, db):
+        self.db = db
         self.comment_repo = get_comment_repository(db)
         self.post_repo = get_post_repository(db)
 
     def create_comment(self, post_id: int, comment_data: CommentCreate, google_user_id: str = MOCK_USER_ID, author_name: str = MOCK_USER_NAME) -> CommentResponse:
         """
-        Create a new comment on a post.
+        Create a new comment on a post, or a reply to one of its comments.
         Business Logic:
         - Validates post exists
+        - Validates the parent comment (if any) belongs to the post and is above MAX_DEPTH
         - Uses authentication data from request
+        - Queues notifications for @mentioned users
         """
         # Validate post exists
         post = self.post_repo.get_by_id(post_id)
         if not post:
             raise NotFoundError(f"Post with id {post_id} not found")
 
+        parent = None
+        if comment_data.parent_id is not None:
+            parent = self.comment_repo.get_by_id(comment_data.parent_id)
+            if not parent or str(parent.post_id) != str(post.id):
+                raise NotFoundError(f"Comment with id {comment_data.parent_id} not found on post {post_id}")
+            if parent.depth >= MAX_DEPTH:
+                raise ValidationError(f"Replies cannot be nested more than {MAX_DEPTH} levels deep")
+
         comment = self.comment_repo.create(
             post_id=post_id,
             content=comment_data.content,
             google_user_id=google_user_id,
-            author_name=author_name
+            author_name=author_name,
+            parent=parent
         )
+        trending.record_comment(comment.post_id, 1)
+        mentions = extract_mentions(comment.content)
+        if mentions:
+            notification_writer.record(
+                Mention(google_user_id, author_name, comment.post_id, comment.id, mentions, comment.created_at)
+            )
+        invalidation_bus.publish("comment", comment.id, post_id=comment.post_id)
         return CommentResponse.model_validate(comment)
 
+    @read_only
     def get_comment(self, comment_id: int) -> CommentResponse:
         """
         Get a specific comment by ID.
@@ -46,23 +98,93 @@ class CommentService:
             raise NotFoundError(f"Comment with id {comment_id} not found")
         return CommentResponse.model_validate(comment)
 
-    def get_post_comments(self, post_id: int, skip: int = 0, limit: int = 100) -> List[CommentResponse]:
+    @read_only
+    def get_post_comments(self, post_id: int, skip: int = 0, limit: int = 100,
+                          fields: Optional[FrozenSet[str]] = None) -> List[BaseModel]:
         """
         Get all comments for a specific post.
-        Business Logic: Validates post exists.
+        Business Logic: Validates post exists. With `fields`, only those fields are loaded and
+        returned. Served from the post cache when possible; the returned list is shared and
+        must not be mutated.
         """
-        # Validate post exists
+        key = ("comments", post_id, skip, limit, fields)
+        cached = post_cache.get(key)
+        if cached is not None:
+            return cached
+
+        generation = post_cache.generation()
+
+        def load() -> List[CommentResponse]:
+            # Validate post exists
+            post = self.post_repo.get_by_id(post_id)
+            if not post:
+                raise NotFoundError(f"Post with id {post_id} not found")
+
+            model = CommentResponse if fields is None else sparse_model(CommentResponse, fields)
+            comments = self.comment_repo.get_by_post_id(post_id, skip=skip, limit=limit, fields=fields)
+            responses = [model.model_validate(comment) for comment in comments]
+            post_cache.set(key, responses, tags=[post_tag(post_id)], generation=generation)
+            return responses
+
+        # Requests arriving after a write (new generation) or needing the primary don't join older reads
+        return _comment_reads.do((key, generation, prefer_replica()), load)
+
+    @read_only
+    def get_thread(self, post_id: int, cursor: Optional[str] = None, limit: int = 100) -> CommentThreadResponse:
+        """
+        Get a page of a post's comments as threads: depth-first, each reply after its parent.
+        Business Logic: Validates post exists. Page with `cursor` = next_cursor of the previous
+        page. Served from the post cache when possible.
+        """
+        key = ("thread", post_id, cursor, limit)
+        cached = post_cache.get(key)
+        if cached is not None:
+            return cached
+
+        generation = post_cache.generation()
+        after = decode_cursor(cursor) if cursor is not None else None
         post = self.post_repo.get_by_id(post_id)
         if not post:
             raise NotFoundError(f"Post with id {post_id} not found")
 
-        comments = self.comment_repo.get_by_post_id(post_id, skip=skip, limit=limit)
-        return [CommentResponse.model_validate(comment) for comment in comments]
+        comments = self.comment_repo.get_thread(post_id, since=post.created_at, after=after, limit=limit)
+        page = self._thread_page(comments, limit)
+        post_cache.set(key, page, tags=[post_tag(post_id)], generation=generation)
+        return page
+
+    @read_only
+    def get_replies(self, comment_id: int, cursor: Optional[str] = None, limit: int = 100) -> CommentThreadResponse:
+        """
+        Get a page of the replies below a comment, at any depth, depth-first.
+        Business Logic: Validates comment exists. Page with `cursor` = next_cursor of the previous page.
+        """
+        after = decode_cursor(cursor) if cursor is not None else None
+        comment = self.comment_repo.get_by_id(comment_id)
+        if not comment:
+            raise NotFoundError(f"Comment with id {comment_id} not found")
+        if comment.path is None:
+            # Written before threads and never replied to (Datastore)
+            return CommentThreadResponse(comments=[])
+
+        replies = self.comment_repo.get_thread(
+            comment.post_id, since=comment.created_at, root_path=comment.path, after=after, limit=limit
+        )
+        return self._thread_page(replies, limit)
+
+    @staticmethod
+    def _thread_page(comments: list, limit: int) -> CommentThreadResponse:
+        return CommentThreadResponse(
+            comments=[CommentResponse.model_validate(comment) for comment in comments],
+            next_cursor=encode_cursor(comments[-1].path) if len(comments) == limit else None,
+        )
 
-    def get_user_comments(self, google_user_id: str, skip: int = 0, limit: int = 100) -> List[CommentResponse]:
-        """Get all comments by a specific user."""
-        comments = self.comment_repo.get_by_user_id(google_user_id, skip=skip, limit=limit)
-        return [CommentResponse.model_validate(comment) for comment in comments]
+    @read_only
+    def get_user_comments(self, google_user_id: str, skip: int = 0, limit: int = 100,
+                          fields: Optional[FrozenSet[str]] = None) -> List[BaseModel]:
+        """Get all comments by a specific user. With `fields`, only those fields are loaded and returned."""
+        model = CommentResponse if fields is None else sparse_model(CommentResponse, fields)
+        comments = self.comment_repo.get_by_user_id(google_user_id, skip=skip, limit=limit, fields=fields)
+        return [model.model_validate(comment) for comment in comments]
 
     def update_comment(self, comment_id: int, comment_data: CommentUpdate, user_id: str = MOCK_USER_ID) -> CommentResponse:
         """
@@ -88,11 +210,12 @@ class CommentService:
             comment=comment,
             content=comment_data.content
         )
+        invalidation_bus.publish("comment", updated_comment.id, post_id=updated_comment.post_id)
         return CommentResponse.model_validate(updated_comment)
 
     def delete_comment(self, comment_id: int, user_id: str = MOCK_USER_ID) -> None:
         """
-        Delete a comment.
+        Delete a comment and the replies below it.
         Business Logic:
         - Validates comment exists
         - Validates user owns the comment
@@ -105,4 +228,6 @@ class CommentService:
         if comment.google_user_id != user_id:
             raise ForbiddenError("You don't have permission to delete this comment")
 
-        self.comment_repo.delete(comment)
+        deleted = self.comment_repo.delete(comment)
+        trending.record_comment(comment.post_id, -deleted)
+        invalidation_bus.publish("comment", comment.id, post_id=comment.post_id)
@@ -0,0 +1,50 @@
+import json
+from contextlib import nullcontext
+from typing import Iterable, Iterator, List, Optional
+from app.core.config import settings
+from app.core.database import db_session
+from app.core.metrics import metrics
+from app.repositories import get_comment_repository, get_post_repository
+from app.schemas.comment import CommentResponse
+from app.schemas.post import PostResponse
+
+# comment_count is derived (one COUNT per post) and the comments are in the export anyway
+_POST_EXCLUDE = {"comment_count"}
+
+
+def _lines(record_type: str, model, rows: Iterable, exclude: Optional[set], batch_size: int) -> Iterator[bytes]:
+    """One NDJSON line per row, yielded as chunks of `batch_size` lines."""
+    chunk: List[str] = []
+    count = 0
+    for row in rows:
+        record = {"type": record_type, **model.model_validate(row).model_dump(mode="json", exclude=exclude)}
+        chunk.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        if len(chunk) >= batch_size:
+            yield ("\n".join(chunk) + "\n").encode()
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode()
+        count += len(chunk)
+    metrics.counter("export_rows_total", type=record_type).inc(count)
+
+
+def export_ndjson(google_user_id: Optional[str] = None, batch_size: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Every post, then every comment, of one user (or of everyone) as NDJSON:
+    {"type": "post", ...} / {"type": "comment", ...} lines, in chunks.
+
+    Rows are streamed (server-side cursor on PostgreSQL, cursor-chained
+    batches on Datastore), so memory use does not grow with the export. The
+    session is opened by the generator itself, as a streaming response is
+    iterated after the request's dependencies have been closed. PostgreSQL
+    reads go to a replica when there is one.
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    with db_session() as db:
+        reading = getattr(db, "reading", None)
+        with reading() if reading is not None else nullcontext():
+            posts = get_post_repository(db).iter_all(google_user_id, batch_size=batch_size)
+            yield from _lines("post", PostResponse, posts, _POST_EXCLUDE, batch_size)
+            comments = get_comment_repository(db).iter_all(google_user_id, batch_size=batch_size)
+            yield from _lines("comment", CommentResponse, comments, None, batch_size)
@@ -0,0 +1,127 @@
+import gzip
+import hashlib
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+from pydantic import TypeAdapter
+
+from app.core.background import PeriodicTask, delayed_calls
+from app.core.config import settings
+from app.core.database import db_session
+from app.core.invalidation import InvalidationEvent, invalidation_bus
+from app.core.metrics import metrics
+from app.schemas.post import PostResponse
+
+
+_page_adapter = TypeAdapter(List[PostResponse])
+
+
+class Snapshot(NamedTuple):
+    body: bytes  # JSON, exactly what GET /api/posts would render
+    gzipped: bytes
+    etag: str  # Weak: the same for the JSON and the gzipped bytes
+    built_at: float  # time.monotonic()
+
+
+class FeedSnapshot:
+    """
+    Pre-rendered first page of GET /api/posts (default parameters).
+
+    The page is serialized to JSON and gzipped once per rebuild; requests get
+    the same bytes objects, with no query and no serialization. Post and
+    comment invalidation events mark the snapshot stale and wake the rebuild
+    thread, which also refreshes it every `refresh_interval` (view counts are
+    not published on the bus). Until the rebuild is done the stale snapshot is
+    served (stale-while-revalidate); a burst of writes is coalesced into one
+    rebuild per `min_interval`. A snapshot older than `max_stale` (rebuilds
+    failing) is not served at all.
+    """
+
+    def __init__(self, limit: int, refresh_interval: float, min_interval: float, max_stale: float):
+        self.limit = limit
+        self.min_interval = min_interval
+        self.max_stale = max_stale
+        self._snapshot: Optional[Snapshot] = None
+        self._version = 0  # Bumped by every change event
+        self._built_version = -1  # Version the current snapshot was built at
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._task = PeriodicTask("feed-snapshot", self.rebuild, refresh_interval)
+
+    def get(self) -> Optional[Snapshot]:
+        """The current snapshot, possibly stale; None if there is none (yet) or it is too old to serve."""
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.built_at > self.max_stale:
+            metrics.counter("feed_snapshot_misses_total").inc()
+            return None
+        if self._built_version != self._version:
+            metrics.counter("feed_snapshot_stale_hits_total").inc()
+        else:
+            metrics.counter("feed_snapshot_hits_total").inc()
+        return snapshot
+
+    def mark_stale(self) -> None:
+        with self._lock:
+            self._version += 1
+        self._task.wake()
+
+    def rebuild(self) -> None:
+        """Query, serialize and compress the first page, then swap it in."""
+        from app.services.post_service import PostService
+
+        if self._stopping:
+            return  # PeriodicTask runs once more on stop; nobody would be served the result
+        snapshot = self._snapshot
+        if snapshot is not None:
+            # Coalesce bursts of changes; the stale snapshot is served meanwhile
+            delay = snapshot.built_at + self.min_interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        started = time.monotonic()
+        version = self._version  # Changes after this point leave the new snapshot stale
+        with db_session() as db:
+            posts = PostService(db).get_all_posts(skip=0, limit=self.limit)
+        body = _page_adapter.dump_json(posts)
+        self._snapshot = Snapshot(
+            body=body,
+            gzipped=gzip.compress(body, compresslevel=6, mtime=0),
+            etag=f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            built_at=time.monotonic(),
+        )
+        self._built_version = version
+        if self._version != version:
+            self._task.wake()
+        metrics.histogram("feed_snapshot_rebuild_seconds").observe(time.monotonic() - started)
+        metrics.gauge("feed_snapshot_bytes").set(len(body))
+
+    def start(self) -> None:
+        self._stopping = False
+        self._task.start()
+        self._task.wake()  # Build the first snapshot right away
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._task.stop()
+
+
+feed_snapshot = FeedSnapshot(
+    limit=100,  # The route's default page size
+    refresh_interval=settings.FEED_SNAPSHOT_REFRESH_SECONDS,
+    min_interval=settings.FEED_SNAPSHOT_MIN_INTERVAL_SECONDS,
+    max_stale=settings.FEED_SNAPSHOT_MAX_STALE_SECONDS,
+)
+
+
+def _on_change(event: InvalidationEvent) -> None:
+    if event.entity not in ("post", "comment", "*"):
+        return
+    feed_snapshot.mark_stale()
+    if settings.POSTGRES_REPLICA_HOSTS:
+        # The rebuild reads from a replica that may not have the write yet; rebuild
+        # again once replicas should have caught up
+        delayed_calls.call_later(settings.READ_YOUR_WRITES_SECONDS, feed_snapshot.mark_stale)
+
+
+invalidation_bus.subscribe(_on_change)
@@ -0,0 +1,64 @@
+import base64
+import binascii
+from typing import List, Optional, Union
+from app.core.read_routing import read_only
+from app.exceptions import ValidationError
+from app.repositories import get_notification_repository
+from app.schemas.notification import NotificationPageResponse, NotificationResponse, NotificationsReadResponse
+from app.core.tracing import traced
+
+
+def encode_cursor(position: str) -> str:
+    """Opaque inbox cursor: the repository's position of the last notification of a page."""
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError("Invalid cursor")
+
+
+@traced("service")
+class NotificationService:
+    """
+    Service layer for the notifications inbox.
+
+    Notifications are written in batches by the notification writer
+    (app.services.notification_writer); the unread count is a counter on the
+    user, kept in step with the unread notifications, so it is read without
+    counting rows.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.repository = get_notification_repository(db)
+
+    @read_only
+    def get_notifications(self, user_id: str, cursor: Optional[str] = None, limit: int = 20) -> NotificationPageResponse:
+        """
+        Get a page of a user's notifications, newest first.
+        Business Logic: next_cursor is set while there may be more pages.
+        """
+        before = decode_cursor(cursor) if cursor else None
+        try:
+            notifications, next_before = self.repository.get_page(user_id, before=before, limit=limit)
+        except ValueError:
+            raise ValidationError("Invalid cursor")
+        return NotificationPageResponse(
+            notifications=[NotificationResponse.model_validate(notification) for notification in notifications],
+            unread_count=self.repository.get_unread_count(user_id),
+            next_cursor=encode_cursor(next_before) if next_before is not None else None,
+        )
+
+    def mark_read(self, user_id: str, ids: Optional[List[Union[int, str]]] = None) -> NotificationsReadResponse:
+        """
+        Mark notifications as read: the given ones, or all unread ones.
+        Business Logic: Other users' notifications and ones already read are skipped.
+        """
+        try:
+            marked, unread_count = self.repository.mark_read(user_id, ids)
+        except ValueError:
+            raise ValidationError("Invalid notification id")
+        return NotificationsReadResponse(marked=marked, unread_count=unread_count)
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, List, NamedTuple, Optional, Sequence, Union
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import db_session
+from app.core.metrics import metrics
+from app.repositories import get_notification_repository, get_user_repository
+
+
+EntityId = Union[int, str]
+
+
+class Mention(NamedTuple):
+    """A post (comment_id None) or comment that mentions `names`."""
+    actor_id: str
+    actor_name: str
+    post_id: EntityId
+    comment_id: Optional[EntityId]
+    names: Sequence[str]
+    created_at: datetime
+
+
+class NotificationWriter:
+    """
+    Batched background writer for mention notifications.
+
+    Creating a post or comment only queues its mentions in memory. The flush
+    thread writes them every `flush_interval` seconds, or as soon as
+    `batch_size` are queued: the names mentioned anywhere in the batch are
+    resolved with one user lookup, and the notifications and the recipients'
+    unread counter increments are written with one batched insert and one
+    counter update. Mentions that fail to flush are kept for the next try (at
+    most `max_pending`, oldest dropped first), and stop() flushes whatever is
+    left on graceful shutdown.
+    """
+
+    def __init__(self, flush_interval: float, batch_size: int, max_pending: int):
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending: Deque[Mention] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._task = PeriodicTask("notification-writer", self.flush, flush_interval)
+
+    def record(self, mention: Mention) -> None:
+        """Queue the notifications of a mention. Never touches the database."""
+        with self._lock:
+            self._pending.append(mention)
+            if len(self._pending) > self.max_pending:
+                self._pending.popleft()
+                metrics.counter("notification_writer_dropped_total").inc()
+            pending = len(self._pending)
+        if pending >= self.batch_size:
+            self._task.wake()
+
+    def flush(self) -> None:
+        """Resolve and write everything queued, in batches of `batch_size`."""
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                if not batch:
+                    return
+                self._write(batch)
+
+    def _write(self, batch: List[Mention]) -> None:
+        started = time.monotonic()
+        try:
+            with db_session() as db:
+                names = {name for mention in batch for name in mention.names}
+                user_ids = get_user_repository(db).get_ids_by_names(names)
+                notifications = []
+                for mention in batch:
+                    recipients = {user_id for name in mention.names for user_id in user_ids.get(name, ())}
+                    recipients.discard(mention.actor_id)  # Mentioning yourself notifies nobody
+                    for user_id in sorted(recipients):
+                        notifications.append({
+                            "user_id": user_id,
+                            "kind": "mention",
+                            "actor_id": mention.actor_id,
+                            "actor_name": mention.actor_name,
+                            "post_id": mention.post_id,
+                            "comment_id": mention.comment_id,
+                            "created_at": mention.created_at,
+                        })
+                get_notification_repository(db).add_batch(notifications)
+        except Exception:
+            # Put the batch back in front so it is retried on the next flush
+            with self._lock:
+                self._pending.extendleft(reversed(batch))
+                dropped = len(self._pending) - self.max_pending
+                for _ in range(max(0, dropped)):
+                    self._pending.popleft()
+            metrics.counter("notification_writer_errors_total").inc()
+            if dropped > 0:
+                metrics.counter("notification_writer_dropped_total").inc(dropped)
+            raise
+
+        metrics.histogram("notification_writer_batch_size").observe(len(batch))
+        metrics.histogram("notification_writer_flush_duration_seconds").observe(time.monotonic() - started)
+        metrics.counter("notifications_written_total").inc(len(notifications))
+
+    def start(self) -> None:
+        self._task.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread after a final flush."""
+        self._task.stop()
+
+
+notification_writer = NotificationWriter(
+    flush_interval=settings.NOTIFICATION_FLUSH_INTERVAL_SECONDS,
+    batch_size=settings.NOTIFICATION_FLUSH_BATCH_SIZE,
+    max_pending=settings.NOTIFICATION_MAX_PENDING,
+)
@@ -0,0 +1,66 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import db_session
+from app.core.metrics import metrics
+from app.core.partitions import PARTITIONED_TABLES, add_months, month_start, partition_name
+
+
+logger = logging.getLogger(__name__)
+
+
+def maintain_partitions(now: Optional[datetime] = None) -> None:
+    """
+    Create the partitions of the current month and the PARTITION_PREMAKE_MONTHS
+    after it, and detach the ones entirely older than PARTITION_RETENTION_MONTHS
+    (when set). Detached partitions stay in the database as archive tables
+    (e.g. to pg_dump and drop); their rows are not reported as deletions by delta sync.
+
+    There is no default partition (see app.core.partitions), so a row dated in a month
+    without a partition cannot be inserted: raises RuntimeError when the current or the
+    next month has none afterwards (e.g. its DDL timed out behind long queries).
+    """
+    from app.repositories import PartitionRepository
+
+    current = month_start(now or datetime.now(timezone.utc))
+    with db_session() as db:
+        repository = PartitionRepository(db)
+        for table in PARTITIONED_TABLES:
+            partitions = repository.get_partitions(table)
+            for offset in range(settings.PARTITION_PREMAKE_MONTHS + 1):
+                month = add_months(current, offset)
+                name = partition_name(table, month)
+                if name not in partitions:
+                    try:
+                        repository.create_partition(table, name, month, add_months(month, 1))
+                    except Exception:
+                        db.rollback()
+                        logger.exception("Could not create partition %s", name)
+                        continue
+                    metrics.counter("partitions_created_total", table=table).inc()
+                    logger.info("Created partition %s", name)
+
+            if settings.PARTITION_RETENTION_MONTHS <= 0:
+                continue
+            cutoff = add_months(current, -settings.PARTITION_RETENTION_MONTHS)
+            for name, month in sorted(partitions.items(), key=lambda item: item[1]):
+                if add_months(month, 1) <= cutoff:
+                    repository.detach_partition(table, name)
+                    metrics.counter("partitions_detached_total", table=table).inc()
+                    logger.info("Detached partition %s", name)
+
+        missing = []
+        for table in PARTITIONED_TABLES:
+            partitions = repository.get_partitions(table)
+            missing += [name for name in (partition_name(table, current), partition_name(table, add_months(current, 1)))
+                        if name not in partitions]
+    metrics.gauge("partitions_missing").set(len(missing))
+    if missing:
+        raise RuntimeError(f"Partitions missing, rows dated in their months cannot be inserted: {', '.join(missing)}")
+
+
+partition_maintainer = PeriodicTask(
+    "partition-maintenance", maintain_partitions, settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS
+)
@@ -1,25 +1,42 @@
-from typing import List
-from app.repositories import get_post_repository, get_comment_repository
+from typing import FrozenSet, List, Optional
+from pydantic import BaseModel
+from app.repositories import get_post_repository, get_comment_repository, get_timeline_repository
 from app.schemas.post import PostCreate, PostUpdate, PostResponse
+from app.schemas.sparse import sparse_model
 from app.exceptions import NotFoundError, ForbiddenError
+from app.core.invalidation import invalidation_bus
+from app.core.mentions import extract_mentions
+from app.core.read_routing import prefer_replica, read_only
+from app.core.singleflight import SingleFlight
+from app.services.caches import post_cache, post_tag
+from app.services.notification_writer import Mention, notification_writer
+from app.services.trending import trending
+from app.core.tracing import traced
 
 
 # Default mock user constants for backward compatibility
 MOCK_USER_ID = "1"
 MOCK_USER_NAME = "Test User"
 
+# Coalesces concurrent cache misses for the same post into one query
+_post_reads = SingleFlight("posts")
 
+
+@traced("service")
 class PostService:
     """Service layer for post business logic."""
 
     def __init__(self, db):
+        self.db = db
         self.repository = get_post_repository(db)
         self.comment_repository = get_comment_repository(db)
+        self.timeline_repository = get_timeline_repository(db)
 
     def create_post(self, post_data: PostCreate, google_user_id: str = MOCK_USER_ID, author_name: str = MOCK_USER_NAME) -> PostResponse:
         """
         Create a new post.
-        Business Logic: Uses authentication data from request.
+        Business Logic: Uses authentication data from request. Copies the post into
+        followers' home timelines. Queues notifications for @mentioned users.
         """
         post = self.repository.create(
             subject=post_data.subject,
@@ -27,33 +44,83 @@ class PostService:
             google_user_id=google_user_id,
             author_name=author_name
         )
+        # Followers of high-follower authors get the post merged in at read time instead
+        self.timeline_repository.fan_out(post.id, post.google_user_id, post.created_at)
+        mentions = extract_mentions(f"{post.subject}\n{post.content}")
+        if mentions:
+            notification_writer.record(Mention(google_user_id, author_name, post.id, None, mentions, post.created_at))
+        invalidation_bus.publish("post", post.id)
         return PostResponse.model_validate(post)
 
+    @read_only
     def get_post(self, post_id: int) -> PostResponse:
         """
         Get a specific post by ID.
-        Business Logic: Validates post exists.
+        Business Logic: Validates post exists. Served from the post cache when possible;
+        the returned object is shared and must not be mutated.
         """
-        post = self.repository.get_by_id(post_id)
-        if not post:
-            raise NotFoundError(f"Post with id {post_id} not found")
-        return PostResponse.model_validate(post)
+        key = post_tag(post_id)
+        cached = post_cache.get(key)
+        if cached is not None:
+            return cached
+
+        generation = post_cache.generation()
+
+        def load() -> PostResponse:
+            post = self.repository.get_by_id(post_id)
+            if not post:
+                raise NotFoundError(f"Post with id {post_id} not found")
+            response = PostResponse.model_validate(post)
+            post_cache.set(key, response, tags=[post_tag(post_id)], generation=generation)
+            return response
+
+        # Requests arriving after a write (new generation) or needing the primary don't join older reads
+        return _post_reads.do((key, generation, prefer_replica()), load)
 
-    def get_all_posts(self, skip: int = 0, limit: int = 100) -> List[PostResponse]:
-        """Get all posts with pagination."""
-        posts = self.repository.get_all(skip=skip, limit=limit)
+    @read_only
+    def get_all_posts(self, skip: int = 0, limit: int = 100, fields: Optional[FrozenSet[str]] = None) -> List[BaseModel]:
+        """
+        Get all posts with pagination.
+        Business Logic: With `fields`, only those fields are loaded and returned (sparse model),
+        and comments are only counted when comment_count was asked for.
+        """
+        model = PostResponse if fields is None else sparse_model(PostResponse, fields)
+        count_comments = fields is None or "comment_count" in fields
+        posts = self.repository.get_all(skip=skip, limit=limit, fields=fields)
         responses = []
         for post in posts:
+            response = model.model_validate(post)
+            if count_comments:
+                # Get comment count using repository (works for both PostgreSQL and Firestore)
+                response.comment_count = self.comment_repository.count_by_post_id(post.id)
+            responses.append(response)
+        return responses
+
+    @read_only
+    def get_trending_posts(self, limit: int = 20) -> List[PostResponse]:
+        """
+        Get trending posts, best first.
+        Business Logic: Ranking comes from the in-memory tracker, so only the top posts are read.
+        """
+        ranked_ids = [post_id for post_id, _ in trending.top(limit)]
+        posts_by_id = {post.id: post for post in self.repository.get_by_ids(ranked_ids)}
+        responses = []
+        for post_id in ranked_ids:
+            post = posts_by_id.get(post_id)
+            if post is None:
+                continue
             response = PostResponse.model_validate(post)
-            # Get comment count using repository (works for both PostgreSQL and Firestore)
             response.comment_count = self.comment_repository.count_by_post_id(post.id)
             responses.append(response)
         return responses
 
-    def get_user_posts(self, google_user_id: str, skip: int = 0, limit: int = 100) -> List[PostResponse]:
-        """Get all posts by a specific user."""
-        posts = self.repository.get_by_user_id(google_user_id, skip=skip, limit=limit)
-        return [PostResponse.model_validate(post) for post in posts]
+    @read_only
+    def get_user_posts(self, google_user_id: str, skip: int = 0, limit: int = 100,
+                       fields: Optional[FrozenSet[str]] = None) -> List[BaseModel]:
+        """Get all posts by a specific user. With `fields`, only those fields are loaded and returned."""
+        model = PostResponse if fields is None else sparse_model(PostResponse, fields)
+        posts = self.repository.get_by_user_id(google_user_id, skip=skip, limit=limit, fields=fields)
+        return [model.model_validate(post) for post in posts]
 
     def update_post(self, post_id: int, post_data: PostUpdate, user_id: str = MOCK_USER_ID) -> PostResponse:
         """
@@ -80,6 +147,7 @@ class PostService:
             subject=post_data.subject,
             content=post_data.content
         )
+        invalidation_bus.publish("post", updated_post.id)
         return PostResponse.model_validate(updated_post)
 
     def delete_post(self, post_id: int, user_id: str = MOCK_USER_ID) -> None:
@@ -88,7 +156,7 @@ class PostService:
         Business Logic:
         - Validates post exists
         - Validates user owns the post
-        - Cascades to delete comments (handled by DB)
+        - Cascades to delete comments (handled by the repository)
         """
         post = self.repository.get_by_id(post_id)
         if not post:
@@ -99,3 +167,5 @@ class PostService:
             raise ForbiddenError("You don't have permission to delete this post")
 
         self.repository.delete(post)
+        trending.discard(post.id)
+        invalidation_bus.publish("post", post.id)
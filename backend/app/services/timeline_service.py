@@ -0,0 +1,99 @@
+import heapq
+from datetime import datetime
+from typing import List, Optional
+from app.core.config import settings
+from app.core.read_routing import read_only
+from app.exceptions import NotFoundError, ValidationError
+from app.repositories import (
+    get_comment_repository, get_follow_repository, get_post_repository,
+    get_timeline_repository, get_user_repository,
+)
+from app.schemas.post import PostResponse
+from app.core.tracing import traced
+
+
+@traced("service")
+class TimelineService:
+    """
+    Service layer for following users and the home timeline.
+
+    Posts by normal authors are copied into their followers' timelines when
+    written (fan-out on write), so reading a timeline is one index range scan.
+    Authors with TIMELINE_FANOUT_THRESHOLD or more followers are not copied;
+    their newest posts are k-way merged in when a follower reads (fan-out on read).
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.follow_repository = get_follow_repository(db)
+        self.timeline_repository = get_timeline_repository(db)
+        self.user_repository = get_user_repository(db)
+        self.post_repository = get_post_repository(db)
+        self.comment_repository = get_comment_repository(db)
+
+    def follow(self, follower_id: str, followee_id: str) -> None:
+        """
+        Follow a user.
+        Business Logic:
+        - Users cannot follow themselves
+        - Validates the followed user exists
+        - Copies the author's recent posts into the timeline (fan-out-on-write authors)
+        """
+        if follower_id == followee_id:
+            raise ValidationError("You cannot follow yourself")
+        if not self.user_repository.get_by_google_id(followee_id):
+            raise NotFoundError(f"User with id {followee_id} not found")
+
+        fan_out_on_read = self.follow_repository.follow(follower_id, followee_id, settings.TIMELINE_FANOUT_THRESHOLD)
+        if fan_out_on_read is False:
+            self.timeline_repository.backfill(follower_id, followee_id, settings.TIMELINE_BACKFILL_SIZE)
+
+    def unfollow(self, follower_id: str, followee_id: str) -> None:
+        """
+        Unfollow a user.
+        Business Logic: Validates the follow exists; removes the author's posts from the timeline.
+        """
+        if not self.follow_repository.unfollow(follower_id, followee_id):
+            raise NotFoundError(f"You are not following user {followee_id}")
+        self.timeline_repository.remove_author(follower_id, followee_id)
+
+    @read_only
+    def get_timeline(self, user_id: str, before: Optional[datetime] = None, before_id: Optional[str] = None,
+                     limit: int = 20) -> List[PostResponse]:
+        """
+        Get a user's home timeline, newest first, in (created_at, id) order. Page with
+        `before` and `before_id` = created_at and id of the last post, so posts created at
+        the same time are not skipped.
+        Business Logic: Merges the fanned-out timeline with the newest posts of followed
+        fan-out-on-read authors (none for most users).
+        """
+        if before_id is not None and before is None:
+            raise ValidationError("before_id needs before")
+        try:
+            streams = [self.timeline_repository.get_entries(user_id, before=before, before_id=before_id, limit=limit)]
+            for author_id in self.follow_repository.get_fan_out_on_read_followees(user_id):
+                streams.append(self.timeline_repository.get_author_entries(author_id, before=before,
+                                                                           before_id=before_id, limit=limit))
+        except ValueError:
+            raise ValidationError("Invalid before_id")
+
+        # Every stream is sorted newest first; an author may appear in both (switched to fan-out on read)
+        post_ids, seen = [], set()
+        for _, post_id in heapq.merge(*streams, reverse=True):
+            if post_id in seen:
+                continue
+            seen.add(post_id)
+            post_ids.append(post_id)
+            if len(post_ids) == limit:
+                break
+
+        posts_by_id = {post.id: post for post in self.post_repository.get_by_ids(post_ids)}
+        responses = []
+        for post_id in post_ids:
+            post = posts_by_id.get(post_id)
+            if post is None:
+                continue
+            response = PostResponse.model_validate(post)
+            response.comment_count = self.comment_repository.count_by_post_id(post.id)
+            responses.append(response)
+        return responses
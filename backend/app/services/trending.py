@@ -0,0 +1,170 @@
+import heapq
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping, Tuple, Union
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import db_session
+from app.core.metrics import metrics
+from app.repositories import get_trending_repository
+
+
+logger = logging.getLogger(__name__)
+
+PostId = Union[int, str]
+
+# Rebase forward-decayed scores before exp() gets anywhere near float overflow
+_MAX_EXPONENT = 40.0
+
+
+class TrendingTracker:
+    """
+    Incrementally maintained trending ranking.
+
+    Each comment or view adds weight * 2^((t - landmark) / half_life) to the
+    post's score ("forward decay"). Every score decays at the same rate, so
+    events never have to touch other posts and the order stays correct
+    without periodic re-scoring. The tracker holds at most `capacity` posts;
+    the lowest scored one is evicted through a lazily cleaned min-heap.
+    Reading the top K is heapq.nlargest over that bounded set.
+
+    Each worker process sees only its share of the events. The checkpoint
+    therefore receives score deltas (what a worker added since its last
+    checkpoint), which add up across workers; a worker ranks from the
+    checkpoint it loaded at start plus its own events since.
+    """
+
+    def __init__(self, half_life_seconds: float, capacity: int, comment_weight: float, view_weight: float,
+                 checkpoint_interval: float):
+        self.capacity = capacity
+        self.comment_weight = comment_weight
+        self.view_weight = view_weight
+        self._rate = math.log(2) / half_life_seconds
+        self._landmark = time.time()
+        self._scores: Dict[PostId, float] = {}
+        self._pending: Dict[PostId, float] = {}  # Added since the last checkpoint
+        self._heap: List[Tuple[float, PostId]] = []  # May hold stale entries, see _evict
+        self._lock = threading.Lock()
+        self._task = PeriodicTask("trending-checkpoint", self.checkpoint, checkpoint_interval)
+
+    def record_comment(self, post_id: PostId, delta: int = 1) -> None:
+        """Count a created (delta=1) or deleted (delta=-1) comment."""
+        self._add(post_id, self.comment_weight * delta, time.time())
+
+    def record_views(self, deltas: Mapping[PostId, int]) -> None:
+        """Count a batch of views (as flushed by the view counter)."""
+        now = time.time()
+        for post_id, views in deltas.items():
+            self._add(post_id, self.view_weight * views, now)
+
+    def discard(self, post_id: PostId) -> None:
+        """Forget a post, e.g. after it was deleted."""
+        with self._lock:
+            self._scores.pop(post_id, None)
+            self._pending.pop(post_id, None)
+
+    def top(self, limit: int) -> List[Tuple[PostId, float]]:
+        """Top posts as (post_id, score decayed to now), best first."""
+        now = time.time()
+        with self._lock:
+            best = heapq.nlargest(limit, self._scores.items(), key=lambda item: item[1])
+            factor = math.exp(-self._rate * (now - self._landmark))
+        return [(post_id, score * factor) for post_id, score in best]
+
+    def _add(self, post_id: PostId, weight: float, now: float, pending: bool = True) -> None:
+        with self._lock:
+            exponent = self._rate * (now - self._landmark)
+            if exponent > _MAX_EXPONENT:
+                self._rebase(now)
+                exponent = 0.0
+            if pending:
+                self._pending[post_id] = self._pending.get(post_id, 0.0) + weight * math.exp(exponent)
+            score = self._scores.get(post_id, 0.0) + weight * math.exp(exponent)
+            if score <= 0:
+                self._scores.pop(post_id, None)
+                return
+            self._scores[post_id] = score
+            heapq.heappush(self._heap, (score, post_id))
+            if len(self._scores) > self.capacity:
+                self._evict()
+            elif len(self._heap) > 4 * self.capacity:
+                self._rebuild_heap()
+
+    def _evict(self) -> None:
+        """Drop the lowest scored post, skipping heap entries that no longer match a score."""
+        while self._heap:
+            score, post_id = heapq.heappop(self._heap)
+            if self._scores.get(post_id) == score:
+                del self._scores[post_id]
+                return
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(score, post_id) for post_id, score in self._scores.items()]
+        heapq.heapify(self._heap)
+
+    def _rebase(self, now: float) -> None:
+        factor = math.exp(-self._rate * (now - self._landmark))
+        self._scores = {post_id: score * factor for post_id, score in self._scores.items()}
+        self._pending = {post_id: delta * factor for post_id, delta in self._pending.items()}
+        self._landmark = now
+        self._rebuild_heap()
+
+    def checkpoint(self) -> None:
+        """
+        Persist what this worker added since its last checkpoint (decayed to now) so a
+        restart does not reset the ranking. The checkpoint adds the deltas of every
+        worker to its decayed scores; deltas that could not be written are kept for
+        the next checkpoint.
+        """
+        scored_at = datetime.now(timezone.utc)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            factor = math.exp(-self._rate * (scored_at.timestamp() - self._landmark))
+            tracked = len(self._scores)
+        deltas = {post_id: delta * factor for post_id, delta in pending.items() if delta}
+        try:
+            with db_session() as db:
+                get_trending_repository(db).merge(deltas, scored_at, self._rate, self.capacity)
+        except Exception:
+            with self._lock:
+                # Back in the current units: a rebase may have happened meanwhile
+                factor = math.exp(self._rate * (scored_at.timestamp() - self._landmark))
+                for post_id, delta in deltas.items():
+                    self._pending[post_id] = self._pending.get(post_id, 0.0) + delta * factor
+            raise
+        metrics.gauge("trending_tracked_posts").set(tracked)
+
+    def load(self) -> None:
+        """Seed the tracker from the last checkpoint."""
+        with db_session() as db:
+            rows = get_trending_repository(db).get_all()
+        now = time.time()
+        for post_id, score, scored_at in rows:
+            if scored_at.tzinfo is None:
+                scored_at = scored_at.replace(tzinfo=timezone.utc)
+            decayed = score * math.exp(-self._rate * (now - scored_at.timestamp()))
+            self._add(post_id, decayed, now, pending=False)
+
+    def start(self) -> None:
+        try:
+            self.load()
+        except Exception:
+            logger.exception("Could not load trending checkpoint, starting empty")
+        self._task.start()
+
+    def stop(self) -> None:
+        """Stop checkpointing after a final checkpoint."""
+        self._task.stop()
+
+
+trending = TrendingTracker(
+    half_life_seconds=settings.TRENDING_HALF_LIFE_HOURS * 3600,
+    capacity=settings.TRENDING_CAPACITY,
+    comment_weight=settings.TRENDING_COMMENT_WEIGHT,
+    view_weight=settings.TRENDING_VIEW_WEIGHT,
+    checkpoint_interval=settings.TRENDING_CHECKPOINT_INTERVAL_SECONDS,
+)
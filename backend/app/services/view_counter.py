@@ -0,0 +1,94 @@
+import threading
+import time
+from typing import Dict, Optional, Union
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import db_session
+from app.core.metrics import metrics
+from app.repositories import get_post_repository
+from app.services.caches import post_cache, post_tag
+from app.services.trending import trending
+
+
+PostId = Union[int, str]
+
+
+class ViewCounter:
+    """
+    Write-combining view counter.
+
+    Views are counted in memory per post and written as one batched update,
+    either every `flush_interval` seconds or as soon as `batch_size` posts
+    have pending views. Deltas that fail to flush are kept for the next try,
+    and stop() flushes whatever is left on graceful shutdown. Flushed posts are
+    evicted from post_cache: reads add the pending views to the cached count,
+    which would otherwise drop by the flushed views until the entry expired.
+    """
+
+    def __init__(self, flush_interval: float, batch_size: int):
+        self.batch_size = batch_size
+        self._pending: Dict[PostId, int] = {}
+        self._oldest: Optional[float] = None  # When the oldest unflushed view was recorded
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._task = PeriodicTask("view-counter-flush", self.flush, flush_interval)
+
+    def record(self, post_id: PostId) -> None:
+        """Count one view of a post. Never touches the database."""
+        with self._lock:
+            self._pending[post_id] = self._pending.get(post_id, 0) + 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            pending_posts = len(self._pending)
+        if pending_posts >= self.batch_size:
+            self._task.wake()
+
+    def pending(self, post_id: PostId) -> int:
+        """Views of a post recorded by this process but not flushed yet."""
+        return self._pending.get(post_id, 0)
+
+    def flush(self) -> None:
+        """Write all pending deltas in one batch."""
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._pending = self._pending, {}
+                oldest, self._oldest = self._oldest, None
+            if not deltas:
+                return
+
+            started = time.monotonic()
+            try:
+                with db_session() as db:
+                    get_post_repository(db).add_view_counts(deltas)
+            except Exception:
+                # Merge the deltas back so they are retried on the next flush
+                with self._lock:
+                    for post_id, delta in deltas.items():
+                        self._pending[post_id] = self._pending.get(post_id, 0) + delta
+                    self._oldest = oldest if self._oldest is None else min(oldest, self._oldest)
+                metrics.counter("view_counter_flush_errors_total").inc()
+                raise
+
+            for post_id in deltas:
+                post_cache.invalidate(post_tag(post_id))
+            trending.record_views(deltas)
+
+            finished = time.monotonic()
+            metrics.histogram("view_counter_flush_lag_seconds").observe(finished - oldest)
+            metrics.histogram("view_counter_flush_batch_size").observe(len(deltas))
+            metrics.histogram("view_counter_flush_duration_seconds").observe(finished - started)
+            metrics.counter("view_counter_views_flushed_total").inc(sum(deltas.values()))
+
+    def start(self) -> None:
+        self._task.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread after a final flush."""
+        self._task.stop()
+
+
+view_counter = ViewCounter(
+    flush_interval=settings.VIEW_COUNT_FLUSH_INTERVAL_SECONDS,
+    batch_size=settings.VIEW_COUNT_FLUSH_BATCH_SIZE,
+)
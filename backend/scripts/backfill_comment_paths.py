@@ -0,0 +1,42 @@
+"""
+Give Datastore comments written before threaded replies a thread path.
+
+Thread views (GET /api/posts/{post_id}/comments/thread, GET
+/api/comments/{comment_id}/replies) read the (post_id, path) index, which
+leaves out entities without a path. This makes each such comment a top-level
+comment, with the path it would get when first replied to. Run it once after
+deploying threads; it is safe to re-run and to run while serving.
+PostgreSQL needs no backfill (migration 20261019150000 sets every path).
+
+Usage (from backend/, with DB_TYPE=firestore):
+    python scripts/backfill_comment_paths.py [--batch-size 500]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="Comments per read and per transaction (max 500)")
+    args = parser.parse_args()
+    if settings.DB_TYPE != "firestore":
+        raise SystemExit("Only Datastore comments need a backfill (DB_TYPE=firestore)")
+
+    from app.core.database import db_session
+    from app.repositories import get_comment_repository
+
+    started = time.perf_counter()
+    with db_session() as db:
+        updated = get_comment_repository(db).backfill_paths(batch_size=min(args.batch_size, 500))
+    print(json.dumps({"updated": updated, "seconds": round(time.perf_counter() - started, 1)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Per-request middleware overhead benchmark.
+
+Sends requests straight into an ASGI endpoint that does no work, wrapped in
+three middleware stacks, and reports the time each stack adds per request:
+
+    previous: SessionMiddleware on every path, CORS, BaseHTTPMiddleware client identity
+    current:  SessionMiddleware scoped to /api/auth, CORS with max_age, pure ASGI client identity
+    none:     the bare endpoint (baseline)
+
+Requests are a credentialed cross-origin GET /api/posts with a bearer token
+and a session cookie, like the browser frontend sends. Separately it reports
+the preflight (OPTIONS) requests a browser makes for N PUT/DELETE calls to
+one URL within a day, with and without Access-Control-Max-Age.
+
+Usage (from backend/):
+    python scripts/bench_middleware.py [--requests 20000] [--writes 100]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jose import jwt  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.middleware.cors import CORSMiddleware  # noqa: E402
+from starlette.middleware.sessions import SessionMiddleware  # noqa: E402
+
+from app.core.client_identity import ClientIdentityMiddleware, _client_keys, identify  # noqa: E402
+from app.core.scoped_middleware import PathScopedMiddleware  # noqa: E402
+
+SECRET_KEY = "bench-secret"
+ORIGIN = "http://localhost:5173"
+
+
+class PreviousClientIdentityMiddleware(BaseHTTPMiddleware):
+    """ClientIdentityMiddleware as it was before the pure ASGI rewrite."""
+
+    async def dispatch(self, request, call_next):
+        token = _client_keys.set(
+            identify(request.headers.get("authorization", ""), request.client.host if request.client else "")
+        )
+        try:
+            return await call_next(request)
+        finally:
+            _client_keys.reset(token)
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"[]"})
+
+
+def cors(app, max_age: int):
+    return CORSMiddleware(
+        app, allow_origins=[ORIGIN], allow_credentials=True, allow_methods=["*"], allow_headers=["*"], max_age=max_age
+    )
+
+
+def previous_stack():
+    app = SessionMiddleware(endpoint, secret_key=SECRET_KEY)
+    return PreviousClientIdentityMiddleware(cors(app, max_age=600))
+
+
+def current_stack():
+    app = PathScopedMiddleware(
+        endpoint, prefix="/api/auth", middleware=SessionMiddleware, secret_key=SECRET_KEY, path="/api/auth"
+    )
+    return ClientIdentityMiddleware(cors(app, max_age=86400))
+
+
+def make_scope(session_cookie: str) -> dict:
+    token = jwt.encode({"sub": "bench-user"}, SECRET_KEY, algorithm="HS256")
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/posts",
+        "raw_path": b"/api/posts",
+        "root_path": "",
+        "query_string": b"limit=20",
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+        "headers": [
+            (b"host", b"testserver"),
+            (b"origin", ORIGIN.encode()),
+            (b"authorization", f"Bearer {token}".encode()),
+            (b"cookie", f"session={session_cookie}".encode()),
+        ],
+    }
+
+
+async def session_cookie() -> str:
+    """A signed session cookie holding OAuth state, as left behind by the login redirect."""
+    cookies = []
+
+    async def set_state(scope, receive, send):
+        scope["session"]["_state_google_abc"] = {"data": {"redirect_uri": "http://localhost:8000/api/auth/callback"}}
+        await endpoint(scope, receive, send)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            cookies.extend(value for key, value in message["headers"] if key == b"set-cookie")
+
+    scope = make_scope("")
+    scope["headers"] = [header for header in scope["headers"] if header[0] != b"cookie"]
+    await SessionMiddleware(set_state, secret_key=SECRET_KEY)(scope, receive, send)
+    return cookies[0].decode().split(";")[0].split("=", 1)[1]
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def run(app, scope: dict, requests: int) -> float:
+    async def send(message):
+        pass
+
+    for _ in range(min(requests, 1000)):
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def preflights(writes: int, interval_seconds: float, max_age: int) -> int:
+    """Preflights for `writes` requests to one URL, `interval_seconds` apart, with a preflight cache of max_age."""
+    count, cached_until = 0, -1.0
+    for index in range(writes):
+        now = index * interval_seconds
+        if now >= cached_until:
+            count += 1
+            cached_until = now + max_age
+    return count
+
+
+async def bench(requests: int) -> list:
+    scope = make_scope(await session_cookie())
+    baseline = await run(endpoint, scope, requests)
+    results = []
+    for name, app in (("previous", previous_stack()), ("current", current_stack())):
+        per_request = await run(app, scope, requests)
+        results.append({"stack": name, "overhead_us_per_request": round((per_request - baseline) * 1e6, 2)})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--writes", type=int, default=100, help="PUT/DELETE requests to one URL over a day")
+    args = parser.parse_args()
+
+    interval = 86400 / args.writes
+    report = {
+        "middleware": asyncio.run(bench(args.requests)),
+        # Starlette's default max_age is 600 seconds; browsers otherwise cap the cache at their own limit
+        "preflights_per_day": {
+            "max_age_600": preflights(args.writes, interval, 600),
+            "max_age_86400": preflights(args.writes, interval, 86400),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Row model benchmark for app.repositories.entity_models.
+
+Builds --rows Post entities shaped like Datastore results (dict subclasses
+with a key) and compares the previous per-repository PostModel (a plain
+class with a __dict__, built field by field in a comprehension) with the
+shared slotted PostModel built by EntityConverter:
+
+    memory:     bytes allocated per 100k loaded models (tracemalloc, entities excluded)
+    conversion: entities converted per second (best of --repeat runs)
+
+Usage (from backend/):
+    python scripts/bench_rows.py [--rows 100000] [--repeat 5]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.repositories.entity_models import post_converter  # noqa: E402
+
+
+class PreviousPostModel:
+    """PostModel as the Datastore repository defined it before the shared slotted models."""
+    def __init__(self, id, google_user_id, author_name, subject, content, created_at, updated_at,
+                 comment_count=0, view_count=0):
+        self.id = id
+        self.google_user_id = google_user_id
+        self.author_name = author_name
+        self.subject = subject
+        self.content = content
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.comment_count = comment_count
+        self.view_count = view_count
+
+
+def previous_convert(entities):
+    return [
+        PreviousPostModel(
+            id=entity.key.name,
+            google_user_id=entity['google_user_id'],
+            author_name=entity['author_name'],
+            subject=entity['subject'],
+            content=entity['content'],
+            created_at=entity['created_at'],
+            updated_at=entity['updated_at'],
+            comment_count=entity.get('comment_count', 0),
+            view_count=entity.get('view_count', 0)
+        )
+        for entity in entities
+    ]
+
+
+def current_convert(entities):
+    return post_converter.from_entities(entities)
+
+
+class Key:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+
+class Entity(dict):
+    """Stand-in for datastore.Entity: a dict of properties with a key."""
+
+    def __init__(self, key, properties):
+        super().__init__(properties)
+        self.key = key
+
+
+def make_entities(count: int):
+    now = datetime(2026, 1, 1)
+    return [
+        Entity(Key(f"post-{index:08d}"), {
+            'google_user_id': f"user-{index % 1000}",
+            'author_name': f"User {index % 1000}",
+            'subject': f"Subject {index}",
+            'content': "Lorem ipsum dolor sit amet. " * 8,
+            'created_at': now - timedelta(seconds=index),
+            'updated_at': now - timedelta(seconds=index),
+            'comment_count': index % 17,
+            'view_count': index % 101,
+        })
+        for index in range(count)
+    ]
+
+
+def measure_memory(convert, entities) -> int:
+    gc.collect()
+    tracemalloc.start()
+    models = convert(entities)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del models
+    return allocated
+
+
+def measure_speed(convert, entities, repeat: int) -> float:
+    # Like timeit, keep the cyclic GC out of the timings; it adds similar noise to both
+    best = float("inf")
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            convert(entities)
+            best = min(best, time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return len(entities) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5, help="Conversion runs; the fastest counts")
+    args = parser.parse_args()
+
+    entities = make_entities(args.rows)
+    results = []
+    for name, convert in (("previous", previous_convert), ("current", current_convert)):
+        allocated = measure_memory(convert, entities)
+        results.append({
+            "models": name,
+            "bytes_per_100k_rows": round(allocated / args.rows * 100000),
+            "bytes_per_row": round(allocated / args.rows, 1),
+            "rows_per_second": round(measure_speed(convert, entities, args.repeat)),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
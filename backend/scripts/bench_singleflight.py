@@ -0,0 +1,82 @@
+"""
+Thundering-herd benchmark for app.core.singleflight.
+
+Synthetic: no database and no service code is involved. Waves of threads
+read one hot key through SingleFlight.do against a fake DB call with fixed
+latency (standing in for PostService.get_post_by_id on a cache miss), and
+the DB calls, DB calls per second and request throughput are reported with
+and without coalescing.
+
+Usage (from backend/):
+    python scripts/bench_singleflight.py [--concurrency 200] [--waves 20] [--db-latency-ms 20]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.singleflight import SingleFlight  # noqa: E402
+
+
+class FakeDB:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def query(self, key):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return {"id": key}
+
+
+def run_threads(concurrency: int, waves: int, latency: float, coalesce: bool) -> dict:
+    db = FakeDB(latency)
+    group = SingleFlight("bench")
+    read = (lambda: group.do("post:1", lambda: db.query(1))) if coalesce else (lambda: db.query(1))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(waves):
+            barrier = threading.Barrier(concurrency)
+
+            def request():
+                barrier.wait()
+                return read()
+
+            list(pool.map(lambda _: request(), range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return _report(coalesce, db.calls, concurrency * waves, elapsed)
+
+
+def _report(coalesce: bool, calls: int, requests: int, elapsed: float) -> dict:
+    return {
+        "singleflight": coalesce,
+        "requests": requests,
+        "db_calls": calls,
+        "db_calls_per_second": round(calls / elapsed, 1),
+        "requests_per_second": round(requests / elapsed, 1),
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent requests per wave")
+    parser.add_argument("--waves", type=int, default=20)
+    parser.add_argument("--db-latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    latency = args.db_latency_ms / 1000
+    results = [run_threads(args.concurrency, args.waves, latency, coalesce) for coalesce in (False, True)]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Statement caching benchmark for the PostgreSQL repositories.
+
+Runs the hot repository queries against an in-memory SQLite database and
+compares the previous implementations (a db.query(...) chain built on every
+call) with the current ones (statements built once with bound parameters,
+see app.repositories.post_repository):
+
+    us_per_call: wall time per call (best of --repeat runs of --calls calls)
+    saved_us:    CPU time saved per call by the cached statement
+
+Both paths run the same SQL on the same rows, so the difference is the
+per-call cost of building the query, computing its cache key and looking up
+the compiled SQL. The database round trip of a real PostgreSQL server adds
+the same to both.
+
+Usage (from backend/):
+    python scripts/bench_statements.py [--calls 5000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import MetaData, String, create_engine  # noqa: E402
+from sqlalchemy.orm import Session, lazyload, load_only  # noqa: E402
+
+from app.core.partitions import hot_since  # noqa: E402
+from app.core.threads import sql_segment  # noqa: E402
+from app.core.tracing import traced  # noqa: E402
+from app.models import Comment, Post, User  # noqa: E402
+from app.repositories.comment_repository import CommentRepository  # noqa: E402
+from app.repositories.post_repository import PostRepository  # noqa: E402
+from app.repositories.user_repository import UserRepository  # noqa: E402
+
+FIELDS = frozenset({"id", "subject", "author_name", "created_at"})
+
+
+@traced("repository")
+class PreviousRepository:
+    """The hot queries as the repositories built them before the cached statements."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _posts(self, fields=None):
+        query = self.db.query(Post).options(lazyload(Post.comments))
+        if fields is not None:
+            columns = [getattr(Post, name) for name in fields if name in Post.__table__.c]
+            query = query.options(load_only(Post.id, *columns))
+        return query
+
+    def get_post(self, post_id):
+        return self.db.query(Post).filter(Post.id == post_id).first()
+
+    def get_all(self, skip, limit, fields=None):
+        return (
+            self._posts(fields)
+            .filter(Post.created_at >= hot_since())
+            .order_by(Post.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def get_by_user_id(self, google_user_id, skip, limit):
+        return (
+            self._posts()
+            .filter(Post.google_user_id == google_user_id)
+            .order_by(Post.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def get_comments(self, post_id, skip, limit):
+        return (
+            self.db.query(Comment)
+            .filter(Comment.post_id == post_id)
+            .order_by(Comment.created_at.asc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def count_comments(self, post_id):
+        return self.db.query(Comment).filter(Comment.post_id == post_id).count()
+
+    def get_user(self, google_user_id):
+        return self.db.query(User).filter(User.google_user_id == google_user_id).first()
+
+
+def seed(db: Session, posts: int, comments: int) -> None:
+    now = datetime.now(timezone.utc)
+    db.add(User(google_user_id="user-0", email="user-0@example.com", name="User 0"))
+    for index in range(1, posts + 1):
+        db.add(Post(id=index, subject=f"Subject {index}", content="x" * 200, google_user_id=f"user-{index % 10}",
+                    author_name="User", created_at=now - timedelta(minutes=index), updated_at=now))
+    for index in range(1, comments + 1):
+        db.add(Comment(id=index, post_id=1, path=sql_segment(index), content="y" * 100, google_user_id="user-1", author_name="User",
+                       created_at=now - timedelta(seconds=index), updated_at=now))
+    db.commit()
+
+
+def cases(previous: PreviousRepository, posts: PostRepository, comments: CommentRepository, users: UserRepository):
+    """(name, previous call, cached call) for each hot query."""
+    return [
+        ("post_get_by_id", lambda: previous.get_post(1), lambda: posts.get_by_id(1)),
+        ("post_get_all", lambda: previous.get_all(0, 20), lambda: posts.get_all(0, 20)),
+        ("post_get_all_fields", lambda: previous.get_all(0, 20, FIELDS), lambda: posts.get_all(0, 20, FIELDS)),
+        ("post_get_by_user_id", lambda: previous.get_by_user_id("user-1", 0, 20),
+         lambda: posts.get_by_user_id("user-1", 0, 20)),
+        ("comment_get_by_post_id", lambda: previous.get_comments(1, 0, 20),
+         lambda: comments.get_by_post_id(1, 0, 20)),
+        ("comment_count_by_post_id", lambda: previous.count_comments(1), lambda: comments.count_by_post_id(1)),
+        ("user_get_by_google_id", lambda: previous.get_user("user-0"), lambda: users.get_by_google_id("user-0")),
+    ]
+
+
+def time_calls(db: Session, call, calls: int, repeat: int) -> float:
+    """Best wall time per call, in microseconds."""
+    call()  # Warm up (compiled cache, lazy imports)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(calls):
+            call()
+        best = min(best, (time.perf_counter() - started) / calls)
+        db.expunge_all()
+    return best * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000, help="calls per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path (best is reported)")
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--comments", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    schema = MetaData()
+    for model in (User, Post, Comment):
+        table = model.__table__.to_metadata(schema)
+        if len(table.primary_key.columns) > 1:
+            # SQLite only autoincrements a lone INTEGER PRIMARY KEY; seed() sets the ids
+            table.c.id.autoincrement = False
+        for table_column in table.columns:
+            if getattr(table_column.type, "collation", None):
+                table_column.type = String(table_column.type.length)  # No "C" collation in SQLite
+    schema.create_all(engine)
+    results = {}
+    with Session(engine) as db:
+        seed(db, args.posts, args.comments)
+        for name, previous_call, cached_call in cases(
+            PreviousRepository(db), PostRepository(db), CommentRepository(db), UserRepository(db)
+        ):
+            previous_us = time_calls(db, previous_call, args.calls, args.repeat)
+            cached_us = time_calls(db, cached_call, args.calls, args.repeat)
+            results[name] = {
+                "previous_us_per_call": round(previous_us, 1),
+                "cached_us_per_call": round(cached_us, 1),
+                "saved_us": round(previous_us - cached_us, 1),
+                "saved_pct": round(100 * (previous_us - cached_us) / previous_us, 1),
+            }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
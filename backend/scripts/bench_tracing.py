@@ -0,0 +1,97 @@
+"""
+Tracing overhead benchmark for app.core.tracing.
+
+Runs a simulated request (an ASGI app calling a traced service, which calls
+a traced repository a few times, each "executing" a statement) through
+TracingMiddleware at several sample rates, and reports the per-request
+overhead against the same app without the middleware and decorators.
+
+Usage (from backend/):
+    python scripts/bench_tracing.py [--requests 50000] [--request-us 2000]
+
+The simulated requests do no real work, so the difference is pure tracing
+cost; overhead_pct relates it to --request-us, a typical request latency
+(real list requests take a few ms).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.tracing import BatchExporter, TracingMiddleware, record_query, traced  # noqa: E402
+
+
+class NullExporter(BatchExporter):
+    name = "null"
+
+    def write(self, traces):
+        pass
+
+
+class Repository:
+    def get(self, n):
+        record_query("primary", "SELECT posts.id FROM posts LIMIT %(param_1)s", n, 0.0001)
+        return list(range(n))
+
+
+class Service:
+    def __init__(self, repository):
+        self.repository = repository
+
+    def list(self, calls):
+        return [self.repository.get(10) for _ in range(calls)]
+
+
+TracedRepository = traced("repository")(type("TracedRepository", (Repository,), dict(vars(Repository))))
+TracedService = traced("service")(type("TracedService", (Service,), dict(vars(Service))))
+
+
+def make_app(service_cls, repository_cls, calls: int):
+    async def app(scope, receive, send):
+        service_cls(repository_cls()).list(calls)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"[]"})
+    return app
+
+
+async def run(app, requests: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/api/posts", "headers": []}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), None, send)
+    return (time.perf_counter() - started) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--request-us", type=float, default=2000.0, help="Typical request latency to relate overhead to")
+    parser.add_argument("--calls", type=int, default=20, help="Traced repository calls per request")
+    args = parser.parse_args()
+
+    baseline = asyncio.run(run(make_app(Service, Repository, args.calls), args.requests))
+    results = []
+    for rate in (0.0, 0.01, 0.1, 1.0):
+        exporter = NullExporter()
+        app = TracingMiddleware(make_app(TracedService, TracedRepository, args.calls), rate, exporter)
+        per_request = asyncio.run(run(app, args.requests))
+        exporter.flush()
+        overhead_us = (per_request - baseline) * 1e6
+        results.append({
+            "sample_rate": rate,
+            "overhead_us_per_request": round(overhead_us, 2),
+            "overhead_pct": round(overhead_us / args.request_us * 100, 3),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
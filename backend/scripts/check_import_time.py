@@ -0,0 +1,102 @@
+"""
+Import-time budget check for cold starts.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and
+fails (exit code 1) when:
+
+- the cumulative import time of app.main exceeds the budget, or
+- a client library of a backend other than the selected DB_TYPE, or
+  authlib (only needed for the real OAuth flow), was imported.
+
+Usage (from backend/):
+    python scripts/check_import_time.py [--budget-ms 1000] [--runs 3] [--top 15]
+
+The best of several runs is compared, which filters out noise from a cold
+filesystem cache. DB_TYPE and friends are read from the environment/.env
+exactly as the app does.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.config import settings  # noqa: E402
+
+# Modules that must not be imported by `import app.main`, per DB_TYPE
+FORBIDDEN_MODULES = {
+    "postgresql": ["google.cloud.datastore", "google.cloud.firestore", "authlib"],
+    "firestore": ["sqlalchemy", "psycopg2", "google.cloud.firestore", "authlib"],
+}
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure() -> list:
+    """Return [(module, self_us, cumulative_us, depth)] for one fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit("import app.main failed")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("IMPORT_TIME_BUDGET_MS", 1000)))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="Show the N most expensive top-level imports")
+    args = parser.parse_args()
+
+    best_rows, best_ms = None, None
+    for _ in range(args.runs):
+        rows = measure()
+        total_ms = next(cumulative for module, _, cumulative, _ in rows if module == "app.main") / 1000
+        if best_ms is None or total_ms < best_ms:
+            best_rows, best_ms = rows, total_ms
+
+    db_type = settings.DB_TYPE
+    imported = {module for module, _, _, _ in best_rows}
+    leaked = sorted(
+        module for module in imported
+        for forbidden in FORBIDDEN_MODULES.get(db_type, [])
+        if module == forbidden or module.startswith(forbidden + ".")
+    )
+
+    # Imports made directly by app.main's import graph, not the interpreter's own startup
+    heaviest = sorted(
+        (row for row in best_rows if row[3] <= 1 and row[0] != "app.main"),
+        key=lambda row: row[2],
+        reverse=True,
+    )[:args.top]
+    print(f"import app.main: {best_ms:.1f} ms (budget {args.budget_ms:.0f} ms, DB_TYPE={db_type}, best of {args.runs})")
+    for module, _, cumulative, _ in heaviest:
+        print(f"  {cumulative / 1000:8.1f} ms  {module}")
+
+    failed = False
+    if best_ms > args.budget_ms:
+        print(f"FAIL: import time {best_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if leaked:
+        print(f"FAIL: modules not needed for DB_TYPE={db_type} were imported: {', '.join(leaked[:10])}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
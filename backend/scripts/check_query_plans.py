@@ -0,0 +1,656 @@
+"""
+Query-plan and index coverage checks for the repositories.
+
+PostgreSQL: seeds users, posts, comments, follows, timeline entries,
+tombstones, trending scores and notifications at realistic volumes (skewed per user, spread
+over --months months of partitions) inside one transaction, ANALYZEs, then
+calls every repository query and runs EXPLAIN on each statement it issued.
+A case fails when its plan
+
+- sequentially scans a table (or partition) of at least --min-rows rows for
+  less than a tenth of them (when most of a table matches, an index scan
+  would not read fewer pages), or
+- has a Sort node of at least --min-rows rows, i.e. an ORDER BY that no index
+  serves (Incremental Sort on an index-ordered prefix is fine).
+
+The random seed data is generated with a fixed --seed, so reruns plan the same.
+
+Writes made by the cases (updates, deletes, follows, ...) run in savepoints,
+and the whole transaction, seed data included, is rolled back at the end, so
+the database is left as it was. It must be migrated to head (alembic upgrade head).
+
+Datastore / Firestore: calls the same repository methods against a client
+that records each query's shape instead of running it, and checks that
+index.yaml (Datastore) and firestore.indexes.json (Firestore) declare a
+composite index for every shape that needs one. Declared indexes that no
+query uses are reported but do not fail the check.
+
+Usage (from backend/):
+    python scripts/check_query_plans.py [--postgres-url URL] [--users 5000] [--posts 200000]
+        [--comments 600000] [--notifications 200000] [--months 12] [--min-rows 1000] [--seed 0.5] [--verbose]
+        [--skip-postgres] [--skip-datastore]
+
+Exit code 1 when any check fails.
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, List, NamedTuple, Set, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.config import settings  # noqa: E402
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable  # (repositories, sample) -> None
+    # Plan nodes accepted for this case ("Seq Scan", "Sort"), with the reason in a comment
+    allow: Tuple[str, ...] = ()
+
+
+def _consume(iterator: Iterable) -> None:
+    for _ in iterator:
+        pass
+
+
+# Every repository query. `r` holds the repositories by name, `s` the sample rows and values
+CASES = [
+    Case("post.get_by_id", lambda r, s: r.post.get_by_id(s.post_id)),
+    Case("post.get_by_ids", lambda r, s: r.post.get_by_ids(s.post_ids)),
+    Case("post.get_all", lambda r, s: r.post.get_all(skip=0, limit=20)),
+    Case("post.get_all (summary fields)",
+         lambda r, s: r.post.get_all(skip=0, limit=20, fields=["subject", "author_name", "google_user_id",
+                                                                 "created_at", "updated_at"])),
+    Case("post.get_by_user_id", lambda r, s: r.post.get_by_user_id(s.user_id, skip=0, limit=20)),
+    Case("post.get_by_user_id (summary fields)",
+         lambda r, s: r.post.get_by_user_id(s.user_id, skip=0, limit=20,
+                                            fields=["subject", "author_name", "created_at", "updated_at"])),
+    Case("post.get_changed", lambda r, s: r.post.get_changed(s.since, s.until, 500)),
+    Case("post.get_changed (after id)", lambda r, s: r.post.get_changed(s.since, s.until, 500, after_id=str(s.post_id))),
+    Case("post.iter_all (user)", lambda r, s: _consume(r.post.iter_all(s.user_id))),
+    # A full export reads the whole table: a sequential scan is the right plan
+    Case("post.iter_all", lambda r, s: _consume(r.post.iter_all()), allow=("Seq Scan", "Sort")),
+    Case("post.update", lambda r, s: r.post.update(s.post, content="Edited by the plan check")),
+    Case("post.add_view_counts", lambda r, s: r.post.add_view_counts({s.post_id: 3})),
+    Case("comment.get_by_id", lambda r, s: r.comment.get_by_id(s.comment_id)),
+    Case("comment.get_by_post_id", lambda r, s: r.comment.get_by_post_id(s.post_id, skip=0, limit=100)),
+    Case("comment.get_by_post_id (summary fields)",
+         lambda r, s: r.comment.get_by_post_id(s.post_id, skip=0, limit=100,
+                                               fields=["author_name", "google_user_id", "created_at", "updated_at"])),
+    Case("comment.get_by_user_id", lambda r, s: r.comment.get_by_user_id(s.user_id, skip=0, limit=20)),
+    Case("comment.get_by_user_id (summary fields)",
+         lambda r, s: r.comment.get_by_user_id(s.user_id, skip=0, limit=20,
+                                               fields=["author_name", "post_id", "created_at", "updated_at"])),
+    Case("comment.get_thread", lambda r, s: r.comment.get_thread(s.post_id, since=s.post.created_at, limit=100)),
+    Case("comment.get_thread (subtree, after cursor)",
+         lambda r, s: r.comment.get_thread(s.post_id, since=s.comment.created_at, root_path=s.comment.path,
+                                           after=s.comment.path, limit=100)),
+    Case("comment.create (reply)", lambda r, s: r.comment.create(s.post_id, "Reply by the plan check", s.user_id,
+                                                                 "Plan User", parent=s.comment)),
+    Case("comment.get_changed", lambda r, s: r.comment.get_changed(s.since, s.until, 500)),
+    Case("comment.get_changed (after id)",
+         lambda r, s: r.comment.get_changed(s.since, s.until, 500, after_id=str(s.comment_id))),
+    Case("comment.count_by_post_id", lambda r, s: r.comment.count_by_post_id(s.post_id)),
+    Case("comment.count_by_post_ids", lambda r, s: r.comment.count_by_post_ids(s.post_ids)),
+    Case("comment.iter_all (user)", lambda r, s: _consume(r.comment.iter_all(s.user_id))),
+    Case("comment.update", lambda r, s: r.comment.update(s.comment, "Edited by the plan check")),
+    Case("comment.delete", lambda r, s: r.comment.delete(s.comment)),
+    Case("user.get_by_google_id", lambda r, s: r.user.get_by_google_id(s.user_id)),
+    Case("user.get_by_email", lambda r, s: r.user.get_by_email(s.email)),
+    Case("user.get_ids_by_names", lambda r, s: r.user.get_ids_by_names(["Plan User 1", "Plan User 2"])),
+    Case("follow.follow", lambda r, s: r.follow.follow(s.other_user_id, s.user_id, settings.TIMELINE_FANOUT_THRESHOLD)),
+    Case("follow.unfollow", lambda r, s: r.follow.unfollow(s.other_user_id, s.user_id)),
+    Case("follow.get_fan_out_on_read_followees", lambda r, s: r.follow.get_fan_out_on_read_followees(s.user_id)),
+    Case("timeline.fan_out", lambda r, s: r.timeline.fan_out(s.post_id, s.user_id, s.post.created_at)),
+    Case("timeline.backfill", lambda r, s: r.timeline.backfill(s.other_user_id, s.user_id, 20)),
+    Case("timeline.remove_author", lambda r, s: r.timeline.remove_author(s.other_user_id, s.user_id)),
+    Case("timeline.get_entries", lambda r, s: r.timeline.get_entries(s.user_id, limit=20)),
+    Case("timeline.get_entries (before)", lambda r, s: r.timeline.get_entries(s.user_id, before=s.until, limit=20)),
+    Case("timeline.get_entries (before id)",
+         lambda r, s: r.timeline.get_entries(s.user_id, before=s.post.created_at, before_id=str(s.post_id), limit=20)),
+    Case("timeline.get_author_entries", lambda r, s: r.timeline.get_author_entries(s.user_id, limit=20)),
+    Case("timeline.get_author_entries (before)",
+         lambda r, s: r.timeline.get_author_entries(s.user_id, before=s.until, limit=20)),
+    Case("timeline.get_author_entries (before id)",
+         lambda r, s: r.timeline.get_author_entries(s.user_id, before=s.post.created_at, before_id=str(s.post_id),
+                                                    limit=20)),
+    Case("notification.add_batch", lambda r, s: r.notification.add_batch([{
+        "user_id": s.user_id, "kind": "mention", "actor_id": s.other_user_id, "actor_name": "Plan User",
+        "post_id": s.post_id, "comment_id": None, "created_at": s.until,
+    }])),
+    Case("notification.get_page", lambda r, s: r.notification.get_page(s.user_id, limit=20)),
+    Case("notification.get_page (before)",
+         lambda r, s: r.notification.get_page(s.user_id, before=s.notification_before, limit=20)),
+    Case("notification.get_unread_count", lambda r, s: r.notification.get_unread_count(s.user_id)),
+    Case("notification.mark_read (ids)", lambda r, s: r.notification.mark_read(s.user_id, s.notification_ids)),
+    Case("notification.mark_read", lambda r, s: r.notification.mark_read(s.user_id)),
+    Case("tombstone.get_since", lambda r, s: r.tombstone.get_since(s.since, s.until, 500)),
+    Case("tombstone.get_since (after id)", lambda r, s: r.tombstone.get_since(s.since, s.until, 500, after_id="1")),
+    Case("tombstone.prune", lambda r, s: r.tombstone.prune(s.prune_before)),
+    # The checkpoint is read and trimmed whole, and holds about TRENDING_CAPACITY rows
+    Case("trending.get_all", lambda r, s: r.trending.get_all(), allow=("Seq Scan",)),
+    Case("trending.merge",
+         lambda r, s: r.trending.merge({s.post_id: 1.0}, s.until, math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600),
+                                       settings.TRENDING_CAPACITY),
+         allow=("Seq Scan", "Sort")),
+    # Last: deletes the sample post (with its comments, timeline entries and trending score)
+    Case("post.delete", lambda r, s: r.post.delete(s.post)),
+]
+
+
+# PostgreSQL
+
+SEED_STATEMENTS = [
+    # Post and comment authors are skewed towards low user numbers, as real activity is
+    """
+    INSERT INTO users (google_user_id, email, name, picture, follower_count, created_at, updated_at)
+    SELECT 'plan-user-' || i, 'plan-user-' || i || '@example.com', 'Plan User ' || i, NULL, 0, now(), now()
+    FROM generate_series(1, :users) AS i
+    """,
+    """
+    INSERT INTO posts (subject, content, google_user_id, author_name, view_count, created_at, updated_at)
+    SELECT 'Plan check ' || i, repeat('Lorem ipsum dolor sit amet. ', 8),
+           'plan-user-' || (1 + floor(:users * random() ^ 3))::int, 'Plan User', 0, created, created
+    FROM (SELECT i, now() - random() * :days * interval '1 day' AS created FROM generate_series(1, :posts) AS i) AS seed
+    """,
+    """
+    INSERT INTO comments (id, post_id, path, content, google_user_id, author_name, created_at, updated_at)
+    SELECT id, :first_post + floor(random() * (:last_post - :first_post + 1))::int, lpad(id::text, 10, '0'),
+           'Plan check comment', 'plan-user-' || (1 + floor(:users * random() ^ 3))::int, 'Plan User', created, created
+    FROM (SELECT nextval('comments_id_seq') AS id, now() - random() * :days * interval '1 day' AS created
+          FROM generate_series(1, :comments)) AS seed
+    """,
+    # One reply to every tenth comment, created after it
+    """
+    INSERT INTO comments (id, post_id, parent_id, path, depth, content, google_user_id, author_name,
+                          created_at, updated_at)
+    SELECT id, post_id, parent_id, parent_path || lpad(id::text, 10, '0'), 1, 'Plan check reply',
+           'plan-user-' || (1 + floor(:users * random() ^ 3))::int, 'Plan User', created, created
+    FROM (SELECT nextval('comments_id_seq') AS id, post_id, id AS parent_id, path AS parent_path,
+                 created_at + (now() - created_at) * random() AS created
+          FROM comments WHERE content = 'Plan check comment' AND id % 10 = 0) AS seed
+    """,
+    "UPDATE comments SET reply_count = 1 WHERE content = 'Plan check comment' AND id % 10 = 0",
+    """
+    INSERT INTO follows (follower_id, followee_id, fan_out_on_read, created_at)
+    SELECT 'plan-user-' || follower, 'plan-user-' || (1 + floor(:users * random() ^ 3))::int, false, now()
+    FROM generate_series(1, :users) AS follower, generate_series(1, 20)
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO timeline_entries (user_id, created_at, post_id, author_id)
+    SELECT 'plan-user-' || (1 + (posts.id * 7 + n * 7919) % :users), posts.created_at, posts.id, posts.google_user_id
+    FROM posts, generate_series(1, 3) AS n
+    WHERE posts.id BETWEEN :first_post AND :last_post
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO tombstones (entity_type, entity_id, post_id, deleted_at)
+    SELECT 'comment', i, i, now() - random() * interval '30 days'
+    FROM generate_series(1, :tombstones) AS i
+    """,
+    # Mentions skewed towards low user numbers too; most of an inbox has been read
+    """
+    INSERT INTO notifications (user_id, kind, actor_id, actor_name, post_id, read, created_at)
+    SELECT 'plan-user-' || (1 + floor(:users * random() ^ 3))::int, 'mention',
+           'plan-user-' || (1 + floor(:users * random()))::int, 'Plan User',
+           :first_post + floor(random() * (:last_post - :first_post + 1))::int, random() < 0.9,
+           now() - random() * :days * interval '1 day'
+    FROM generate_series(1, :notifications)
+    """,
+    """
+    INSERT INTO trending_scores (post_id, score, scored_at)
+    SELECT id, random(), now() FROM posts WHERE id BETWEEN :last_post - 999 AND :last_post
+    ON CONFLICT DO NOTHING
+    """,
+]
+
+SEEDED_TABLES = ("users", "posts", "comments", "follows", "timeline_entries", "tombstones", "trending_scores",
+                 "notifications")
+
+
+def _ensure_partitions(session, months: int) -> None:
+    """Partitions for every month the seed data falls in (normally only recent ones exist)."""
+    from app.core.partitions import PARTITIONED_TABLES, add_months, month_start, partition_name
+    from app.repositories import PartitionRepository
+
+    repository = PartitionRepository(session)
+    current = month_start(datetime.now(timezone.utc))
+    for table in PARTITIONED_TABLES:
+        existing = set(repository.get_partitions(table).values())
+        for offset in range(-months - 1, 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                repository.create_partition(table, partition_name(table, month), month, add_months(month, 1))
+
+
+def seed(session, args) -> SimpleNamespace:
+    from sqlalchemy import text
+
+    started = time.perf_counter()
+    _ensure_partitions(session, args.months)
+    params = {"users": args.users, "posts": args.posts, "comments": args.comments,
+              "tombstones": args.tombstones, "notifications": args.notifications, "days": args.months * 30}
+    session.execute(text("SELECT setseed(:seed)"), {"seed": args.seed})
+    for index, statement in enumerate(SEED_STATEMENTS):
+        if index == 2:
+            params["first_post"], params["last_post"] = session.execute(
+                text("SELECT min(id), max(id) FROM posts WHERE subject LIKE 'Plan check %'")
+            ).one()
+        session.execute(text(statement), params)
+    session.execute(text(f"ANALYZE {', '.join(SEEDED_TABLES)}"))
+    print(f"Seeded in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+
+    # The busiest user, and the most commented post (lowest id first among ties)
+    user_id = session.execute(text(
+        "SELECT google_user_id FROM posts WHERE subject LIKE 'Plan check %'"
+        " GROUP BY google_user_id ORDER BY count(*) DESC, google_user_id LIMIT 1"
+    )).scalar_one()
+    post_id = session.execute(text(
+        "SELECT post_id FROM comments WHERE post_id BETWEEN :first_post AND :last_post"
+        " GROUP BY post_id ORDER BY count(*) DESC, post_id LIMIT 1"
+    ), params).scalar_one()
+    notification_ids = session.execute(text(
+        "SELECT id FROM notifications WHERE user_id = :user_id ORDER BY id DESC LIMIT 3"
+    ), {"user_id": user_id}).scalars().all()
+    now = datetime.now(timezone.utc)
+    return SimpleNamespace(
+        user_id=user_id,
+        other_user_id="plan-user-2" if user_id != "plan-user-2" else "plan-user-3",
+        email=f"{user_id}@example.com",
+        post_id=post_id,
+        post_ids=list(range(post_id, post_id + 20)),
+        since=now - timedelta(hours=1),
+        until=now,
+        prune_before=now - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS),
+        notification_ids=notification_ids,
+        notification_before=str(notification_ids[-1]) if notification_ids else None,
+    )
+
+
+def plan_problems(plan: dict, reltuples: Dict[str, float], min_rows: int, allow: Iterable[str]) -> List[str]:
+    problems = []
+
+    def visit(node: dict) -> None:
+        node_type = node["Node Type"]
+        if node_type == "Seq Scan" and node_type not in allow:
+            relation = node.get("Relation Name")
+            rows = reltuples.get(relation, 0)
+            if rows >= min_rows and node.get("Plan Rows", 0) < rows / 10:
+                problems.append(f"Seq Scan on {relation} (~{rows:.0f} rows)")
+        elif node_type == "Sort" and node_type not in allow and node.get("Plan Rows", 0) >= min_rows:
+            problems.append(f"Sort on {', '.join(node.get('Sort Key', []))} (~{node.get('Plan Rows', 0)} rows)")
+        for child in node.get("Plans", []):
+            visit(child)
+
+    visit(plan)
+    return problems
+
+
+def check_postgres(args) -> bool:
+    from sqlalchemy import create_engine, event, text
+    from sqlalchemy.orm import Session
+    from app.repositories import (
+        CommentRepository, FollowRepository, NotificationRepository, PostRepository, TimelineRepository,
+        TombstoneRepository, TrendingRepository, UserRepository,
+    )
+
+    engine = create_engine(args.postgres_url or settings.DATABASE_URL)
+    statements: List[Tuple[str, object]] = []
+    capturing = [False]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if capturing[0] and not executemany and statement.lstrip().upper().startswith(
+                ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")):
+            statements.append((statement, parameters))
+
+    failed = False
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            # Repository commits release a savepoint; everything is rolled back below
+            session = Session(bind=conn, join_transaction_mode="create_savepoint")
+            sample = seed(session, args)
+            reltuples = dict(conn.execute(text(
+                "SELECT relname, reltuples FROM pg_class WHERE relkind IN ('r', 'p')"
+            )).all())
+            repositories = SimpleNamespace(
+                post=PostRepository(session), comment=CommentRepository(session), user=UserRepository(session),
+                follow=FollowRepository(session), timeline=TimelineRepository(session),
+                tombstone=TombstoneRepository(session), trending=TrendingRepository(session),
+                notification=NotificationRepository(session),
+            )
+            sample.post = repositories.post.get_by_id(sample.post_id)
+            sample.comment = repositories.comment.get_by_post_id(sample.post_id, limit=1)[0]
+            sample.comment_id = sample.comment.id
+
+            for case in CASES:
+                statements.clear()
+                capturing[0] = True
+                try:
+                    case.run(repositories, sample)
+                finally:
+                    capturing[0] = False
+                problems = []
+                for statement, parameters in statements:
+                    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+                    plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+                    for problem in plan_problems(plan, reltuples, args.min_rows, case.allow):
+                        problems.append((problem, statement))
+                    if args.verbose:
+                        print(f"  {case.name}: {' '.join(statement.split())[:200]}")
+                        print("    " + json.dumps(plan)[:2000])
+                if problems:
+                    failed = True
+                    print(f"FAIL  postgresql  {case.name}")
+                    for problem, statement in problems:
+                        print(f"        {problem}\n        in: {' '.join(statement.split())[:300]}")
+                else:
+                    print(f"ok    postgresql  {case.name} ({len(statements)} statements)")
+            session.close()
+        finally:
+            transaction.rollback()
+    return not failed
+
+
+# Datastore / Firestore: record query shapes
+
+class Shape(NamedTuple):
+    kind: str
+    equality: frozenset  # Properties with equality filters
+    orders: Tuple[Tuple[str, bool], ...]  # (property, descending), inequality property first
+    projection: frozenset  # Projected properties not already in equality/orders
+
+    def needs_composite(self) -> bool:
+        """Whether a built-in (single-property) index cannot serve the query."""
+        if not self.orders:
+            # Equality filters only: merge join of single-property indexes (no projection beyond them)
+            return bool(self.projection)
+        if len(self.orders) > 1 or self.orders[0] == ("__key__", True):
+            return True
+        return bool(self.equality or self.projection)
+
+    def describe(self) -> str:
+        parts = [f"{name}=" for name in sorted(self.equality)]
+        parts += [f"{name} {'desc' if descending else 'asc'}" for name, descending in self.orders]
+        parts += [f"+{name}" for name in sorted(self.projection)]
+        return f"{self.kind}({', '.join(parts)})"
+
+
+def _shape(kind: str, filters: List[Tuple[str, str]], orders: List[Tuple[str, bool]],
+           projection: Iterable[str]) -> Shape:
+    equality = frozenset(name for name, operator in filters if operator in ("=", "=="))
+    inequalities = [name for name, operator in filters if operator not in ("=", "==")]
+    orders = list(orders)
+    # An inequality filter's property is the first sort order (ascending unless ordered otherwise)
+    for name in inequalities:
+        if not any(order_name == name for order_name, _ in orders):
+            orders.insert(0, (name, False))
+    # The implicit final key order needs no index
+    while orders and orders[-1] == ("__key__", False):
+        orders.pop()
+    covered = equality | {name for name, _ in orders}
+    return Shape(kind, equality, tuple(orders), frozenset(projection) - covered)
+
+
+def index_covers(properties: List[Tuple[str, bool]], shape: Shape) -> bool:
+    """Whether a composite index (property, descending) list serves the shape: equality properties, orders, projection."""
+    count = len(shape.equality)
+    if {name for name, _ in properties[:count]} != shape.equality:
+        return False
+    ordered = properties[count:count + len(shape.orders)]
+    if tuple(ordered) != shape.orders:
+        return False
+    return {name for name, _ in properties[count + len(shape.orders):]} == shape.projection
+
+
+class _Key:
+    def __init__(self, kind: str, name):
+        self.kind, self.name, self.id_or_name = kind, name, name
+
+
+class _Results(list):
+    next_page_token = None
+
+
+class RecordingDatastoreQuery:
+    def __init__(self, shapes: Set[Shape], kind: str):
+        self._shapes = shapes
+        self.kind = kind
+        self.filters: List[Tuple[str, str]] = []
+        self.order: List[str] = []
+        self.projection: List[str] = []
+
+    def add_filter(self, name: str, operator: str, value) -> "RecordingDatastoreQuery":
+        self.filters.append((name, operator))
+        return self
+
+    def key_filter(self, key, operator: str = "=") -> "RecordingDatastoreQuery":
+        self.filters.append(("__key__", operator))
+        return self
+
+    def keys_only(self) -> None:
+        self.projection = ["__key__"]
+
+    def fetch(self, limit=None, offset=None, start_cursor=None, **kwargs) -> _Results:
+        orders = [(name.lstrip("-"), name.startswith("-")) for name in self.order]
+        projection = [name for name in self.projection if name != "__key__"]
+        self._shapes.add(_shape(self.kind, self.filters, orders, projection))
+        return _Results()
+
+
+class RecordingDatastoreClient:
+    """Enough of datastore.Client for the repositories: queries are recorded, reads find nothing."""
+
+    def __init__(self):
+        self.shapes: Set[Shape] = set()
+
+    def query(self, kind: str) -> RecordingDatastoreQuery:
+        return RecordingDatastoreQuery(self.shapes, kind)
+
+    def key(self, kind: str, name) -> _Key:
+        return _Key(kind, name)
+
+    def get(self, key):
+        return None
+
+    def get_multi(self, keys):
+        return []
+
+    def put(self, entity) -> None:
+        pass
+
+    put_multi = delete = delete_multi = put
+
+    def transaction(self):
+        return contextlib.nullcontext()
+
+
+class RecordingFirestoreQuery:
+    def __init__(self, shapes: Set[Shape], collection: str, filters=(), orders=()):
+        self._shapes = shapes
+        self.collection = collection
+        self.filters = list(filters)
+        self.orders = list(orders)
+
+    def where(self, field: str, operator: str, value) -> "RecordingFirestoreQuery":
+        return RecordingFirestoreQuery(self._shapes, self.collection, self.filters + [(field, operator)], self.orders)
+
+    def order_by(self, field: str, direction="ASCENDING") -> "RecordingFirestoreQuery":
+        orders = self.orders + [(field, str(direction).upper().endswith("DESCENDING"))]
+        return RecordingFirestoreQuery(self._shapes, self.collection, self.filters, orders)
+
+    def limit(self, count: int) -> "RecordingFirestoreQuery":
+        return self
+
+    offset = limit
+
+    def stream(self):
+        self._shapes.add(_shape(self.collection, self.filters, self.orders, ()))
+        return iter(())
+
+    get = stream
+
+    def document(self, document_id=None):
+        return SimpleNamespace(
+            id=document_id or "document", get=lambda: SimpleNamespace(exists=False, id=document_id),
+            set=lambda data: None, update=lambda data: None, delete=lambda: None,
+        )
+
+
+class RecordingFirestoreClient:
+    def __init__(self):
+        self.shapes: Set[Shape] = set()
+
+    def collection(self, name: str) -> RecordingFirestoreQuery:
+        return RecordingFirestoreQuery(self.shapes, name)
+
+    def batch(self):
+        return SimpleNamespace(delete=lambda ref: None, set=lambda ref, data: None, commit=lambda: None)
+
+
+def _datastore_sample() -> SimpleNamespace:
+    from app.core.threads import datastore_segment
+    from app.repositories.entity_models import CommentModel, PostModel
+
+    now = datetime.now(timezone.utc)
+    post = PostModel("post-1", "user-1", "Author", "Subject", "Content", now, now)
+    comment = CommentModel("comment-1", "post-1", "user-2", "Commenter", "Content", now, now,
+                           path=datastore_segment(now, "comment-1"))
+    return SimpleNamespace(
+        user_id="user-1", other_user_id="user-2", email="user-1@example.com", post_id="post-1",
+        post_ids=["post-1", "post-2"], post=post, comment=comment, comment_id="comment-1",
+        since=now - timedelta(hours=1), until=now, prune_before=now - timedelta(days=30),
+        notification_ids=["notification-1", "notification-2"], notification_before=f"{now.isoformat()} notification-1",
+    )
+
+
+def load_index_yaml(path: str) -> Dict[str, List[List[Tuple[str, bool]]]]:
+    import yaml  # PyYAML, installed with uvicorn[standard]
+
+    with open(path) as file:
+        declared = yaml.safe_load(file) or {}
+    indexes: Dict[str, List[List[Tuple[str, bool]]]] = {}
+    for index in declared.get("indexes", []):
+        properties = [(prop["name"], prop.get("direction", "asc") == "desc") for prop in index["properties"]]
+        indexes.setdefault(index["kind"], []).append(properties)
+    return indexes
+
+
+def load_firestore_indexes(path: str) -> Dict[str, List[List[Tuple[str, bool]]]]:
+    with open(path) as file:
+        declared = json.load(file)
+    indexes: Dict[str, List[List[Tuple[str, bool]]]] = {}
+    for index in declared.get("indexes", []):
+        properties = [(field["fieldPath"], field.get("order") == "DESCENDING") for field in index["fields"]]
+        indexes.setdefault(index["collectionGroup"], []).append(properties)
+    return indexes
+
+
+def check_coverage(label: str, shapes: Set[Shape], indexes: Dict[str, List[List[Tuple[str, bool]]]],
+                   index_file: str) -> bool:
+    failed = False
+    used = set()
+    for shape in sorted(shapes, key=Shape.describe):
+        if not shape.needs_composite():
+            print(f"ok    {label}  {shape.describe()} (built-in indexes)")
+            continue
+        matches = [position for position, properties in enumerate(indexes.get(shape.kind, []))
+                   if index_covers(properties, shape)]
+        if matches:
+            used.update((shape.kind, position) for position in matches)
+            print(f"ok    {label}  {shape.describe()}")
+        else:
+            failed = True
+            print(f"FAIL  {label}  {shape.describe()} has no composite index in {index_file}")
+    for kind, declared in sorted(indexes.items()):
+        for position, properties in enumerate(declared):
+            if (kind, position) not in used:
+                names = ", ".join(f"{name}{' desc' if descending else ''}" for name, descending in properties)
+                print(f"note  {label}  {kind}({names}) in {index_file} is not used by any query")
+    return not failed
+
+
+def _run_cases(repositories: SimpleNamespace, sample: SimpleNamespace) -> None:
+    for case in CASES:
+        repository = getattr(repositories, case.name.split(".")[0], None)
+        if repository is None or not hasattr(repository, case.name.split(".")[1].split(" ")[0]):
+            continue
+        try:
+            case.run(repositories, sample)
+        except (TypeError, AttributeError, KeyError):
+            # A method the backend implements with another signature, or that needs data; its
+            # queries are recorded up to that point
+            pass
+
+
+def check_datastore() -> bool:
+    from app.repositories import (
+        DatastoreCommentRepository, DatastoreFollowRepository, DatastoreNotificationRepository,
+        DatastorePostRepository, DatastoreTimelineRepository, DatastoreTombstoneRepository,
+        DatastoreTrendingRepository, DatastoreUserRepository,
+    )
+
+    client = RecordingDatastoreClient()
+    repositories = SimpleNamespace(
+        post=DatastorePostRepository(client), comment=DatastoreCommentRepository(client),
+        user=DatastoreUserRepository(client), follow=DatastoreFollowRepository(client),
+        timeline=DatastoreTimelineRepository(client), tombstone=DatastoreTombstoneRepository(client),
+        trending=DatastoreTrendingRepository(client), notification=DatastoreNotificationRepository(client),
+    )
+    _run_cases(repositories, _datastore_sample())
+    return check_coverage("datastore ", client.shapes, load_index_yaml(os.path.join(BACKEND_DIR, "index.yaml")),
+                          "index.yaml")
+
+
+def check_firestore() -> bool:
+    from app.repositories import FirestoreCommentRepository, FirestorePostRepository, FirestoreUserRepository
+
+    client = RecordingFirestoreClient()
+    repositories = SimpleNamespace(
+        post=FirestorePostRepository(client), comment=FirestoreCommentRepository(client),
+        user=FirestoreUserRepository(client),
+    )
+    _run_cases(repositories, _datastore_sample())
+    indexes = load_firestore_indexes(os.path.join(BACKEND_DIR, "firestore.indexes.json"))
+    return check_coverage("firestore ", client.shapes, indexes, "firestore.indexes.json")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--postgres-url", help="SQLAlchemy URL (default: DATABASE_URL from the environment/.env)")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--posts", type=int, default=200000)
+    parser.add_argument("--comments", type=int, default=600000)
+    parser.add_argument("--tombstones", type=int, default=20000)
+    parser.add_argument("--notifications", type=int, default=200000)
+    parser.add_argument("--months", type=int, default=12, help="Seeded rows are spread over this many months")
+    parser.add_argument("--min-rows", type=int, default=1000,
+                        help="Sequential scans of tables/partitions, and sorts, of fewer rows than this are fine")
+    parser.add_argument("--seed", type=float, default=0.5, help="setseed() value for the seed data, between -1 and 1")
+    parser.add_argument("--verbose", action="store_true", help="Print every statement and its plan")
+    parser.add_argument("--skip-postgres", action="store_true")
+    parser.add_argument("--skip-datastore", action="store_true", help="Skip the Datastore and Firestore index checks")
+    args = parser.parse_args()
+
+    ok = True
+    if not args.skip_postgres:
+        ok = check_postgres(args) and ok
+    if not args.skip_datastore:
+        ok = check_datastore() and ok
+        ok = check_firestore() and ok
+    print("All query checks passed" if ok else "Query checks failed")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Export posts and comments as NDJSON.
+
+Writes every post, then every comment, of one user (or of everyone) as one
+JSON object per line, with a "type" of "post" or "comment". Rows are
+streamed from the database configured in the environment/.env (server-side
+cursor on PostgreSQL, preferring a replica; cursor-chained queries on
+Datastore), so memory use stays flat however large the export is.
+
+Usage (from backend/):
+    python scripts/export_ndjson.py [--user GOOGLE_USER_ID] [--output export.ndjson] [--batch-size 1000]
+
+Without --output the export goes to stdout; progress is reported on stderr.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.export_service import export_ndjson  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="Only export this Google user ID's posts and comments")
+    parser.add_argument("--output", help="File to write (default: stdout)")
+    parser.add_argument("--batch-size", type=int, help="Rows per database batch (default: EXPORT_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    started = time.perf_counter()
+    lines = 0
+    try:
+        for chunk in export_ndjson(args.user, batch_size=args.batch_size):
+            output.write(chunk)
+            lines += chunk.count(b"\n")
+            print(f"\r{lines} rows", end="", file=sys.stderr, flush=True)
+    finally:
+        if args.output:
+            output.close()
+    elapsed = time.perf_counter() - started
+    print(f"\rExported {lines} rows in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Load generator for the API, with per-route latency percentiles.
+
+Runs a weighted mix of operations from many concurrent asyncio workers,
+either against the FastAPI app in-process (httpx ASGITransport, lifespan
+included) or against a running server with --url. Requests carry JWTs made
+with create_access_token for a pool of synthetic users, so authenticated
+routes (update_comment, timeline) work and per-user rate limits apply.
+
+Usage (from backend/):
+    python scripts/loadtest.py [--url http://localhost:8000] [--duration 30] [--concurrency 50]
+        [--mix get_all_posts=40,get_post=20,get_post_comments=15,create_post=5,...]
+        [--output after.json] [--baseline before.json]
+
+Prints JSON with, per route: requests, throughput, error rate, status codes
+and p50/p95/p99/max latency in ms. With --baseline (the JSON of an earlier
+run) each route also gets the change against it, for before/after comparisons.
+
+In-process runs use the database configured in the environment/.env and
+disable rate limiting (all requests come from one address) unless
+--keep-rate-limits is given. Against a server, tokens are signed with this
+environment's SECRET_KEY, which must match the server's.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_MIX = (
+    "get_all_posts=35,get_post=20,get_post_comments=15,get_trending_posts=5,get_user_posts=5,"
+    "get_timeline=5,create_post=5,create_comment=7,update_comment=3"
+)
+
+
+class State:
+    """Users and the ids created during the run, shared by all workers."""
+
+    def __init__(self, users: List[dict]):
+        self.users = users
+        self.post_ids: List = []
+        self.comments_by_user: Dict[str, List] = defaultdict(list)
+
+    def random_post_id(self):
+        return random.choice(self.post_ids) if self.post_ids else None
+
+
+def _auth(user: dict) -> dict:
+    return {"Authorization": f"Bearer {user['token']}"}
+
+
+def _author(user: dict) -> dict:
+    return {"google_user_id": user["google_user_id"], "author_name": user["name"]}
+
+
+# Each operation returns (route, response) or None when it has nothing to act on yet
+
+async def create_post(client: httpx.AsyncClient, state: State, user: dict):
+    response = await client.post(
+        "/api/posts",
+        params=_author(user),
+        json={"subject": f"Load test {random.randrange(10**6)}", "content": "Posted by the load generator."},
+        headers=_auth(user),
+    )
+    if response.status_code == 201:
+        state.post_ids.append(response.json()["id"])
+    return "POST /api/posts", response
+
+
+async def get_all_posts(client: httpx.AsyncClient, state: State, user: dict):
+    return "GET /api/posts", await client.get("/api/posts", params={"limit": 20}, headers=_auth(user))
+
+
+async def get_post(client: httpx.AsyncClient, state: State, user: dict):
+    post_id = state.random_post_id()
+    if post_id is None:
+        return None
+    return "GET /api/posts/{post_id}", await client.get(f"/api/posts/{post_id}", headers=_auth(user))
+
+
+async def get_trending_posts(client: httpx.AsyncClient, state: State, user: dict):
+    return "GET /api/posts/trending", await client.get("/api/posts/trending", headers=_auth(user))
+
+
+async def get_user_posts(client: httpx.AsyncClient, state: State, user: dict):
+    author = random.choice(state.users)
+    return "GET /api/posts/user/{google_user_id}", await client.get(
+        f"/api/posts/user/{author['google_user_id']}", headers=_auth(user)
+    )
+
+
+async def get_post_comments(client: httpx.AsyncClient, state: State, user: dict):
+    post_id = state.random_post_id()
+    if post_id is None:
+        return None
+    return "GET /api/posts/{post_id}/comments", await client.get(f"/api/posts/{post_id}/comments", headers=_auth(user))
+
+
+async def create_comment(client: httpx.AsyncClient, state: State, user: dict):
+    post_id = state.random_post_id()
+    if post_id is None:
+        return None
+    response = await client.post(
+        f"/api/posts/{post_id}/comments",
+        params=_author(user),
+        json={"content": "Commented by the load generator."},
+        headers=_auth(user),
+    )
+    if response.status_code == 201:
+        state.comments_by_user[user["google_user_id"]].append(response.json()["id"])
+    return "POST /api/posts/{post_id}/comments", response
+
+
+async def update_comment(client: httpx.AsyncClient, state: State, user: dict):
+    comment_ids = state.comments_by_user.get(user["google_user_id"])
+    if not comment_ids:
+        return None
+    return "PUT /api/comments/{comment_id}", await client.put(
+        f"/api/comments/{random.choice(comment_ids)}",
+        json={"content": f"Edited by the load generator ({random.randrange(10**6)})."},
+        headers=_auth(user),
+    )
+
+
+async def get_timeline(client: httpx.AsyncClient, state: State, user: dict):
+    return "GET /api/timeline", await client.get("/api/timeline", headers=_auth(user))
+
+
+OPERATIONS: Dict[str, Callable] = {
+    operation.__name__: operation
+    for operation in (
+        create_post, get_all_posts, get_post, get_trending_posts, get_user_posts,
+        get_post_comments, create_comment, update_comment, get_timeline,
+    )
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def make_users(count: int) -> List[dict]:
+    from app.api.routes.auth import create_access_token
+
+    users = []
+    for index in range(count):
+        user = {
+            "google_user_id": f"loadtest-user-{index}",
+            "email": f"loadtest-{index}@example.com",
+            "name": f"Load Test User {index}",
+        }
+        user["token"] = create_access_token({"sub": user["google_user_id"], "email": user["email"], "name": user["name"]})
+        users.append(user)
+    return users
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def run_load(client: httpx.AsyncClient, state: State, weights: Dict[str, float], concurrency: int,
+                   duration: float) -> dict:
+    names = list(weights)
+    weight_values = list(weights.values())
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            operation = OPERATIONS[random.choices(names, weights=weight_values)[0]]
+            user = random.choice(state.users)
+            started = time.perf_counter()
+            try:
+                result = await operation(client, state, user)
+            except httpx.HTTPError as error:
+                route = f"{operation.__name__} (transport)"
+                latencies[route].append((time.perf_counter() - started) * 1000)
+                statuses[route][type(error).__name__] += 1
+                continue
+            if result is None:
+                continue
+            route, response = result
+            latencies[route].append((time.perf_counter() - started) * 1000)
+            statuses[route][str(response.status_code)] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    routes = {}
+    for route, values in sorted(latencies.items()):
+        values.sort()
+        errors = sum(count for status, count in statuses[route].items() if not status.isdigit() or int(status) >= 400)
+        routes[route] = {
+            "requests": len(values),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "errors": errors,
+            "error_rate": round(errors / len(values), 4),
+            "status_codes": dict(statuses[route]),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3),
+        }
+    total = sum(route["requests"] for route in routes.values())
+    total_errors = sum(route["errors"] for route in routes.values())
+    return {
+        "duration_seconds": round(elapsed, 3),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "error_rate": round(total_errors / total, 4) if total else 0.0,
+        "routes": routes,
+    }
+
+
+def compare(report: dict, baseline: dict) -> None:
+    """Add the relative change against a baseline report to each route (negative latency change = faster)."""
+    for route, stats in report["routes"].items():
+        before = baseline.get("routes", {}).get(route)
+        if not before:
+            continue
+        stats["vs_baseline"] = {
+            key: (round((stats[key] - before[key]) / before[key] * 100, 1) if before[key] else None)
+            for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+        }
+    if baseline.get("throughput_rps"):
+        report["throughput_change_pct"] = round(
+            (report["throughput_rps"] - baseline["throughput_rps"]) / baseline["throughput_rps"] * 100, 1
+        )
+
+
+async def main_async(args) -> dict:
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        lifespan = None
+    else:
+        if not args.keep_rate_limits:
+            os.environ["RATE_LIMIT_ENABLED"] = "false"
+        from app.main import app
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout)
+        # ASGITransport does not send lifespan events; run startup/shutdown (view counter, bus, ...) ourselves
+        lifespan = app.router.lifespan_context(app)
+
+    state = State(make_users(args.users))
+    if lifespan is not None:
+        await lifespan.__aenter__()
+    try:
+        async with client:
+            # Seed posts so read operations have something to read from the start
+            for _ in range(args.seed_posts):
+                await create_post(client, state, random.choice(state.users))
+            if args.warmup > 0:
+                await run_load(client, state, parse_mix(args.mix), args.concurrency, args.warmup)
+            report = await run_load(client, state, parse_mix(args.mix), args.concurrency, args.duration)
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    report["config"] = {
+        "target": args.url or "in-process",
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "users": args.users,
+        "mix": parse_mix(args.mix),
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server (default: run the app in-process)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before the run")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20, help="Synthetic users (JWT subjects)")
+    parser.add_argument("--seed-posts", type=int, default=20)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Comma-separated operation=weight")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--keep-rate-limits", action="store_true")
+    parser.add_argument("--seed", type=int, help="Random seed for a repeatable operation sequence")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    parse_mix(args.mix)  # Fail fast on typos
+
+    report = asyncio.run(main_async(args))
+    if args.baseline:
+        with open(args.baseline) as file:
+            compare(report, json.load(file))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
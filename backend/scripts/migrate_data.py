@@ -0,0 +1,462 @@
+"""
+Copy users, posts and comments between the PostgreSQL and Datastore backends.
+
+    python scripts/migrate_data.py --from postgresql --to firestore
+    python scripts/migrate_data.py --from firestore --to postgresql
+
+Each kind (users, then posts, then comments) is read in keyset order (primary
+key / entity key) in chunks of --chunk-size, while a pool of --workers
+threads writes earlier chunks: multi-row INSERTs on PostgreSQL, put_multi
+(at most 500 entities per call) on Datastore.
+
+Ids:
+- PostgreSQL -> Datastore: a row's id becomes its entity's key name
+  (str(id)), comments' post_id likewise, so no mapping needs to be stored
+  and re-running overwrites instead of duplicating.
+- Datastore -> PostgreSQL: new rows get serial ids. The source key -> new
+  id mapping is stored in a migration_id_map table, written in the same
+  transaction as the rows, and used to resolve comments' post_id and to
+  skip rows that were already copied.
+- Users keep their google_user_id in both.
+- Comments keep their thread path, depth and reply_count; replies are linked
+  to their parent's new id (from the paths) once all comments are copied.
+
+Progress is written to a checkpoint file (--checkpoint) after every chunk
+that completes with all chunks before it, so an interrupted run continues
+where it stopped when started again with the same arguments. Progress and
+throughput are printed to stderr; a JSON summary is printed at the end.
+
+Follows, timelines and trending scores are not copied (follower_count
+starts at 0); they rebuild from new activity. Connection settings come
+from the environment/.env: the DATABASE_URL parts (POSTGRES_*) and
+GCP_PROJECT_ID, or --postgres-url / --project.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.config import settings  # noqa: E402
+from app.core.partitions import PARTITIONED_TABLES, add_months, month_start, partition_name  # noqa: E402
+from app.core.threads import datastore_segment  # noqa: E402
+
+KINDS = ("users", "posts", "comments")
+DATASTORE_KINDS = {"users": "User", "posts": "Post", "comments": "Comment"}
+DATASTORE_MAX_BATCH = 500  # put_multi limit
+
+Row = Dict
+
+
+# Sources: read(kind, after, limit) -> (rows, last key), rows in key order with the key as "id"
+
+class PostgresSource:
+    def __init__(self, engine):
+        from sqlalchemy import func, select
+        from app.models import Comment, Post, User
+
+        self.engine = engine
+        self._func, self._select = func, select
+        self.tables = {"users": User.__table__, "posts": Post.__table__, "comments": Comment.__table__}
+        self.keys = {"users": User.__table__.c.google_user_id, "posts": Post.__table__.c.id,
+                     "comments": Comment.__table__.c.id}
+
+    def read(self, kind: str, after, limit: int) -> Tuple[List[Row], object]:
+        table, key = self.tables[kind], self.keys[kind]
+        query = self._select(table).order_by(key).limit(limit)
+        if after is not None:
+            query = query.where(key > after)
+        with self.engine.connect() as conn:
+            rows = [dict(row._mapping) for row in conn.execute(query)]
+            if kind == "users":
+                for row in rows:
+                    row["id"] = row["google_user_id"]
+            if kind == "posts" and rows:
+                # Datastore keeps comment_count on the post; PostgreSQL counts on read
+                comments = self.tables["comments"]
+                counts = dict(conn.execute(
+                    self._select(comments.c.post_id, self._func.count())
+                    .where(comments.c.post_id.in_([row["id"] for row in rows]))
+                    .group_by(comments.c.post_id)
+                ).all())
+                for row in rows:
+                    row["comment_count"] = counts.get(row["id"], 0)
+        return rows, (rows[-1]["id"] if rows else after)
+
+
+class DatastoreSource:
+    def __init__(self, client):
+        self.client = client
+
+    def read(self, kind: str, after, limit: int) -> Tuple[List[Row], object]:
+        datastore_kind = DATASTORE_KINDS[kind]
+        query = self.client.query(kind=datastore_kind)
+        if after is not None:
+            query.key_filter(self.client.key(datastore_kind, after), '>')
+        query.order = ['__key__']
+        entities = list(query.fetch(limit=limit))
+        rows = []
+        for entity in entities:
+            row = dict(entity)
+            row["id"] = entity.key.id_or_name
+            if kind == "users":
+                row["google_user_id"] = row["id"]
+            rows.append(row)
+        return rows, (rows[-1]["id"] if rows else after)
+
+
+# Targets: write(kind, rows) -> (written, skipped); called from several worker threads
+
+class DatastoreTarget:
+    def __init__(self, client):
+        from google.cloud import datastore
+
+        self.client = client
+        self._entity = datastore.Entity
+
+    def _to_entity(self, kind: str, row: Row):
+        entity = self._entity(key=self.client.key(DATASTORE_KINDS[kind], str(row["id"])))
+        if kind == "users":
+            entity.update({
+                'email': row['email'],
+                'name': row['name'],
+                'picture': row.get('picture'),
+                'created_at': row['created_at'],
+                'updated_at': row['updated_at'],
+                'follower_count': 0,
+            })
+        elif kind == "posts":
+            entity.update({
+                'google_user_id': row['google_user_id'],
+                'author_name': row['author_name'],
+                'subject': row['subject'],
+                'content': row['content'],
+                'created_at': row['created_at'],
+                'updated_at': row['updated_at'],
+                'comment_count': row.get('comment_count', 0),
+                'view_count': row.get('view_count', 0),
+            })
+        else:
+            entity.update({
+                'post_id': str(row['post_id']),
+                'parent_id': str(row['parent_id']) if row.get('parent_id') is not None else None,
+                'path': row['path'],  # Keeps sorting: segments are only compared with their siblings'
+                'depth': row.get('depth', 0),
+                'reply_count': row.get('reply_count', 0),
+                'google_user_id': row['google_user_id'],
+                'author_name': row['author_name'],
+                'content': row['content'],
+                'created_at': row['created_at'],
+                'updated_at': row['updated_at'],
+            })
+        return entity
+
+    def setup(self) -> None:
+        pass
+
+    def finish(self, kind: str) -> None:
+        pass
+
+    def write(self, kind: str, rows: List[Row]) -> Tuple[int, int]:
+        entities = [self._to_entity(kind, row) for row in rows]
+        for start in range(0, len(entities), DATASTORE_MAX_BATCH):
+            self.client.put_multi(entities[start:start + DATASTORE_MAX_BATCH])
+        return len(entities), 0
+
+
+class PostgresTarget:
+    def __init__(self, engine):
+        from sqlalchemy import Column, Integer, MetaData, String, Table, select
+        from sqlalchemy.dialects.postgresql import insert
+        from sqlalchemy.orm import Session
+        from app.models import Comment, Post, User
+
+        self.engine = engine
+        self._select, self._insert, self._session = select, insert, Session
+        self.tables = {"users": User.__table__, "posts": Post.__table__, "comments": Comment.__table__}
+        # Months known to have a partition, per partitioned table
+        self._partitions = {table: set() for table in PARTITIONED_TABLES}
+        self._partitions_lock = threading.Lock()
+        self.id_map = Table(
+            "migration_id_map", MetaData(),
+            Column("kind", String(20), primary_key=True),
+            Column("source_id", String(255), primary_key=True),
+            Column("target_id", Integer, nullable=False),
+        )
+
+    def setup(self) -> None:
+        self.id_map.create(self.engine, checkfirst=True)
+
+    def _ensure_partitions(self, kind: str, rows: List[Row]) -> None:
+        """Create the monthly partitions the rows go to: copied rows can predate every existing partition."""
+        from app.repositories import PartitionRepository
+
+        months = {month_start(row['created_at']) for row in rows} - self._partitions[kind]
+        if not months:
+            return
+        with self._partitions_lock, self._session(self.engine) as session:
+            repository = PartitionRepository(session)
+            existing = set(repository.get_partitions(kind).values())
+            for month in sorted(months - existing):
+                repository.create_partition(kind, partition_name(kind, month), month, add_months(month, 1))
+            self._partitions[kind] |= months
+
+    def _mapped(self, conn, kind: str, source_ids) -> Dict[str, int]:
+        if not source_ids:
+            return {}
+        rows = conn.execute(
+            self._select(self.id_map.c.source_id, self.id_map.c.target_id)
+            .where(self.id_map.c.kind == kind, self.id_map.c.source_id.in_([str(id) for id in source_ids]))
+        )
+        return dict(rows.all())
+
+    def write(self, kind: str, rows: List[Row]) -> Tuple[int, int]:
+        table = self.tables[kind]
+        if kind in self._partitions:
+            self._ensure_partitions(kind, rows)
+        with self.engine.begin() as conn:
+            if kind == "users":
+                values = [{
+                    'google_user_id': row['google_user_id'],
+                    'email': row['email'],
+                    'name': row['name'],
+                    'picture': row.get('picture'),
+                    'created_at': row['created_at'],
+                    'updated_at': row['updated_at'],
+                    'follower_count': 0,
+                } for row in rows]
+                # Users already present (same id or email) are left alone, which also makes re-runs safe
+                written = conn.execute(self._insert(table).values(values).on_conflict_do_nothing()).rowcount
+                return written, len(rows) - written
+
+            # Rows copied by an earlier, interrupted run are already mapped
+            done = self._mapped(conn, kind, [row["id"] for row in rows])
+            rows = [row for row in rows if str(row["id"]) not in done]
+            skipped = len(done)
+            if kind == "posts":
+                values = [{
+                    'google_user_id': row['google_user_id'],
+                    'author_name': row['author_name'],
+                    'subject': row['subject'],
+                    'content': row['content'],
+                    'created_at': row['created_at'],
+                    'updated_at': row['updated_at'],
+                    'view_count': row.get('view_count', 0),
+                } for row in rows]
+            else:
+                post_ids = self._mapped(conn, "posts", {row['post_id'] for row in rows})
+                orphans = [row for row in rows if str(row['post_id']) not in post_ids]
+                rows = [row for row in rows if str(row['post_id']) in post_ids]
+                skipped += len(orphans)
+                values = [{
+                    'post_id': post_ids[str(row['post_id'])],
+                    # Paths are kept (comments written before threads get one); parent_id is set by finish()
+                    'path': row.get('path') or datastore_segment(row['created_at'], str(row['id'])),
+                    'depth': row.get('depth', 0),
+                    'reply_count': row.get('reply_count', 0),
+                    'google_user_id': row['google_user_id'],
+                    'author_name': row['author_name'],
+                    'content': row['content'],
+                    'created_at': row['created_at'],
+                    'updated_at': row['updated_at'],
+                } for row in rows]
+            if not values:
+                return 0, skipped
+
+            # One multi-row INSERT; ids come back in parameter order for the id map
+            new_ids = conn.execute(
+                self._insert(table).returning(table.c.id, sort_by_parameter_order=True), values
+            ).scalars().all()
+            conn.execute(self._insert(self.id_map), [
+                {'kind': kind, 'source_id': str(row["id"]), 'target_id': new_id}
+                for row, new_id in zip(rows, new_ids)
+            ])
+        return len(values), skipped
+
+    def finish(self, kind: str) -> None:
+        """
+        Link copied replies to their parents, which may have been copied in a later chunk: the
+        parent is the comment of the same post one level up whose path starts the reply's path.
+        """
+        from sqlalchemy import text
+
+        if kind != "comments":
+            return
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "UPDATE comments AS reply SET parent_id = parent.id FROM comments AS parent"
+                " WHERE reply.depth > 0 AND reply.parent_id IS NULL"
+                " AND parent.post_id = reply.post_id AND parent.depth = reply.depth - 1"
+                " AND starts_with(reply.path, parent.path)"
+            ))
+
+
+class Checkpoint:
+    """Per kind: key of the last chunk written with all chunks before it, row counts, done flag."""
+
+    def __init__(self, path: str, source: str, target: str):
+        self.path = path
+        self.data = {"source": source, "target": target, "kinds": {}}
+        if os.path.exists(path):
+            with open(path) as file:
+                saved = json.load(file)
+            if (saved["source"], saved["target"]) != (source, target):
+                raise SystemExit(f"{path} is a checkpoint of a {saved['source']} -> {saved['target']} migration")
+            self.data = saved
+
+    def kind(self, kind: str) -> dict:
+        return self.data["kinds"].setdefault(kind, {"after": None, "written": 0, "skipped": 0, "done": False})
+
+    def advance(self, kind: str, after, written: int, skipped: int) -> None:
+        state = self.kind(kind)
+        state["after"] = after
+        state["written"] += written
+        state["skipped"] += skipped
+        self.save()
+
+    def finish(self, kind: str) -> None:
+        self.kind(kind)["done"] = True
+        self.save()
+
+    def save(self) -> None:
+        # Write-then-rename, so an interruption never leaves a half-written checkpoint
+        temporary = self.path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(self.data, file, indent=2, default=str)
+        os.replace(temporary, self.path)
+
+
+class Progress:
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self._last_print = 0.0
+        self._lock = threading.Lock()
+
+    def report(self, kind: str, rows: int, started: float, final: bool = False) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            if not final and now - self._last_print < self.interval:
+                return
+            self._last_print = now
+        rate = rows / max(now - started, 1e-9)
+        print(f"\r{kind}: {rows} rows, {rate:.0f} rows/s", end="\n" if final else "", file=sys.stderr, flush=True)
+
+
+def migrate_kind(kind: str, source, target, checkpoint: Checkpoint, chunk_size: int, workers: int,
+                 progress: Progress) -> dict:
+    state = checkpoint.kind(kind)
+    if state["done"]:
+        print(f"{kind}: already migrated, skipping", file=sys.stderr)
+        return {"written": state["written"], "skipped": state["skipped"], "seconds": 0.0, "rows_per_second": None}
+
+    started = time.perf_counter()
+    copied = 0
+    after = state["after"]
+    # (future, last key of the chunk), in read order; the checkpoint only moves past completed prefixes
+    pending: deque = deque()
+
+    def complete_oldest() -> None:
+        nonlocal copied
+        future, last_key, count = pending.popleft()
+        written, skipped = future.result()  # A failed chunk stops the run; the checkpoint is before it
+        checkpoint.advance(kind, last_key, written, skipped)
+        copied += count
+        progress.report(kind, copied, started)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"migrate-{kind}") as pool:
+        try:
+            while True:
+                rows, last_key = source.read(kind, after, chunk_size)
+                if not rows:
+                    break
+                pending.append((pool.submit(target.write, kind, rows), last_key, len(rows)))
+                after = last_key
+                # Bound the chunks in memory: wait for the oldest once every worker has one queued
+                while pending and (pending[0][0].done() or len(pending) >= workers * 2):
+                    complete_oldest()
+            while pending:
+                complete_oldest()
+        except BaseException:
+            for future, _, _ in pending:
+                future.cancel()
+            raise
+
+    target.finish(kind)
+    checkpoint.finish(kind)
+    elapsed = time.perf_counter() - started
+    progress.report(kind, copied, started, final=True)
+    return {
+        "written": state["written"],
+        "skipped": state["skipped"],
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(copied / elapsed, 1) if elapsed else None,
+    }
+
+
+def _backend(name: str, args, workers: int):
+    if name == "postgresql":
+        from sqlalchemy import create_engine
+
+        # One connection per writer plus the reader
+        return create_engine(args.postgres_url or _postgres_url(), pool_size=workers + 1, max_overflow=0,
+                             pool_pre_ping=True)
+    from google.cloud import datastore
+
+    project = args.project or settings.GCP_PROJECT_ID
+    return datastore.Client(project=project) if project else datastore.Client()
+
+
+def _postgres_url() -> str:
+    # Not settings.DATABASE_URL: that one depends on this environment's DB_TYPE
+    return (f"postgresql+{settings.POSTGRES_DRIVER}://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
+            f"@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from", dest="source", required=True, choices=("postgresql", "firestore"))
+    parser.add_argument("--to", dest="target", required=True, choices=("postgresql", "firestore"))
+    parser.add_argument("--postgres-url", help="SQLAlchemy URL (default: from POSTGRES_* settings)")
+    parser.add_argument("--project", help="GCP project of the Datastore (default: GCP_PROJECT_ID)")
+    parser.add_argument("--kinds", default=",".join(KINDS), help="Comma-separated subset of users,posts,comments")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Rows per read and per write")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent writers")
+    parser.add_argument("--checkpoint", default="migration_checkpoint.json")
+    args = parser.parse_args()
+
+    if args.source == args.target:
+        raise SystemExit("--from and --to must be different backends")
+    kinds = [kind.strip() for kind in args.kinds.split(",")]
+    unknown = set(kinds) - set(KINDS)
+    if unknown:
+        raise SystemExit(f"Unknown kinds: {', '.join(sorted(unknown))}")
+
+    source_db = _backend(args.source, args, args.workers)
+    target_db = _backend(args.target, args, args.workers)
+    source = PostgresSource(source_db) if args.source == "postgresql" else DatastoreSource(source_db)
+    target = PostgresTarget(target_db) if args.target == "postgresql" else DatastoreTarget(target_db)
+    target.setup()
+
+    checkpoint = Checkpoint(args.checkpoint, args.source, args.target)
+    progress = Progress()
+    summary = {"source": args.source, "target": args.target, "kinds": {}}
+    started = time.perf_counter()
+    # Dependency order: comments need their posts (and, on PostgreSQL, the posts' new ids)
+    for kind in KINDS:
+        if kind in kinds:
+            summary["kinds"][kind] = migrate_kind(
+                kind, source, target, checkpoint, args.chunk_size, args.workers, progress
+            )
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
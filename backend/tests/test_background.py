@@ -0,0 +1,55 @@
+"""
+Background helpers: PeriodicTask must not lose work buffered while its last
+run was in progress, and DelayedCalls runs every delayed call on one thread.
+"""
+import threading
+
+from app.core.background import DelayedCalls, PeriodicTask
+
+
+def test_stop_during_run_runs_again():
+    buffered = ["first"]
+    flushed = []
+    running = threading.Event()
+    release = threading.Event()
+
+    def flush():
+        taken = list(buffered)
+        buffered.clear()
+        running.set()
+        release.wait(5)
+        flushed.extend(taken)
+
+    task = PeriodicTask("test-flush", flush, interval=60)
+    task.start()
+    task.wake()
+    assert running.wait(5)
+    # Buffered after the run in progress took its work, then a shutdown
+    buffered.append("second")
+    stopper = threading.Thread(target=task.stop)
+    stopper.start()
+    assert task._stopping.wait(5)
+    release.set()
+    stopper.join(5)
+
+    assert flushed == ["first", "second"]
+
+
+def test_delayed_calls_share_one_thread_and_coalesce():
+    calls = []
+    done = threading.Event()
+
+    def record(tag):
+        calls.append(tag)
+        if tag == "b":
+            done.set()
+
+    delayed = DelayedCalls("test-delayed")
+    threads = threading.active_count()
+    for _ in range(50):
+        delayed.call_later(0.05, record, "a")
+    delayed.call_later(0.1, record, "b")
+
+    assert threading.active_count() <= threads + 1
+    assert done.wait(5)
+    assert calls == ["a", "b"]
@@ -0,0 +1,65 @@
+"""
+Delta sync pages end at a (time, kind, id) position, so changes sharing a
+timestamp across a page boundary are neither skipped nor repeated.
+"""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.services.changes_service import ChangesService, Position, encode_token
+
+
+class FakeChangedRepository:
+    """Rows changed at `changed_at`, read as the repositories' get_changed/get_since do."""
+
+    def __init__(self, rows, changed_at="updated_at"):
+        self.rows = rows
+        self.changed_at = changed_at
+
+    def get_changed(self, since, until, limit, after_id=None):
+        def unread(row):
+            at = getattr(row, self.changed_at)
+            if after_id is not None and at == since:
+                return row.id > int(after_id)
+            return since < at <= until
+        return sorted(filter(unread, self.rows), key=lambda row: (getattr(row, self.changed_at), row.id))[:limit]
+
+    get_since = get_changed
+
+    def count_by_post_ids(self, post_ids):
+        return {post_id: 1 for post_id in post_ids}
+
+
+def _service(posts, comments, tombstones) -> ChangesService:
+    service = ChangesService(None)
+    service.post_repository = FakeChangedRepository(posts)
+    service.comment_repository = FakeChangedRepository(comments)
+    service.tombstone_repository = FakeChangedRepository(tombstones, changed_at="deleted_at")
+    return service
+
+
+def test_pages_do_not_skip_ties():
+    changed = datetime.now(timezone.utc) - timedelta(hours=1)
+    posts = [SimpleNamespace(id=post_id, subject="Subject", content="Content", google_user_id="user-1",
+                             author_name="User", created_at=changed, updated_at=changed, view_count=0)
+             for post_id in range(1, 6)]
+    comments = [SimpleNamespace(id=comment_id, post_id=1, content="Comment", google_user_id="user-1",
+                                author_name="User", parent_id=None, depth=0, reply_count=0,
+                                created_at=changed, updated_at=changed)
+                for comment_id in range(1, 4)]
+    tombstones = [SimpleNamespace(id=1, entity_type="comment", entity_id=9, post_id=1, deleted_at=changed)]
+    service = _service(posts, comments, tombstones)
+
+    start = encode_token(Position(changed - timedelta(minutes=1)))
+    token = start
+    seen = []
+    for _ in range(10):
+        page = service.get_changes(token, limit=2)
+        seen += [("post", post.id) for post in page.posts] + [("comment", comment.id) for comment in page.comments]
+        seen += [("deleted", deleted.id) for deleted in page.deleted]
+        token = page.next_token
+        if not page.has_more:
+            break
+
+    expected = [("post", post.id) for post in posts] + [("comment", comment.id) for comment in comments]
+    assert sorted(seen) == sorted(expected + [("deleted", 9)])
+    assert [post.comment_count for post in service.get_changes(start, limit=10).posts] == [1] * len(posts)
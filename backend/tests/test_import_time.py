@@ -0,0 +1,41 @@
+"""
+Cold-start import budget (see scripts/check_import_time.py): `import app.main`
+in a fresh interpreter stays within IMPORT_TIME_BUDGET_MS, and with
+DB_TYPE=firestore pulls in none of the PostgreSQL client libraries.
+"""
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEASURE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+print(json.dumps({"ms": (time.perf_counter() - started) * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+def import_app(db_type: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DB_TYPE": db_type},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_firestore_import_is_within_budget_and_skips_sqlalchemy():
+    budget_ms = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 1000))
+    # Best of three filters out noise from a cold filesystem cache, as the script does
+    runs = [import_app("firestore") for _ in range(3)]
+    best_ms = min(run["ms"] for run in runs)
+    assert best_ms <= budget_ms, f"import app.main took {best_ms:.0f} ms (budget {budget_ms:.0f} ms)"
+    for run in runs:
+        assert "sqlalchemy" not in run["modules"]
+        assert "psycopg2" not in run["modules"]
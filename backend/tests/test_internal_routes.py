@@ -0,0 +1,41 @@
+"""/api/internal endpoints require INTERNAL_API_TOKEN, and are off (404) while it is unset."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import internal
+from app.core.config import settings
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(internal.router, prefix="/api/internal")
+    return TestClient(app)
+
+
+def test_export_is_off_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", None)
+
+    assert client.get("/api/internal/export").status_code == 404
+    assert client.get("/api/internal/export", headers={"X-Internal-Token": ""}).status_code == 404
+
+
+def test_slow_queries_are_off_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", None)
+
+    assert client.get("/api/internal/slow-queries").status_code == 404
+
+
+def test_slow_queries_need_the_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "secret")
+
+    assert client.get("/api/internal/slow-queries").status_code == 403
+    assert client.get("/api/internal/slow-queries", headers={"X-Internal-Token": "secret"}).status_code == 200
+
+
+def test_export_needs_the_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "secret")
+
+    assert client.get("/api/internal/export").status_code == 403
+    assert client.get("/api/internal/export", headers={"X-Internal-Token": "wrong"}).status_code == 403
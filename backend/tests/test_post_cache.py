@@ -0,0 +1,135 @@
+"""
+Regression tests for the post cache: entries must be evicted by invalidation
+events whatever the type of the post id. Route path parameters are
+Union[int, str], so a read arrives with "123" while the event published by a
+write carries the model's id, 123.
+"""
+import contextlib
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.schemas.comment import CommentCreate
+from app.schemas.post import PostUpdate
+from app.services import view_counter as view_counter_module
+from app.services.caches import post_cache
+from app.services.comment_service import CommentService
+from app.services.post_service import PostService
+
+
+NOW = datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+
+class FakePostRepository:
+    def __init__(self):
+        self.post = SimpleNamespace(id=123, subject="Before", content="Content", google_user_id="user-1",
+                                    author_name="User", created_at=NOW, updated_at=NOW, comment_count=0,
+                                    view_count=0)
+
+    def get_by_id(self, post_id):
+        return self.post if str(post_id) == str(self.post.id) else None
+
+    def add_view_counts(self, deltas):
+        for post_id, delta in deltas.items():
+            if str(post_id) == str(self.post.id):
+                self.post.view_count += delta
+
+    def update(self, post, subject=None, content=None):
+        if subject is not None:
+            post.subject = subject
+        if content is not None:
+            post.content = content
+        return post
+
+
+class FakeCommentRepository:
+    def __init__(self):
+        self.comments = []
+
+    def get_by_post_id(self, post_id, skip=0, limit=100, fields=None):
+        return [comment for comment in self.comments if str(comment.post_id) == str(post_id)][skip:skip + limit]
+
+    def create(self, post_id, content, google_user_id, author_name, parent=None):
+        comment = SimpleNamespace(id=len(self.comments) + 1, post_id=int(post_id), content=content,
+                                  google_user_id=google_user_id, author_name=author_name, parent_id=None,
+                                  path=None, depth=0, reply_count=0, created_at=NOW, updated_at=NOW)
+        self.comments.append(comment)
+        return comment
+
+    def get_by_id(self, comment_id):
+        return next((comment for comment in self.comments if str(comment.id) == str(comment_id)), None)
+
+    def get_thread(self, post_id, since, root_path=None, after=None, limit=100):
+        return self.get_by_post_id(post_id, limit=limit)
+
+    def delete(self, comment):
+        self.comments.remove(comment)
+        return 1
+
+
+@pytest.fixture
+def repositories():
+    post_cache.clear()
+    yield SimpleNamespace(post=FakePostRepository(), comment=FakeCommentRepository())
+    post_cache.clear()
+
+
+def _post_service(repositories) -> PostService:
+    service = PostService(None)
+    service.repository = repositories.post
+    service.comment_repository = repositories.comment
+    return service
+
+
+def _comment_service(repositories) -> CommentService:
+    service = CommentService(None)
+    service.post_repo = repositories.post
+    service.comment_repo = repositories.comment
+    return service
+
+
+def test_updated_post_is_read_back(repositories):
+    service = _post_service(repositories)
+    assert service.get_post("123").subject == "Before"
+
+    service.update_post(123, PostUpdate(subject="After"), user_id="user-1")
+
+    assert service.get_post("123").subject == "After"
+
+
+def test_created_comment_is_listed(repositories):
+    service = _comment_service(repositories)
+    assert service.get_post_comments("123") == []
+
+    service.create_comment(123, CommentCreate(content="First"), google_user_id="user-2", author_name="Other")
+
+    assert [comment.content for comment in service.get_post_comments("123")] == ["First"]
+
+
+def test_deleted_comment_leaves_thread(repositories):
+    service = _comment_service(repositories)
+    comment = service.create_comment(123, CommentCreate(content="First"), google_user_id="user-2",
+                                     author_name="Other")
+    assert [comment.content for comment in service.get_thread(123).comments] == ["First"]
+
+    service.delete_comment(comment.id, user_id="user-2")
+
+    assert service.get_thread(123).comments == []
+
+
+def test_view_count_survives_flush(repositories, monkeypatch):
+    monkeypatch.setattr(view_counter_module, "db_session", contextlib.nullcontext)
+    monkeypatch.setattr(view_counter_module, "get_post_repository", lambda db: repositories.post)
+    monkeypatch.setattr(view_counter_module.trending, "record_views", lambda deltas: None)
+    counter = view_counter_module.ViewCounter(flush_interval=60, batch_size=1000)
+    service = _post_service(repositories)
+    # What GET /api/posts/{post_id} returns: the (cached) count plus this worker's pending views
+    service.get_post("123")
+    counter.record(123)
+    counter.record(123)
+    assert service.get_post("123").view_count + counter.pending(123) == 2
+
+    counter.flush()
+
+    assert service.get_post("123").view_count + counter.pending(123) == 2